@@ -0,0 +1,214 @@
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from queries import sql
+
+# Columnar snapshots of the employees table for org-level analytics.
+# The relevant columns are loaded once into NumPy arrays (categoricals as int32
+# codes plus a label list) and reused until the database changes. Snapshots are
+# read from the primary through a dedicated read-only connection, which also
+# detects changes with PRAGMA data_version: its value moves whenever any other
+# connection, in this process or another, commits.
+# NumPy is optional; without it the analytics tools report how to install it.
+
+CATEGORICAL_COLUMNS = ("department", "status", "location", "shift")
+NUMERIC_COLUMNS = ("salary", "performance_rating", "leave_balance", "leave_used")
+
+_np = None
+
+
+def load_numpy():
+    """Import NumPy on first use; returns None when it is not installed."""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        _np = numpy
+    return _np
+
+
+class Snapshot:
+    """Column arrays for every employee row, aligned by position."""
+
+    def __init__(self, codes: Dict[str, object], labels: Dict[str, List[str]],
+                 values: Dict[str, object], version: int):
+        self.codes = codes      # column -> int32 array of label indexes
+        self.labels = labels    # column -> labels, indexed by code
+        self.values = values    # column -> float64 array, NaN for NULL
+        self.version = version
+        self.loaded_at = time.time()
+        self.rows = len(next(iter(values.values()))) if values else 0
+        self.derived: Dict[tuple, object] = {}  # group codes / sort orders, computed once per snapshot
+
+
+def load_snapshot(conn: sqlite3.Connection, version: int) -> Snapshot:
+    np = load_numpy()
+    rows = conn.execute(sql("analytics.snapshot")).fetchall()
+    columns = list(zip(*rows)) if rows else [()] * (len(CATEGORICAL_COLUMNS) + len(NUMERIC_COLUMNS))
+    del rows
+    codes, labels, values = {}, {}, {}
+    for name, column in zip(CATEGORICAL_COLUMNS, columns):
+        index: Dict[object, int] = {}
+        codes[name] = np.fromiter((index.setdefault(v, len(index)) for v in column), dtype=np.int32, count=len(column))
+        labels[name] = ["" if v is None else str(v) for v in index]
+    for name, column in zip(NUMERIC_COLUMNS, columns[len(CATEGORICAL_COLUMNS):]):
+        values[name] = np.array(column, dtype=np.float64)  # None -> nan
+    return Snapshot(codes, labels, values, version)
+
+
+class SnapshotCache:
+    """Keeps one Snapshot per database, reloading only after the data_version moves.
+
+    ``min_refresh`` bounds how often a busy write stream can trigger reloads: a
+    changed database is reloaded at most once per that many seconds. ``loader`` and
+    ``version_sql`` let other in-memory structures (see bitmaps.py) reuse the cache
+    with their own build function and a narrower change counter.
+    """
+
+    def __init__(self, min_refresh: float = 1.0, loader: Optional[Callable] = None,
+                 version_sql: str = "PRAGMA data_version"):
+        self.min_refresh = min_refresh
+        self.loader = loader or load_snapshot
+        self.version_sql = version_sql
+        self._lock = threading.Lock()
+        self._readers: Dict[str, sqlite3.Connection] = {}
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._stats = {"loads": 0, "hits": 0, "load_seconds": 0.0}
+
+    def _reader(self, db_path: str) -> sqlite3.Connection:
+        reader = self._readers.get(db_path)
+        if reader is None:
+            uri = pathlib.Path(db_path).resolve().as_uri() + "?mode=ro"
+            reader = self._readers[db_path] = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        return reader
+
+    def get(self, db_path: str) -> Snapshot:
+        """Current snapshot of the database at ``db_path``, loading it when stale."""
+        with self._lock:
+            reader = self._reader(db_path)
+            version = reader.execute(self.version_sql).fetchone()[0]
+            snapshot = self._snapshots.get(db_path)
+            if snapshot is not None and (snapshot.version == version
+                                         or time.time() - snapshot.loaded_at < self.min_refresh):
+                self._stats["hits"] += 1
+                return snapshot
+            started = time.perf_counter()
+            snapshot = self._snapshots[db_path] = self.loader(reader, version)
+            self._stats["loads"] += 1
+            self._stats["load_seconds"] += time.perf_counter() - started
+            return snapshot
+
+    def clear(self) -> None:
+        """Close every reader connection and drop the cached snapshots; get() reopens and reloads."""
+        with self._lock:
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+            self._snapshots.clear()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {**self._stats, "snapshots": {path: {"rows": s.rows, "version": s.version,
+                                                        "loaded_at": s.loaded_at}
+                                                 for path, s in self._snapshots.items()}}
+
+
+# ----------------- VECTORIZED GROUP-BY ------------------
+
+def group_codes(snapshot: Snapshot, by: Sequence[str]):
+    """Dense group code per row for the combination of ``by`` columns, plus each group's labels."""
+    key = ("groups", tuple(by))
+    if key not in snapshot.derived:
+        np = load_numpy()
+        if not by:
+            snapshot.derived[key] = np.zeros(snapshot.rows, dtype=np.int64), [()]
+            return snapshot.derived[key]
+        combined = np.zeros(snapshot.rows, dtype=np.int64)
+        for name in by:
+            combined = combined * len(snapshot.labels[name]) + snapshot.codes[name]
+        keys, codes = np.unique(combined, return_inverse=True)
+        group_labels = []
+        for combo in keys.tolist():
+            parts = []
+            for name in reversed(by):
+                combo, code = divmod(combo, len(snapshot.labels[name]))
+                parts.append(snapshot.labels[name][code])
+            group_labels.append(tuple(reversed(parts)))
+        # Small code dtypes let the stable argsort below use radix sort
+        dtype = np.int16 if len(group_labels) < 2 ** 15 else np.int64
+        snapshot.derived[key] = codes.reshape(-1).astype(dtype), group_labels
+    return snapshot.derived[key]
+
+
+def _value_order(snapshot: Snapshot, column: str):
+    """Row indexes of the non-NULL values of ``column`` in ascending value order."""
+    key = ("order", column)
+    if key not in snapshot.derived:
+        np = load_numpy()
+        values = snapshot.values[column]
+        order = np.argsort(values, kind="stable")  # NaN sorts last
+        snapshot.derived[key] = order[:len(order) - int(np.isnan(values).sum())]
+    return snapshot.derived[key]
+
+
+def _label_order(snapshot: Snapshot, by: Sequence[str], group_labels: List[tuple]) -> List[int]:
+    """Group codes sorted by their labels."""
+    key = ("label_order", tuple(by))
+    if key not in snapshot.derived:
+        snapshot.derived[key] = sorted(range(len(group_labels)), key=group_labels.__getitem__)
+    return snapshot.derived[key]
+
+
+def grouped_stats(snapshot: Snapshot, column: str, by: Sequence[str],
+                  percentiles: Sequence[float] = (25, 50, 75)) -> List[dict]:
+    """count/mean/min/max and percentiles of ``column`` per group, ignoring NULLs."""
+    np = load_numpy()
+    codes, group_labels = group_codes(snapshot, by)
+    order = _value_order(snapshot, column)
+    if not len(order):
+        return []
+    groups = len(group_labels)
+    # Stable sort of the value-ordered rows by group: each group becomes a contiguous, ordered segment
+    row_groups = codes[order]
+    by_group = np.argsort(row_groups, kind="stable")
+    ordered = snapshot.values[column][order][by_group]
+    counts = np.bincount(row_groups, minlength=groups)
+    sums = np.bincount(row_groups, weights=snapshot.values[column][order], minlength=groups)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    present = counts > 0
+    last = len(ordered) - 1
+    stats = {
+        "count": counts,
+        "mean": sums / np.maximum(counts, 1),
+        "min": ordered[np.minimum(starts, last)],
+        "max": ordered[np.maximum(ends - 1, 0)],
+    }
+    for pct in percentiles:
+        # Linear interpolation between closest ranks, for every group at once
+        position = starts + np.maximum(counts - 1, 0) * (pct / 100.0)
+        low = np.minimum(np.floor(position).astype(np.int64), last)
+        high = np.minimum(low + 1, np.maximum(ends - 1, 0))
+        stats[f"p{pct:g}"] = ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+    present = [g for g in _label_order(snapshot, by, group_labels) if present[g]]
+    columns = {name: (array[present].tolist() if name == "count" else np.round(array[present], 2).tolist())
+               for name, array in stats.items()}
+    result = [dict(zip(by, group_labels[g])) for g in present]
+    for name, column in columns.items():
+        for row, value in zip(result, column):
+            row[name] = value
+    return result
+
+
+def group_counts(snapshot: Snapshot, by: Sequence[str]) -> List[dict]:
+    """Number of rows per combination of ``by`` columns, largest groups first."""
+    np = load_numpy()
+    codes, group_labels = group_codes(snapshot, by)
+    counts = np.bincount(codes, minlength=len(group_labels))
+    order = np.argsort(-counts, kind="stable")
+    return [{**dict(zip(by, group_labels[g])), "count": int(counts[g])} for g in order.tolist() if counts[g]]
@@ -0,0 +1,327 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import shutil
+import sqlite3
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta, datetime
+
+# Benchmark suite for the MCP tools in main.py.
+# Builds (and caches) generated databases at several scales, then calls every tool
+# directly and through an in-process FastMCP client, single- and multi-client, and
+# reports p50/p95/p99 latency, throughput and peak allocation. Results are saved as JSON so
+# runs on different commits can be compared:
+#   python bench.py --scales 1000,10000 --save
+#   python bench.py --scales 1000,10000 --compare bench_results/<commit>.json
+
+DATA_DIR = ".bench"
+RESULTS_DIR = "bench_results"
+LEAVE_DAYS = 5
+SNAPSHOT_LIMITS = {"calls": 3, "clients": 1, "warmup": 0}
+
+
+def tool_cases(n, sample_name):
+    """(tool, argument factory[, limits]) tuples; factories take a per-call random generator.
+
+    ``limits`` caps "calls", "clients" and "warmup" for tools too heavy to run at full count.
+    """
+    from init_db import certifications, departments, project_names
+
+    today = date.today()
+    width, project_width = max(3, len(str(n))), max(3, len(str(2 * n)))
+
+    def emp(rng):
+        return f"E{str(rng.randint(1, n)).zfill(width)}"
+
+    def day(rng):
+        return (today - timedelta(days=rng.randint(0, 364))).isoformat()
+
+    def week(rng):
+        start = today - timedelta(days=rng.randint(7, 364))
+        return {"start_date": start.isoformat(), "end_date": (start + timedelta(days=6)).isoformat()}
+
+    def future(rng):
+        return (today + timedelta(days=rng.randint(1, 3650))).isoformat()
+
+    def staffing(rng):
+        filters = {"department": [rng.choice(departments)], "shift": [rng.choice(("Day", "Night", "Rotational"))],
+                   "certifications": rng.sample([c for c in certifications if c != "None"], rng.randint(1, 2))}
+        return {"filters": filters} if rng.random() < 0.8 else {"filters": {"status": ["Active"]}}
+
+    def search(rng):
+        return {"query": rng.choice([f"{rng.choice(departments)} {rng.choice(('Day', 'Night'))} shift",
+                                     f"AWS certified {rng.choice(departments)}", rng.choice(project_names),
+                                     sample_name.split()[-1]])}
+
+    return [
+        ("get_leave_balance", lambda r: {"identifier": emp(r)}),
+        ("get_leave_balance[name]", lambda r: {"identifier": sample_name}),
+        ("get_leave_history", lambda r: {"identifier": emp(r)}),
+        ("get_employee_info", lambda r: {"employee_id": emp(r)}),
+        ("get_employee_info[partial]", lambda r: {"name": sample_name.split()[-1][:4]}),
+        ("get_employee_projects", lambda r: {"identifier": emp(r)}),
+        ("get_project_history_for_employee", lambda r: {"identifier": emp(r)}),
+        ("get_project_employees", lambda r: {"project_identifier": f"P{str(r.randint(1, 2 * n)).zfill(project_width)}"}),
+        ("get_employees_on_leave", lambda r: {"date": day(r)}),
+        ("get_employees_on_leave_between", lambda r: {"start_date": day(r), "end_date": day(r)}),
+        ("get_team_capacity", week),
+        ("get_compensation_stats", lambda r: {}),
+        ("get_leave_usage", lambda r: {"group_by": ["department"]}),
+        ("get_headcount", lambda r: {}),
+        ("search_directory", search),
+        ("find_employees", staffing),
+        ("get_leave_balances", lambda r: {"identifiers": [emp(r) for _ in range(50)]}),
+        ("get_employees_info", lambda r: {"ids": [emp(r) for _ in range(50)]}),
+        ("apply_leave", lambda r: {"identifier": emp(r), "leave_dates": [future(r)]}),
+        ("apply_leave_bulk", lambda r: {"requests": [{"identifier": emp(r), "dates": [future(r)]} for _ in range(50)]}),
+        ("verify_leave_log", lambda r: {"identifier": emp(r)}),
+        ("verify_leave_log[all]", lambda r: {}),
+        # Whole-database copies: a few serial calls each; the import loads the export into the backup
+        ("snapshot_database[backup]", lambda r: {"action": "backup", "name": "bench_backup.db"}, SNAPSHOT_LIMITS),
+        ("snapshot_database[export]", lambda r: {"action": "export", "name": "bench_export"}, SNAPSHOT_LIMITS),
+        ("snapshot_database[import]", lambda r: {"action": "import", "name": "bench_export", "target": "bench_backup.db",
+                                                 "tables": ["project_assignments"], "replace": True}, SNAPSHOT_LIMITS),
+    ]
+
+
+def dataset(scale, data_dir):
+    """Path to a generated database with ``scale`` employees, building it on first use."""
+    import init_db
+
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"bench_{scale}.db")
+    if not os.path.exists(path):
+        print(f"Generating {scale} employees -> {path}")
+        init_db.create_db(path, scale, 2 * scale, LEAVE_DAYS, use_pools=True)
+    return path
+
+
+def _remove_db(path):
+    for suffix in ("", "-wal", "-shm", "-journal", "-fingerprint"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def process_peak_rss_mb():
+    """The whole run's RSS high-water mark, not any one scenario's (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize(latencies, elapsed):
+    latencies.sort()
+    ms = lambda v: round(v * 1000, 3)
+    return {
+        "calls": len(latencies),
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "throughput_per_s": round(len(latencies) / elapsed, 1),
+    }
+
+
+def peak_alloc_mb(runner, server, tool, make_args, clients, seed):
+    """Peak memory allocated while one call per client of the scenario runs, traced apart from the timed run.
+
+    tracemalloc sees Python objects and NumPy arrays allocated during the calls, not
+    memory held from before them, nor SQLite's own page cache.
+    """
+    tracemalloc.start()
+    try:
+        asyncio.run(runner(server, tool, make_args, clients, clients, seed))
+        return round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+    finally:
+        tracemalloc.stop()
+
+
+# ----------------- RUNNERS ------------------
+
+async def run_direct(server, tool, make_args, calls, clients, seed):
+    """Await the tool function itself (executor hop included, no MCP serialization)."""
+    fn = getattr(server, tool.split("[")[0])
+    latencies = []
+
+    async def client(k):
+        rng = random.Random(seed + k)
+        for _ in range(calls // clients):
+            args = make_args(rng)
+            start = time.perf_counter()
+            await fn(**args)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(k) for k in range(clients)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def run_mcp(server, tool, make_args, calls, clients, seed):
+    """Call the tool through an in-process FastMCP client session per simulated client."""
+    from mcp.shared.memory import create_connected_server_and_client_session
+
+    latencies = []
+
+    async def client(k):
+        rng = random.Random(seed + k)
+        async with create_connected_server_and_client_session(server.mcp._mcp_server) as session:
+            for _ in range(calls // clients):
+                args = make_args(rng)
+                start = time.perf_counter()
+                result = await session.call_tool(tool.split("[")[0], args)
+                latencies.append(time.perf_counter() - start)
+                if result.isError:
+                    raise RuntimeError(f"{tool} failed: {result.content[0].text}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(k) for k in range(clients)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def bench_scale(server, scale, args):
+    source = dataset(scale, args.data_dir)
+    scratch = os.path.join(args.data_dir, f"scratch_{scale}.db")
+    # "copy" replicas become backup-API copies of the scratch database
+    replicas = [spec if spec == "ro" else os.path.join(args.data_dir, f"replica_{scale}_{i}.db")
+                for i, spec in enumerate(args.replicas.split(",")) if spec]
+    _remove_db(scratch)
+    # Write tools mutate the copy, never the cached dataset
+    with sqlite3.connect(source) as src, sqlite3.connect(scratch) as conn:
+        src.backup(conn)
+        sample_name = conn.execute("SELECT name FROM employees WHERE rowid = ?", (max(1, scale // 2),)).fetchone()[0]
+    server.configure(scratch, replicas, size=args.pool_size, read_size=args.pool_size)
+    server.cache.clear()
+
+    results = []
+    for tool, make_args, *limits in tool_cases(scale, sample_name):
+        if args.tools and tool.split("[")[0] not in args.tools:
+            continue
+        limits = limits[0] if limits else {}
+        calls, warmup = min(args.calls, limits.get("calls", args.calls)), min(args.warmup, limits.get("warmup", args.warmup))
+        for mode in args.modes:
+            runner = run_direct if mode == "direct" else run_mcp
+            for clients in sorted({min(c, limits.get("clients", c)) for c in args.clients}):
+                if warmup:
+                    asyncio.run(runner(server, tool, make_args, warmup * clients, clients, args.seed - 1))
+                stats = asyncio.run(runner(server, tool, make_args, calls, clients, args.seed))
+                stats["peak_alloc_mb"] = peak_alloc_mb(runner, server, tool, make_args, clients, args.seed + 1)
+                row = {"scale": scale, "tool": tool, "mode": mode, "clients": clients, **stats}
+                results.append(row)
+                print(f"{scale:>8} {tool:<34} {mode:<6} c={clients:<3} p50={row['p50_ms']:>8}ms "
+                      f"p95={row['p95_ms']:>8}ms p99={row['p99_ms']:>8}ms {row['throughput_per_s']:>9}/s "
+                      f"alloc={row['peak_alloc_mb']}MB")
+    if server.readers is not server.pool:
+        server.readers.close()
+    server.pool.close()
+    _remove_db(scratch)
+    for spec in replicas:
+        if spec != "ro":
+            _remove_db(spec)
+    shutil.rmtree(server.SNAPSHOT_DIR, ignore_errors=True)
+    return results
+
+
+# ----------------- BASELINES ------------------
+
+def _key(row):
+    return row["scale"], row["tool"], row["mode"], row["clients"]
+
+
+def compare(results, baseline_path, threshold):
+    """Print p95 and throughput changes against a saved run; returns the number of regressions."""
+    with open(baseline_path) as f:
+        baseline = {_key(row): row for row in json.load(f)["results"]}
+    regressions = 0
+    for row in results:
+        old = baseline.get(_key(row))
+        if not old:
+            continue
+        p95 = row["p95_ms"] / old["p95_ms"] if old["p95_ms"] else 1.0
+        tput = row["throughput_per_s"] / old["throughput_per_s"] if old["throughput_per_s"] else 1.0
+        flag = ""
+        if p95 > 1 + threshold or tput < 1 - threshold:
+            regressions += 1
+            flag = "  <-- REGRESSION"
+        print(f"{row['scale']:>8} {row['tool']:<34} {row['mode']:<6} c={row['clients']:<3} "
+              f"p95 x{p95:.2f} throughput x{tput:.2f}{flag}")
+    return regressions
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"commit": commit or "unknown", "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "sqlite": sqlite3.sqlite_version, "platform": platform.platform()}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the MCP tools against generated datasets.")
+    parser.add_argument("--scales", default="1000,10000,100000",
+                        help="Comma-separated employee counts, e.g. 1000,10000,100000,1000000")
+    parser.add_argument("--modes", default="direct,mcp", help="direct and/or mcp")
+    parser.add_argument("--clients", default="1,8", help="Comma-separated concurrent client counts")
+    parser.add_argument("--calls", type=int, default=200, help="Calls per tool per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed calls per client before each scenario")
+    parser.add_argument("--tools", default="", help="Only these tools (comma-separated)")
+    parser.add_argument("--pool-size", type=int, default=8, help="Connection pool size")
+    parser.add_argument("--replicas", default="",
+                        help="Read replicas, comma-separated: 'ro' (primary opened read-only) or 'copy'")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Where generated datasets are cached")
+    parser.add_argument("--save", nargs="?", const="", default=None,
+                        help="Save results as JSON (default path: bench_results/<commit>.json)")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change flagged as a regression")
+    args = parser.parse_args(argv)
+    args.scales = [int(s) for s in args.scales.split(",")]
+    args.modes = [m for m in args.modes.split(",") if m]
+    args.clients = [int(c) for c in args.clients.split(",")]
+    args.tools = {t for t in args.tools.split(",") if t}
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ["LEAVE_DB_POOL_SIZE"] = str(args.pool_size)
+    os.environ.setdefault("LEAVE_SNAPSHOT_DIR", os.path.join(args.data_dir, "snapshots"))
+    import main as server
+    logging.getLogger("mcp").setLevel(logging.WARNING)  # per-request INFO lines would skew timings
+
+    results = []
+    for scale in args.scales:
+        results.extend(bench_scale(server, scale, args))
+
+    print(f"Process peak RSS over the whole run: {process_peak_rss_mb()}MB")
+    report = {"meta": metadata(), "config": {k: sorted(v) if isinstance(v, set) else v
+                                             for k, v in vars(args).items()},
+              "process_peak_rss_mb": process_peak_rss_mb(), "results": results}
+    if args.save is not None:
+        path = args.save or os.path.join(RESULTS_DIR, f"{report['meta']['commit']}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {len(results)} results to {path}")
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import bisect
+import re
+import sqlite3
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from queries import sql
+
+# In-memory bitset index for staffing filters (find_employees).
+# Every employee gets a bit position, in employee_id order, and every department,
+# shift, status and certification value a Python int with the bits of the employees
+# that have it. A multi-attribute filter is then a handful of big-int AND/ORs over
+# n/8 bytes each, with no SQL on the request path. Indexes are built by
+# load_bitmap_index and cached by analytics.SnapshotCache keyed on staffing_version,
+# which only moves when a filtered column changes (see schema._certifications).
+
+# Single-valued columns with one bitmap per value; certifications are multi-valued
+BITMAP_COLUMNS = ("department", "shift", "status")
+ATTRIBUTES = BITMAP_COLUMNS + ("certifications",)
+
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+
+class BitmapIndex:
+    """Employee ids/names by bit position plus attribute -> value -> bitmap."""
+
+    def __init__(self, ids: List[str], names: List[str], bitmaps: Dict[str, Dict[str, int]],
+                 labels: Dict[str, Dict[str, str]], version: int):
+        self.ids = ids            # bit position -> employee_id, ascending
+        self.names = names
+        self.bitmaps = bitmaps    # attribute -> casefolded value -> bitmap
+        self.labels = labels      # attribute -> casefolded value -> value as stored
+        self.version = version
+        self.loaded_at = time.time()
+        self.rows = len(ids)
+
+    def values(self, attribute: str) -> List[str]:
+        return sorted(self.labels[attribute].values())
+
+    def select(self, filters: Dict[str, Sequence[str]]) -> Tuple[int, Dict[str, List[str]]]:
+        """Bitmap of the employees matching ``filters``, plus any values the index does not know.
+
+        Department, shift and status match any of their values; every listed certification is required.
+        """
+        selected = (1 << self.rows) - 1
+        unknown: Dict[str, List[str]] = {}
+        for attribute in ATTRIBUTES:
+            values = filters.get(attribute)
+            if not values:
+                continue
+            bitmaps = self.bitmaps[attribute]
+            missing = [v for v in values if v.casefold() not in bitmaps]
+            if missing:
+                unknown[attribute] = missing
+            if attribute == "certifications":
+                for value in values:
+                    selected &= bitmaps.get(value.casefold(), 0)
+            else:
+                any_of = 0
+                for value in values:
+                    any_of |= bitmaps.get(value.casefold(), 0)
+                selected &= any_of
+        return selected, unknown
+
+    def page(self, selected: int, after: str, limit: int) -> Tuple[List[int], bool]:
+        """Up to ``limit`` bit positions set in ``selected`` whose employee_id sorts after ``after``."""
+        start = bisect.bisect_right(self.ids, after)
+        bits = selected >> start
+        # Walk the set bits through the bitmap's bytes: the regex skips runs of empty bytes in C
+        data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+        found = []
+        match = _NONZERO_BYTE.search(data)
+        while match and len(found) <= limit:
+            offset = match.start()
+            byte = data[offset]
+            while byte:
+                low = byte & -byte
+                found.append(start + offset * 8 + low.bit_length() - 1)
+                byte ^= low
+            match = _NONZERO_BYTE.search(data, offset + 1)
+        return found[:limit], len(found) > limit
+
+
+def _bitmap(positions: List[int], rows: int) -> int:
+    # Built as a string of binary digits: one C-level int() parse instead of a shift per member
+    digits = bytearray(b"0") * rows
+    for position in positions:
+        digits[position] = 49  # "1"
+    return int(digits[::-1], 2) if rows else 0
+
+
+def load_bitmap_index(conn: sqlite3.Connection, version: int) -> BitmapIndex:
+    # One read transaction, so employees and their certifications come from the same snapshot
+    conn.execute("BEGIN")
+    try:
+        rows = conn.execute(sql("staffing.employees")).fetchall()
+        certifications = dict(conn.execute(sql("staffing.certification_names")).fetchall())
+        held = conn.execute(sql("staffing.certifications")).fetchall()
+    finally:
+        conn.rollback()
+    columns = list(zip(*rows)) if rows else [()] * (2 + len(BITMAP_COLUMNS))
+    del rows
+    ids, names = list(columns[0]), list(columns[1])
+    members: Dict[str, Dict[str, List[int]]] = {attribute: {} for attribute in ATTRIBUTES}
+    for attribute, column in zip(BITMAP_COLUMNS, columns[2:]):
+        groups = members[attribute]
+        for position, value in enumerate(column):
+            if value is not None:
+                groups.setdefault(value, []).append(position)
+    positions = {employee_id: position for position, employee_id in enumerate(ids)}
+    groups = members["certifications"]
+    for employee_id, cert_key in held:
+        position = positions.get(employee_id)
+        if position is not None:
+            groups.setdefault(certifications[cert_key], []).append(position)
+    bitmaps: Dict[str, Dict[str, int]] = {attribute: {} for attribute in ATTRIBUTES}
+    labels: Dict[str, Dict[str, str]] = {attribute: {} for attribute in ATTRIBUTES}
+    for attribute, groups in members.items():
+        for value, group in groups.items():
+            key = value.casefold()
+            # Values differing only in case share a bitmap
+            bitmaps[attribute][key] = bitmaps[attribute].get(key, 0) | _bitmap(group, len(ids))
+            labels[attribute].setdefault(key, value)
+    return BitmapIndex(ids, names, bitmaps, labels, version)
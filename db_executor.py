@@ -0,0 +1,67 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+
+class DBExecutor:
+    """Runs blocking sqlite3 reads off the event loop.
+
+    Reads go to a bounded thread pool and run concurrently. Decorating a sync
+    tool with ``read`` turns it into an ``async def`` with the same signature,
+    so FastMCP keeps serving other clients while a query runs. Writes are not
+    run here: group_commit.GroupCommit queues them to its own writer thread.
+    """
+
+    def __init__(self, read_workers: int = 4):
+        self.read_workers = read_workers
+        self._readers = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix="db-read")
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {"reads": 0, "reads_active": 0, "peak_reads_active": 0}
+
+    def _track(self, loop: asyncio.AbstractEventLoop, fn: Callable, *args, **kwargs):
+        self._local.loop = loop
+        with self._lock:
+            self._stats["reads_active"] += 1
+            self._stats["peak_reads_active"] = max(self._stats["peak_reads_active"], self._stats["reads_active"])
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._local.loop = None
+            with self._lock:
+                self._stats["reads_active"] -= 1
+                self._stats["reads"] += 1
+
+    async def run_read(self, fn: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, functools.partial(self._track, loop, fn, *args, **kwargs))
+
+    def resize(self, read_workers: int) -> None:
+        """Replace the read pool with one of ``read_workers`` threads; running reads finish on the old one."""
+        old, self._readers = self._readers, ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix="db-read")
+        self.read_workers = read_workers
+        old.shutdown(wait=False)
+
+    def submit_async(self, coro) -> None:
+        """From inside a tool body, schedule ``coro`` (e.g. a progress notification) on the caller's loop."""
+        loop = getattr(self._local, "loop", None)
+        if loop is None:
+            coro.close()
+            return
+        asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def read(self, fn: Callable) -> Callable:
+        """Decorator: run ``fn`` on the read pool."""
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await self.run_read(fn, *args, **kwargs)
+        return wrapper
+
+    def shutdown(self) -> None:
+        self._readers.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {"read_workers": self.read_workers, **self._stats}
@@ -0,0 +1,226 @@
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+# Pragmas applied to every pooled connection.
+# cache_size is negative -> KiB, so -16000 is roughly a 16 MB page cache per connection.
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+
+class PoolTimeout(RuntimeError):
+    """Raised when no connection becomes free within the checkout timeout."""
+
+
+def _is_busy(exc: sqlite3.OperationalError) -> bool:
+    # SQLITE_BUSY (5) / SQLITE_LOCKED (6), ignoring extended result code bits
+    return (getattr(exc, "sqlite_errorcode", 0) & 0xFF) in (5, 6) or "locked" in str(exc)
+
+
+def begin_immediate(conn: sqlite3.Connection, retries: int = 5, backoff: float = 0.02) -> None:
+    """BEGIN IMMEDIATE, retried with jittered exponential backoff while another process holds the lock."""
+    for attempt in range(retries + 1):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            return
+        except sqlite3.OperationalError as exc:
+            if not _is_busy(exc) or attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+
+def run_in_transaction(conn: sqlite3.Connection, work: Callable[[sqlite3.Connection], object],
+                       retries: int = 5, backoff: float = 0.02):
+    """Run ``work(conn)`` inside BEGIN IMMEDIATE and commit; roll back if it raises.
+
+    The write lock is taken up front, so reads inside ``work`` cannot be invalidated by
+    another writer. Only taking the lock is retried (with jittered exponential backoff,
+    while another process holds it past busy_timeout); ``work`` runs once, and any error
+    it raises, busy or not, rolls back and propagates.
+    """
+    begin_immediate(conn, retries, backoff)
+    try:
+        result = work(conn)
+        conn.commit()
+        return result
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+class ConnectionPool:
+    """Bounded checkout/checkin pool of long-lived SQLite connections.
+
+    Connections are opened lazily up to ``size``, tuned once with ``pragmas``
+    and handed out LIFO so the hottest connection (and its page cache) is reused.
+    A connection that sat idle longer than ``health_check_interval`` seconds is
+    pinged with ``SELECT 1`` before reuse and replaced if the ping fails.
+    ``setup`` (e.g. schema migrations) runs once on the first connection opened;
+    ``on_connect`` runs on every connection opened, ``factory`` is the
+    sqlite3.Connection subclass to open them with and ``cached_statements`` sizes
+    each connection's prepared statement cache. With ``uri=True`` ``db_path`` is a
+    SQLite URI such as ``file:/data/employees.db?mode=ro``.
+    """
+
+    def __init__(self, db_path: str, size: int = 4, timeout: float = 10.0,
+                 pragmas: Optional[Dict[str, object]] = None,
+                 health_check_interval: float = 30.0,
+                 setup: Optional[Callable[[sqlite3.Connection], object]] = None,
+                 on_connect: Optional[Callable[[sqlite3.Connection], object]] = None,
+                 factory: type = sqlite3.Connection,
+                 cached_statements: int = 128,
+                 uri: bool = False):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.health_check_interval = health_check_interval
+        self._setup = setup
+        self._on_connect = on_connect
+        self._factory = factory
+        self._cached_statements = cached_statements
+        self._uri = uri
+        self._setup_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._idle = []  # (connection, last_used) pairs, most recent last
+        self._opened = 0
+        self._in_use = 0
+        self._closed = False
+        self._stats = {"checkouts": 0, "waits": 0, "timeouts": 0, "opened": 0,
+                       "replaced": 0, "peak_in_use": 0}
+
+    # ----------------- CONNECTIONS ------------------
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, factory=self._factory,
+                               cached_statements=self._cached_statements, uri=self._uri)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        if self._on_connect is not None:
+            self._on_connect(conn)
+        if self._setup is not None:
+            with self._setup_lock:
+                if self._setup is not None:
+                    try:
+                        self._setup(conn)
+                    except Exception:
+                        conn.close()
+                        raise
+                    self._setup = None
+        return conn
+
+    def _healthy(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def checkout(self) -> sqlite3.Connection:
+        """Borrow a connection, waiting up to ``timeout`` seconds for a free one."""
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            if self._closed:
+                raise PoolTimeout("Connection pool is closed.")
+            self._stats["checkouts"] += 1
+            waited = False
+            while not self._idle and self._opened >= self.size:
+                if not waited:
+                    self._stats["waits"] += 1
+                    waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    if not self._idle and self._opened >= self.size:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(f"No database connection free after {self.timeout}s.")
+            if self._idle:
+                conn, last_used = self._idle.pop()
+            else:
+                conn, last_used = None, None
+                self._opened += 1
+            self._in_use += 1
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], self._in_use)
+
+        try:
+            if conn is None:
+                conn = self._open()
+                with self._cond:
+                    self._stats["opened"] += 1
+            elif time.monotonic() - last_used > self.health_check_interval and not self._healthy(conn):
+                conn.close()
+                conn = self._open()
+                with self._cond:
+                    self._stats["replaced"] += 1
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def checkin(self, conn: sqlite3.Connection) -> None:
+        """Return a borrowed connection, rolling back anything left uncommitted."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            broken = False
+        except sqlite3.Error:
+            broken = True
+        with self._cond:
+            self._in_use -= 1
+            if broken or self._closed:
+                self._opened -= 1
+                conn.close()
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager around checkout()/checkin()."""
+        conn = self.checkout()
+        try:
+            yield conn
+        finally:
+            self.checkin(conn)
+
+    def ensure_setup(self) -> None:
+        """Run ``setup`` now unless a connection already has, for readers that open their own connections."""
+        if self._setup is not None:
+            with self.connection():
+                pass
+
+    def close(self) -> None:
+        """Close idle connections; busy ones are closed when they are checked in."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            conn.close()
+
+    # ----------------- STATS ------------------
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            return {
+                "db_path": self.db_path,
+                "size": self.size,
+                "open": self._opened,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                **self._stats,
+            }
@@ -0,0 +1,167 @@
+import asyncio
+import functools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from db_pool import ConnectionPool, begin_immediate, run_in_transaction
+
+# Group commit for the write tools.
+# Calls decorated with ``write`` are queued to one writer thread instead of each
+# committing on its own. The writer takes every call that arrives within ``window``
+# seconds of the first (up to ``max_batch``), runs them in one BEGIN IMMEDIATE
+# transaction with a SAVEPOINT around each call and commits once, so the whole batch
+# costs one WAL sync. A call that raises is rolled back to its savepoint without
+# touching the others. Callers are answered only after the commit returns, so an
+# acknowledged write is as durable as the connection's synchronous setting makes it;
+# if the commit itself fails, every call in the batch gets the error.
+
+log = logging.getLogger(__name__)
+
+
+class GroupCommit:
+    """Batching writer: one transaction and one commit per group of concurrent write calls.
+
+    Inside a call, ``connection()`` yields the batch connection and ``transaction()``
+    runs its work directly (the call's savepoint already isolates it); outside a batch,
+    e.g. when a tool body is called synchronously, they fall back to a pooled connection
+    and run_in_transaction. ``after_commit`` defers side effects such as cache
+    invalidation until the batch is committed.
+    """
+
+    def __init__(self, pool: Optional[ConnectionPool] = None, window: float = 0.0, max_batch: int = 256):
+        self.pool = pool
+        self.window = window
+        self.max_batch = max_batch
+        self._queue = queue.SimpleQueue()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"batches": 0, "writes": 0, "failed_writes": 0, "failed_batches": 0,
+                       "largest_batch": 0, "commit_seconds": 0.0, "queued": 0, "peak_queued": 0}
+        self._thread = threading.Thread(target=self._run, name="db-group-commit", daemon=True)
+        self._thread.start()
+
+    # ----------------- CALLER SIDE ------------------
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Queue ``fn(*args, **kwargs)`` for the next batch; the future resolves after its commit."""
+        future = Future()
+        with self._lock:
+            self._stats["queued"] += 1
+            self._stats["peak_queued"] = max(self._stats["peak_queued"], self._stats["queued"])
+        self._queue.put((functools.partial(fn, *args, **kwargs), future))
+        return future
+
+    def write(self, fn: Callable) -> Callable:
+        """Decorator: run ``fn`` as one call of a group-committed batch."""
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+        return wrapper
+
+    @contextmanager
+    def connection(self):
+        """The running batch's connection, or a pooled one outside a batch."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+        with self.pool.connection() as conn:
+            yield conn
+
+    def transaction(self, conn, work: Callable):
+        """Run ``work(conn)`` atomically: inside the call's savepoint, or its own transaction outside a batch."""
+        if conn is getattr(self._local, "conn", None):
+            return work(conn)
+        return run_in_transaction(conn, work)
+
+    def after_commit(self, fn: Callable, *args) -> None:
+        """Run ``fn(*args)`` once the current call is committed (immediately outside a batch)."""
+        callbacks = getattr(self._local, "after_commit", None)
+        if callbacks is None:
+            fn(*args)
+        else:
+            callbacks.append(functools.partial(fn, *args))
+
+    # ----------------- WRITER THREAD ------------------
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                try:
+                    remaining = deadline - time.monotonic()
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            with self._lock:
+                self._stats["queued"] -= len(batch)
+            try:
+                self._run_batch(batch)
+            except BaseException as exc:  # e.g. no connection: fail the batch, keep the writer alive
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    def _run_batch(self, batch) -> None:
+        outcomes, callbacks = [], []
+        with self.pool.connection() as conn:
+            self._local.conn, self._local.after_commit = conn, callbacks
+            try:
+                begin_immediate(conn)
+                try:
+                    for work, future in batch:
+                        if not future.set_running_or_notify_cancel():
+                            outcomes.append(None)
+                            continue
+                        conn.execute("SAVEPOINT call")
+                        pending = len(callbacks)
+                        try:
+                            outcomes.append((True, work()))
+                            conn.execute("RELEASE call")
+                        except Exception as exc:
+                            conn.execute("ROLLBACK TO call")
+                            conn.execute("RELEASE call")
+                            del callbacks[pending:]
+                            outcomes.append((False, exc))
+                    started = time.perf_counter()
+                    conn.commit()
+                    commit_seconds = time.perf_counter() - started
+                except BaseException:
+                    conn.rollback()
+                    with self._lock:
+                        self._stats["failed_batches"] += 1
+                    raise
+            finally:
+                self._local.conn = self._local.after_commit = None
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                log.exception("after_commit callback failed")
+        # Counted before callers are answered, so a caller reading stats() sees its own batch
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["writes"] += len(batch)
+            self._stats["failed_writes"] += sum(1 for outcome in outcomes if outcome and not outcome[0])
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+            self._stats["commit_seconds"] += commit_seconds
+        for outcome, (_, future) in zip(outcomes, batch):
+            if outcome is None:
+                continue
+            ok, value = outcome
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_batch"] = round(stats["writes"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return {"window": self.window, "max_batch": self.max_batch, **stats}
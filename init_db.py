@@ -1,27 +1,177 @@
-import sqlite3
+import argparse
+import os
 import random
-from faker import Faker
+import sqlite3
+import time
+from datetime import date, timedelta
 
-SEED = 42  # You can use any integer
+from schema import migrate
 
-random.seed(SEED)
-fake = Faker()
-fake.seed_instance(SEED)
+SEED = 42  # You can use any integer
 
 departments = ["Sales", "AI/ML", "Data Engineering", "Digital Engineering", "HR", "Finance"]
 certifications = ["AWS", "Azure", "GCP", "PMP", "Scrum", "None"]
+project_names = ["AI Chatbot", "Data Lake", "HR Portal", "Sales Dashboard", "Cloud Migration"]
+project_statuses = ["Active", "Completed", "On Hold"]
+project_roles = ["Developer", "Lead", "Tester", "Manager", "Analyst"]
+
+CHUNK_SIZE = 50_000
+
+# Pragmas for a one-shot bulk load into a fresh file: no journal, no fsync.
+# Safe because a failed load is simply re-run from scratch.
+BULK_PRAGMAS = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "locking_mode": "EXCLUSIVE",
+    "temp_store": "MEMORY",
+    "cache_size": -262144,
+}
+
+
+def _load_faker(seed):
+    try:
+        from faker import Faker
+    except ImportError:
+        return None
+    fake = Faker()
+    fake.seed_instance(seed)
+    return fake
+
+
+def _leave_history(rng, leave_days, window):
+    if not leave_days:
+        return ""
+    return ",".join(sorted(window[i] for i in rng.sample(range(len(window)), min(leave_days, len(window)))))
+
+
+# ----------------- ROW GENERATORS ------------------
+
+def faker_employee_rows(fake, rng, count, leave_days, window, width):
+    """One Faker call per field: slow, but reproduces the original seed-42 sample data."""
+    for i in range(1, count + 1):
+        employee_id = f"E{str(i).zfill(width)}"
+        name = fake.name()
+        age = rng.randint(22, 60)
+        gender = rng.choice(["Male", "Female", "Other"])
+        experience = rng.randint(0, age - 21)
+        department = rng.choice(departments)
+        position = fake.job()
+        email = fake.email()
+        phone = fake.phone_number()
+        address = fake.address().replace("\n", ", ")
+        certs = ",".join(rng.sample(certifications, rng.randint(1, 3)))
+        joining_date = fake.date_between(start_date='-10y', end_date='today').isoformat()
+        salary = rng.randint(30000, 150000)
+        manager = fake.name()
+        leave_balance = rng.randint(10, 30)
+        leave_history = _leave_history(rng, leave_days, window)
+        rating = round(rng.uniform(2.0, 5.0), 1)
+        status = rng.choice(["Active", "On Leave", "Resigned"])
+        location = fake.city()
+        shift = rng.choice(["Day", "Night", "Rotational"])
+        yield (employee_id, name, age, gender, experience, department, position, email, phone, address,
+               certs, joining_date, salary, manager, leave_balance, leave_history, rating, status, location, shift)
+
+
+def faker_project_rows(fake, rng, count, num_employees, width, employee_width):
+    for i in range(1, count + 1):
+        project_id = f"P{str(i).zfill(width)}"
+        project_name = rng.choice(project_names)
+        employee_id = f"E{str(rng.randint(1, num_employees)).zfill(employee_width)}"
+        start_date_obj = fake.date_between(start_date='-3y', end_date='-1y')
+        end_date_obj = fake.date_between(start_date=start_date_obj, end_date='today')
+        role = rng.choice(project_roles)
+        status = rng.choice(project_statuses)
+        yield (project_id, project_name, employee_id, start_date_obj.isoformat(), end_date_obj.isoformat(), role, status)
+
+
+def build_pools(fake, rng, size):
+    """Pre-generate value pools once so bulk rows are assembled with random.choices, not Faker."""
+    if fake is not None:
+        first = [fake.first_name() for _ in range(size)]
+        last = [fake.last_name() for _ in range(size)]
+        return {
+            "first": first, "last": last,
+            "job": [fake.job() for _ in range(size)],
+            "domain": [fake.free_email_domain() for _ in range(20)],
+            "street": [fake.street_address() for _ in range(size)],
+            "city": [fake.city() for _ in range(size)],
+        }
+    # Faker not installed: plain synthetic pools keep the generator dependency-free
+    return {
+        "first": [f"First{i}" for i in range(size)], "last": [f"Last{i}" for i in range(size)],
+        "job": [f"Job {i}" for i in range(size)], "domain": ["example.com", "example.org", "example.net"],
+        "street": [f"{i} Main St" for i in range(size)], "city": [f"City {i}" for i in range(size)],
+    }
+
+
+def pooled_employee_chunks(pools, rng, count, leave_days, window, width):
+    """Assemble employee rows column by column with random.choices over precomputed pools."""
+    today = date.today().toordinal()
+    pick = rng.choices
+    joining_dates = [date.fromordinal(today - d).isoformat() for d in range(3653)]
+    cert_combos = [",".join(rng.sample(certifications, rng.randint(1, 3))) for _ in range(256)]
+    ratings = [round(2.0 + r / 10, 1) for r in range(31)]
+    salaries = range(30000, 150001)
+    for start in range(1, count + 1, CHUNK_SIZE):
+        k = min(CHUNK_SIZE, count + 1 - start)
+        ids = range(start, start + k)
+        first, last = pick(pools["first"], k=k), pick(pools["last"], k=k)
+        names = [f"{f} {l}" for f, l in zip(first, last)]
+        ages = pick(range(22, 61), k=k)
+        experience = [int(r * (age - 20)) for r, age in zip(pick((0.0, 0.25, 0.5, 0.75, 0.99), k=k), ages)]
+        emails = [f"{f.lower()}.{l.lower()}{i}@{d}" for f, l, i, d in zip(first, last, ids, pick(pools["domain"], k=k))]
+        phones = [f"555-{i % 1000:03d}-{(i * 7919) % 10000:04d}" for i in ids]
+        addresses = [f"{s}, {c}" for s, c in zip(pick(pools["street"], k=k), pick(pools["city"], k=k))]
+        managers = [f"{f} {l}" for f, l in zip(pick(pools["first"], k=k), pick(pools["last"], k=k))]
+        if leave_days:
+            histories = [",".join(sorted(set(pick(window, k=leave_days)))) for _ in ids]
+        else:
+            histories = [""] * k
+        yield list(zip(
+            (f"E{str(i).zfill(width)}" for i in ids), names, ages, pick(("Male", "Female", "Other"), k=k),
+            experience, pick(departments, k=k), pick(pools["job"], k=k), emails, phones, addresses,
+            pick(cert_combos, k=k), pick(joining_dates, k=k), pick(salaries, k=k), managers,
+            pick(range(10, 31), k=k), histories, pick(ratings, k=k),
+            pick(("Active", "On Leave", "Resigned"), k=k), pick(pools["city"], k=k),
+            pick(("Day", "Night", "Rotational"), k=k),
+        ))
 
-def create_db():
-    conn = sqlite3.connect("employees_update.db")
-    cursor = conn.cursor()
 
-    # Drop table if exists
-    cursor.execute("DROP TABLE IF EXISTS employees")
-    
+def pooled_project_chunks(rng, count, num_employees, width, employee_width):
+    today = date.today().toordinal()
+    pick = rng.choices
+    # days_ago[d] is the ISO date d days before today; assignments start 1-3 years back
+    days_ago = [date.fromordinal(today - d).isoformat() for d in range(3 * 365 + 1)]
+    for begin in range(1, count + 1, CHUNK_SIZE):
+        k = min(CHUNK_SIZE, count + 1 - begin)
+        start_offsets = pick(range(365, 3 * 365 + 1), k=k)
+        yield list(zip(
+            (f"P{str(i).zfill(width)}" for i in range(begin, begin + k)), pick(project_names, k=k),
+            (f"E{str(e).zfill(employee_width)}" for e in pick(range(1, num_employees + 1), k=k)),
+            (days_ago[d] for d in start_offsets),
+            (days_ago[int(d * rng.random())] for d in start_offsets),
+            pick(project_roles, k=k), pick(project_statuses, k=k),
+        ))
 
-    
+
+def _chunked(rows, size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ----------------- DATABASE ------------------
+
+def create_tables(conn: sqlite3.Connection) -> None:
+    """The base employees and projects tables; schema.migrate builds everything else on top."""
     # Create table
-    cursor.execute("""
+    conn.execute("""
         CREATE TABLE employees (
             employee_id TEXT PRIMARY KEY,
             name TEXT,
@@ -46,39 +196,8 @@ def create_db():
         )
     """)
 
-    # Populate table with 50 employees
-    for i in range(1, 51):
-        employee_id = f"E{str(i).zfill(3)}"
-        name = fake.name()
-        age = random.randint(22, 60)
-        gender = random.choice(["Male", "Female", "Other"])
-        experience = random.randint(0, age - 21)
-        department = random.choice(departments)
-        position = fake.job()
-        email = fake.email()
-        phone = fake.phone_number()
-        address = fake.address().replace("\n", ", ")
-        certs = ",".join(random.sample(certifications, random.randint(1, 3)))
-        joining_date = fake.date_between(start_date='-10y', end_date='today').isoformat()
-        salary = random.randint(30000, 150000)
-        manager = fake.name()
-        leave_balance = random.randint(10, 30)
-        leave_history = ""  # initially empty
-        rating = round(random.uniform(2.0, 5.0), 1)
-        status = random.choice(["Active", "On Leave", "Resigned"])
-        location = fake.city()
-        shift = random.choice(["Day", "Night", "Rotational"])
-
-        cursor.execute("""
-            INSERT INTO employees VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (employee_id, name, age, gender, experience, department, position, email, phone, address,
-              certs, joining_date, salary, manager, leave_balance, leave_history, rating, status, location, shift))
-
-    # Drop projects table if exists
-    cursor.execute("DROP TABLE IF EXISTS projects")
-
     # Create projects table
-    cursor.execute("""
+    conn.execute("""
         CREATE TABLE projects (
             project_id TEXT PRIMARY KEY,
             project_name TEXT,
@@ -91,26 +210,65 @@ def create_db():
         )
     """)
 
-    # Populate projects table with sample data
-    project_names = ["AI Chatbot", "Data Lake", "HR Portal", "Sales Dashboard", "Cloud Migration"]
-    project_statuses = ["Active", "Completed", "On Hold"]
 
-    for i in range(1, 101):  # 100 project assignments
-        project_id = f"P{str(i).zfill(3)}"
-        project_name = random.choice(project_names)
-        employee_id = f"E{str(random.randint(1, 50)).zfill(3)}"
-        start_date_obj = fake.date_between(start_date='-3y', end_date='-1y')
-        end_date_obj = fake.date_between(start_date=start_date_obj, end_date='today')
-        start_date = start_date_obj.isoformat()
-        end_date = end_date_obj.isoformat()
-        role = random.choice(["Developer", "Lead", "Tester", "Manager", "Analyst"])
-        status = random.choice(project_statuses)
-        cursor.execute("""
-            INSERT INTO projects VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (project_id, project_name, employee_id, start_date, end_date, role, status))
-
-    # Now commit all changes
+def create_db(path="employees_update.db", num_employees=50, num_projects=100, leave_days=0,
+              seed=SEED, use_pools=False, pool_size=1000):
+    """(Re)create the employee database at ``path``.
+
+    With defaults this reproduces the original 50-employee sample. ``use_pools``
+    switches to pre-generated value pools for large datasets (Faker optional).
+    """
+    timings = {}
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    random.seed(seed)
+    fake = _load_faker(seed)
+    if fake is None and not use_pools:
+        raise SystemExit("Faker is not installed: install it or pass --pools.")
+
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    conn = sqlite3.connect(path)
+    for name, value in BULK_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    cursor = conn.cursor()
+
+    create_tables(conn)
+
+    employee_width = max(3, len(str(num_employees)))
+    project_width = max(3, len(str(num_projects)))
+    today = date.today()
+    window = [(today - timedelta(days=d)).isoformat() for d in range(365)]
+
+    if use_pools:
+        pools = build_pools(fake, rng, pool_size)
+        employee_chunks = pooled_employee_chunks(pools, rng, num_employees, leave_days, window, employee_width)
+        project_chunks = pooled_project_chunks(rng, num_projects, num_employees, project_width, employee_width)
+    else:
+        employee_chunks = _chunked(faker_employee_rows(fake, random, num_employees, leave_days, window, employee_width))
+        project_chunks = _chunked(faker_project_rows(fake, random, num_projects, num_employees, project_width, employee_width))
+    timings["setup"] = time.perf_counter() - started
+
+    # Single transaction, chunked executemany; secondary indexes come afterwards
+    phase = time.perf_counter()
+    cursor.execute("BEGIN")
+    for chunk in employee_chunks:
+        cursor.executemany("INSERT INTO employees VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", chunk)
+    for chunk in project_chunks:
+        cursor.executemany("INSERT INTO projects VALUES (?, ?, ?, ?, ?, ?, ?)", chunk)
     conn.commit()
+    timings["load"] = time.perf_counter() - phase
+
+    # Derived tables and indexes (leave_days, ...)
+    phase = time.perf_counter()
+    migrate(conn)
+    cursor.execute("PRAGMA analysis_limit = 1000")  # sampled statistics keep ANALYZE fast on big tables
+    cursor.execute("ANALYZE")
+    timings["indexes"] = time.perf_counter() - phase
+
+    cursor.execute("PRAGMA locking_mode = NORMAL")
+    cursor.execute("PRAGMA journal_mode = WAL")
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
     print("[DEBUG] Tables in DB:", cursor.fetchall())
     # Print number of records in each table
@@ -119,7 +277,25 @@ def create_db():
     cursor.execute("SELECT COUNT(*) FROM projects")
     num_projects = cursor.fetchone()[0]
     conn.close()
-    print(f"Database 'employees_update.db' created with {num_employees} employees and {num_projects} project assignments.")
+    timings["total"] = time.perf_counter() - started
+    print(f"Database '{path}' created with {num_employees} employees and {num_projects} project assignments.")
+    print("Timings: " + ", ".join(f"{k} {v:.2f}s" for k, v in timings.items()))
+    return timings
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic employee database.")
+    parser.add_argument("--employees", type=int, default=50, help="Number of employees (default 50)")
+    parser.add_argument("--projects", type=int, default=100, help="Number of project assignments (default 100)")
+    parser.add_argument("--leave-days", type=int, default=0, help="Leave days taken per employee in the last year")
+    parser.add_argument("--seed", type=int, default=SEED, help="Random seed")
+    parser.add_argument("--output", default="employees_update.db", help="Database file to (re)create")
+    parser.add_argument("--pools", action="store_true",
+                        help="Build rows from pre-generated value pools instead of per-row Faker calls (fast)")
+    parser.add_argument("--pool-size", type=int, default=1000, help="Values per pool with --pools")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    create_db()
+    args = parse_args()
+    create_db(args.output, args.employees, args.projects, args.leave_days, args.seed, args.pools, args.pool_size)
@@ -0,0 +1,192 @@
+from startup import timer  # first, so startup timings start with the process
+import importlib.util
+import json
+import os
+import sys
+import threading
+
+# Fast-start stdio entry point: python launcher.py [main.py options]
+# Importing main.py pulls in the whole FastMCP stack, which takes far longer than a
+# client is willing to wait for its first tools/list. The launcher answers the
+# handshake and the list requests from a manifest cached by the previous run, while
+# main.py is imported on a background thread. The first other request hands the
+# stdio streams to the FastMCP server (in stateless mode, since the handshake has
+# already been done). Without a valid manifest it simply starts main.py normally and
+# writes one for next time.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(HERE, ".mcp-manifest.json")
+
+# The background import holds the GIL most of the time, so it waits (at most this many
+# seconds) until the first tools/list has been answered
+LISTING_GRACE = 0.25
+
+def source_key() -> str:
+    """Identifies the code the manifest was built from: modules next to main.py, the mcp package and the interpreter."""
+    spec = importlib.util.find_spec("mcp")
+    stamps = [f"mcp:{os.stat(spec.origin).st_mtime_ns}" if spec and spec.origin else "mcp:missing"]
+    for name in sorted(os.listdir(HERE)):
+        if name.endswith(".py"):
+            st = os.stat(os.path.join(HERE, name))
+            stamps.append(f"{name}:{st.st_mtime_ns}:{st.st_size}")
+    return f"{sys.version}|{'|'.join(stamps)}"
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("key") == source_key() else None
+
+
+async def build_manifest(server) -> dict:
+    """Handshake data and the list results (exactly what FastMCP returns) from a loaded ``server``."""
+    import mcp.types as types
+    from mcp.shared.version import SUPPORTED_PROTOCOL_VERSIONS
+
+    lowlevel = server._mcp_server
+    options = lowlevel.create_initialization_options()
+    requests = {
+        "tools/list": types.ListToolsRequest(method="tools/list"),
+        "resources/list": types.ListResourcesRequest(method="resources/list"),
+        "resources/templates/list": types.ListResourceTemplatesRequest(method="resources/templates/list"),
+        "prompts/list": types.ListPromptsRequest(method="prompts/list"),
+    }
+    results = {}
+    for method, request in requests.items():
+        handler = lowlevel.request_handlers.get(type(request))
+        if handler is not None:
+            results[method] = (await handler(request)).model_dump(by_alias=True, mode="json", exclude_none=True)
+    return {
+        "key": source_key(),
+        "protocol_versions": list(SUPPORTED_PROTOCOL_VERSIONS),
+        "latest_protocol_version": types.LATEST_PROTOCOL_VERSION,
+        "server_info": {"name": options.server_name, "version": options.server_version},
+        "capabilities": options.capabilities.model_dump(by_alias=True, mode="json", exclude_none=True),
+        "instructions": options.instructions,
+        "results": results,
+    }
+
+
+def save_manifest(manifest: dict) -> None:
+    tmp = f"{MANIFEST_PATH}.{os.getpid()}"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, MANIFEST_PATH)
+    except OSError:
+        pass  # a read-only install just starts without the fast path
+
+
+# ----------------- HANDSHAKE FROM THE MANIFEST ------------------
+
+def _reply(out, message_id, result) -> None:
+    out.write(json.dumps({"jsonrpc": "2.0", "id": message_id, "result": result}, separators=(",", ":")).encode() + b"\n")
+    out.flush()
+
+
+def serve_from_manifest(manifest: dict, stdin, out, listed: threading.Event):
+    """Answer requests the manifest covers; returns the first line it cannot answer (b"" at EOF).
+
+    ``listed`` is set once tools/list has been answered.
+    """
+    while True:
+        line = stdin.readline()
+        if not line.strip():
+            if not line:
+                return line
+            continue
+        try:
+            message = json.loads(line)
+            method = message.get("method")
+        except (ValueError, AttributeError):
+            return line
+        if method == "notifications/initialized":
+            continue
+        if "id" not in message:
+            return line
+        if method == "initialize":
+            requested = (message.get("params") or {}).get("protocolVersion")
+            result = {
+                "protocolVersion": requested if requested in manifest["protocol_versions"]
+                else manifest["latest_protocol_version"],
+                "capabilities": manifest["capabilities"],
+                "serverInfo": manifest["server_info"],
+            }
+            if manifest["instructions"] is not None:
+                result["instructions"] = manifest["instructions"]
+            _reply(out, message["id"], result)
+        elif method == "ping":
+            _reply(out, message["id"], {})
+        elif method in manifest["results"] and not (message.get("params") or {}).get("cursor"):
+            _reply(out, message["id"], manifest["results"][method])
+            if method == "tools/list":
+                timer.mark("first_listing")
+                listed.set()
+        else:
+            return line
+
+
+# ----------------- HANDOFF TO FASTMCP ------------------
+
+async def run_server(server, pending: bytes, stateless: bool) -> None:
+    """Serve stdio with FastMCP, replaying ``pending`` (already read from stdin) first."""
+    from io import TextIOWrapper
+
+    import anyio
+    from mcp.server.stdio import stdio_server
+
+    stdin = anyio.wrap_file(TextIOWrapper(sys.stdin.buffer, encoding="utf-8"))
+
+    async def lines():
+        if pending:
+            yield pending.decode("utf-8")
+        async for line in stdin:
+            yield line
+
+    lowlevel = server._mcp_server
+    async with stdio_server(stdin=lines()) as (read_stream, write_stream):
+        await lowlevel.run(read_stream, write_stream, lowlevel.create_initialization_options(), stateless=stateless)
+
+
+def main(argv=None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    loaded = {}
+    listed = threading.Event()
+
+    def load():
+        listed.wait(LISTING_GRACE)
+        try:
+            import main as server_main
+            server_main.apply_cli(argv)
+            server_main.start_warm_up()
+            loaded["main"] = server_main
+        except BaseException as exc:
+            loaded["error"] = exc
+
+    loader = threading.Thread(target=load, name="server-import", daemon=True)
+    loader.start()
+    manifest = load_manifest()
+    pending = None
+    if manifest is None:
+        listed.set()
+    else:
+        pending = serve_from_manifest(manifest, sys.stdin.buffer, sys.stdout.buffer, listed)
+        listed.set()
+        if pending == b"":
+            return
+    loader.join()
+    if "error" in loaded:
+        raise loaded["error"]
+    import anyio
+
+    server = loaded["main"].mcp
+    if manifest is None:
+        save_manifest(anyio.run(build_manifest, server))
+    anyio.run(run_server, server, pending, manifest is not None)
+
+
+if __name__ == "__main__":
+    main()
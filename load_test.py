@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+# Concurrent-client load test for the async tool path.
+# Runs N in-process MCP client sessions against a scratch copy of the DB and
+# reports total throughput per client count, e.g.:
+#   python load_test.py --db employees.db --clients 1,2,4,8 --calls 200
+
+READ_CALLS = [
+    ("get_leave_balance", {"identifier": "E001"}),
+    ("get_leave_history", {"identifier": "E002"}),
+    ("get_employees_on_leave_between", {"start_date": "2000-01-01", "end_date": "2100-01-01"}),
+    ("get_leave_balances", {"identifiers": ["E001", "E002", "E003", "E004"]}),
+]
+
+
+async def run_client(server, calls: int, offset: int):
+    from mcp.shared.memory import create_connected_server_and_client_session
+
+    async with create_connected_server_and_client_session(server) as client:
+        for i in range(calls):
+            name, args = READ_CALLS[(i + offset) % len(READ_CALLS)]
+            result = await client.call_tool(name, args)
+            if result.isError:
+                raise RuntimeError(f"{name} failed: {result.content}")
+
+
+async def run_level(server, clients: int, calls: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(server, calls, offset) for offset in range(clients)))
+    return clients * calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-client throughput test for the MCP tools.")
+    parser.add_argument("--db", default="employees.db", help="Source database (a scratch copy is used)")
+    parser.add_argument("--clients", default="1,2,4,8", help="Comma-separated client counts")
+    parser.add_argument("--calls", type=int, default=200, help="Tool calls per client")
+    parser.add_argument("--pool-size", type=int, default=8, help="Connection pool size")
+    args = parser.parse_args()
+
+    os.environ["LEAVE_DB_POOL_SIZE"] = str(args.pool_size)
+    import main as server_main
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_copy = os.path.join(tmp, "load_test.db")
+        shutil.copy(args.db, db_copy)
+        server_main.configure(db_copy, size=args.pool_size)
+        server = server_main.mcp._mcp_server
+        baseline = None
+        for clients in (int(c) for c in args.clients.split(",")):
+            throughput = asyncio.run(run_level(server, clients, args.calls))
+            baseline = baseline or throughput
+            print(f"{clients:>3} client(s): {throughput:8.1f} calls/s  ({throughput / baseline:.2f}x)")
+        server_main.pool.close()
+
+
+if __name__ == "__main__":
+    main()
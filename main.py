@@ -1,16 +1,193 @@
-from mcp.server.fastmcp import FastMCP
-from typing import List, Optional
+from startup import ensure_schema, timer as startup_timer  # first, so startup timings cover every import
+from mcp.server.fastmcp import Context, FastMCP
+from pydantic import ConfigDict, with_config
+from typing import List, Literal, Optional, TypedDict
+import logging
 import sqlite3
+import threading
 from datetime import datetime
+import json
 import os
+import uuid
 
-# SQLite DB path
-DB_PATH = r"D:/claude_test/my-first-mcp-server/employees.db"
-print(f"[DEBUG] Using DB at: {DB_PATH}")
+from analytics import SnapshotCache, group_counts, grouped_stats, load_numpy
+from bitmaps import load_bitmap_index
+from cache import LRUCache
+from db_executor import DBExecutor
+from db_pool import DEFAULT_PRAGMAS, ConnectionPool
+from group_commit import GroupCommit
+from metrics import ToolMetrics
+from pagination import (DEFAULT_LIMIT, PageCursor, PageLimit, decode_cursor, encode_cursor, fetch_page,
+                        more_hint, page_list)
+from queries import CACHED_STATEMENTS, plan_report, sql
+from replicas import READONLY_PRAGMAS, ReplicaSet, parse_replicas, readonly_uri
+from records import (EMPLOYEE_FIELDS, EMPLOYEE_LABELS, DirectoryHit, EmployeeOnLeave, EmployeeRef,
+                     LeaveApplication, LeaveBalance, LeaveEvent, LeaveHistory, OutputFormat, ProjectAssignment, ProjectMember,
+                     employee_fields, records_from_rows, to_json, wants_json)
+from resolver import forget_fts_enabled, resolve_employee, resolve_employees, search_employee_names
+from search import directory_enabled, find_matches, forget_directory_enabled
+from snapshot import backup_database, export_tables, import_database
 
-# Connect to the database
+startup_timer.mark("imports")
+
+# Diagnostics go to stderr through logging: stdout carries the MCP stdio protocol
+log = logging.getLogger(__name__)
+
+# Primary (read-write) database and optional read replicas; see --help for the CLI equivalents.
+# A replica is "ro" (the primary opened read-only) or the path of a backup-API copy.
+DB_PATH = os.environ.get("LEAVE_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "employees.db"))
+REPLICAS = parse_replicas(os.environ.get("LEAVE_DB_REPLICAS", ""))
+
+# Per-tool latency/SQL instrumentation; LEAVE_METRICS=0 turns it off entirely
+metrics = ToolMetrics(enabled=os.environ.get("LEAVE_METRICS", "1") != "0",
+                      slow_statements=int(os.environ.get("LEAVE_METRICS_SLOW", "20")))
+
+# Long-lived, bounded connection pool for the primary; each replica gets its own read pool
+POOL_SIZE = int(os.environ.get("LEAVE_DB_POOL_SIZE", "4"))
+READ_POOL_SIZE = int(os.environ.get("LEAVE_READ_POOL_SIZE", str(POOL_SIZE)))
+
+# Seconds between checks for primary changes to copy into file replicas
+REPLICA_REFRESH = float(os.environ.get("LEAVE_REPLICA_REFRESH", "5"))
+
+# Write durability: FULL syncs the WAL on every commit; group commit makes that one sync per batch
+SYNCHRONOUS = os.environ.get("LEAVE_DB_SYNCHRONOUS", "FULL")
+
+# Group commit: write calls queued while a batch commits share the next transaction; a window
+# (milliseconds) also waits that long after the first call for more
+GROUP_COMMIT_WINDOW = float(os.environ.get("LEAVE_GROUP_COMMIT_WINDOW_MS", "0")) / 1000
+GROUP_COMMIT_MAX = int(os.environ.get("LEAVE_GROUP_COMMIT_MAX", "256"))
+
+# Where snapshot_database writes backups and exports (and reads exports to import)
+SNAPSHOT_DIR = os.environ.get("LEAVE_SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots"))
+
+# Query plan verification after migrations: "warn" (default), "strict" (refuse to start) or "off"
+PLAN_CHECK = os.environ.get("LEAVE_PLAN_CHECK", "warn")
+
+# Runs once, on the first pooled connection to the primary
+def _startup(conn):
+    ensure_schema(conn, PLAN_CHECK)
+
+def make_pool(db_path: str, size: int = POOL_SIZE) -> ConnectionPool:
+    return ConnectionPool(db_path, size=size, pragmas={**DEFAULT_PRAGMAS, "synchronous": SYNCHRONOUS},
+                          setup=_startup, on_connect=metrics.install,
+                          factory=metrics.factory, cached_statements=CACHED_STATEMENTS)
+
+def make_read_pool(uri: str, size: int = READ_POOL_SIZE) -> ConnectionPool:
+    return ConnectionPool(uri, size=size, pragmas=READONLY_PRAGMAS, on_connect=metrics.install,
+                          factory=metrics.factory, cached_statements=CACHED_STATEMENTS, uri=True)
+
+def configure(db_path: str, replicas=(), size: int = POOL_SIZE, read_size: int = READ_POOL_SIZE,
+              refresh: float = REPLICA_REFRESH) -> None:
+    """Point the server at ``db_path``, serving reads from ``replicas`` (or the primary pool)."""
+    global pool, readers
+    for previous in {globals().get("pool"), globals().get("readers")} - {None}:
+        previous.close()
+    # Snapshot readers and everything cached from the previous database (defined below on first import)
+    for previous in (globals().get("snapshots"), globals().get("staffing"), globals().get("cache")):
+        if previous is not None:
+            previous.clear()
+    # The optional FTS indexes may exist in one database and not the next
+    forget_fts_enabled()
+    forget_directory_enabled()
+    pool = writer.pool = make_pool(db_path, size)
+    if not replicas:
+        # One pooled connection is left for the writer so it never queues behind readers
+        readers = pool
+        executor.resize(max(1, size - 1))
+        return
+    # Migrate the primary before replicas read or copy it
+    with pool.connection():
+        pass
+    # Lookups cached from a copy may predate a write; drop them once the copies catch up
+    readers = ReplicaSet(db_path, replicas, lambda uri: make_read_pool(uri, read_size), refresh,
+                         on_sync=lambda: cache.clear())
+    executor.resize(read_size * len(replicas))
+
+# Tools run off the event loop: reads on a bounded pool, writes group-committed on one writer thread
+executor = DBExecutor(read_workers=max(1, POOL_SIZE - 1))
+writer = GroupCommit(window=GROUP_COMMIT_WINDOW, max_batch=GROUP_COMMIT_MAX)
+
+configure(DB_PATH, REPLICAS)
+
+def apply_cli(argv=None) -> None:
+    """Reconfigure from command-line options; the environment supplies the defaults."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Leave management MCP server.")
+    parser.add_argument("--db", default=DB_PATH, help="primary database (LEAVE_DB_PATH)")
+    parser.add_argument("--replica", action="append", dest="replicas",
+                        help="read replica: 'ro' or a copy path; repeatable (LEAVE_DB_REPLICAS)")
+    parser.add_argument("--read-pool-size", type=int, default=READ_POOL_SIZE,
+                        help="connections per replica (LEAVE_READ_POOL_SIZE)")
+    parser.add_argument("--replica-refresh", type=float, default=REPLICA_REFRESH,
+                        help="seconds between copy replica syncs (LEAVE_REPLICA_REFRESH)")
+    cli = parser.parse_args(argv)
+    replicas = cli.replicas or REPLICAS
+    if (cli.db, replicas, cli.read_pool_size, cli.replica_refresh) != (DB_PATH, REPLICAS, READ_POOL_SIZE, REPLICA_REFRESH):
+        configure(cli.db, replicas, read_size=cli.read_pool_size, refresh=cli.replica_refresh)
+
+def warm_up() -> None:
+    """Open the first primary connection, running the schema readiness check, then log startup timings."""
+    try:
+        with pool.connection():
+            pass
+    except Exception:
+        log.exception("Database %s is not ready", pool.db_path)
+        return
+    startup_timer.mark("schema_ready")
+    log.info(startup_timer.summary())
+
+def start_warm_up() -> None:
+    """Run warm_up() in the background so the tool listing is not held up by the database."""
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+# Borrow a connection for a read-only tool: use as `with get_db_connection() as conn:`
 def get_db_connection():
-    return sqlite3.connect(DB_PATH)
+    return readers.connection()
+
+# Borrow a primary connection for a tool that writes: inside a write call, the group-commit batch's
+def get_write_connection():
+    return writer.connection()
+
+# Read-through cache for employee/project lookups, keyed by resolved IDs:
+#   ("employee", employee_id) -> full employee record
+#   ("employee_projects", employee_id) -> that employee's project rows
+#   ("project_employees", project_key, after, limit) -> one page of (employee_id, name, role, project_id) rows
+cache = LRUCache(maxsize=int(os.environ.get("LEAVE_CACHE_SIZE", "2048")),
+                 ttl=float(os.environ.get("LEAVE_CACHE_TTL", "300")))
+
+# Evict every cached entry derived from an employee's row; call after committing a write
+def invalidate_employee(*employee_ids: str) -> None:
+    cache.invalidate(*(("employee", e) for e in employee_ids))
+
+def _employee_record(conn, employee_id, columns=EMPLOYEE_FIELDS):
+    row = conn.execute(sql("employee.record", columns=", ".join(columns)), (employee_id,)).fetchone()
+    return dict(zip(columns, row)) if row else None
+
+def _employee_project_rows(conn, employee_id):
+    return conn.execute(sql("project.for_employee"), (employee_id,)).fetchall()
+
+# Error reply in the caller's output format
+def _error(message: str, as_json: bool) -> str:
+    return to_json({"error": message}) if as_json else message
+
+# Leave dates that are not real days written YYYY-MM-DD (they are stored and compared as text)
+def _invalid_dates(dates: List[str]) -> List[str]:
+    invalid = []
+    for day in dates:
+        try:
+            valid = datetime.strptime(day, "%Y-%m-%d").date().isoformat() == day
+        except (TypeError, ValueError):
+            valid = False
+        if not valid:
+            invalid.append(day)
+    return invalid
+
+# Progress callback for long scans; a no-op unless the client sent a progress token
+def _progress(ctx):
+    if ctx is None:
+        return None
+    return lambda done, total: executor.submit_async(ctx.report_progress(done, total))
 
 # Initialize MCP server
 mcp = FastMCP("LeaveManager")
@@ -18,170 +195,665 @@ mcp = FastMCP("LeaveManager")
 # ----------------- EXISTING TOOLS ------------------
 
 @mcp.tool()
-def get_leave_balance(identifier: str) -> str:
+@executor.read
+@metrics.timed
+def get_leave_balance(identifier: str, output_format: OutputFormat = None) -> str:
     """Check how many leave days are left for the employee using employee_id or name"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT employee_id, leave_balance FROM employees WHERE employee_id = ?", (identifier,))
-    row = cursor.fetchone()
+    as_json = wants_json(output_format)
+    with get_db_connection() as conn:
+        row = resolve_employee(conn, identifier, ("employee_id", "leave_balance"))
     if not row:
-        cursor.execute("SELECT employee_id, leave_balance FROM employees WHERE LOWER(name) = LOWER(?)", (identifier,))
-        row = cursor.fetchone()
-    conn.close()
-    if row:
-        return f"Employee {row[0]} has {row[1]} leave days remaining."
-    return "Employee not found. Please check the ID or name."
+        return _error("Employee not found. Please check the ID or name.", as_json)
+    if as_json:
+        return to_json(LeaveBalance(employee_id=row[0], leave_balance=row[1]))
+    return f"Employee {row[0]} has {row[1]} leave days remaining."
 
 @mcp.tool()
-def apply_leave(identifier: str, leave_dates: List[str]) -> str:
+@writer.write
+@metrics.timed
+def apply_leave(identifier: str, leave_dates: List[str], output_format: OutputFormat = None) -> str:
     """
     Apply leave for specific dates (e.g., ["2025-04-17", "2025-05-01"])
     Accepts either employee ID or name as identifier.
+    Dates already on leave are skipped and not charged again.
+    The reply comes after the change is committed and logged under its request ID.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT employee_id, leave_balance, leave_history FROM employees WHERE employee_id = ?", (identifier,))
-    row = cursor.fetchone()
-    if not row:
-        cursor.execute("SELECT employee_id, leave_balance, leave_history FROM employees WHERE LOWER(name) = LOWER(?)", (identifier,))
-        row = cursor.fetchone()
-    if not row:
-        conn.close()
-        return "Employee not found. Please check the ID or name."
-    employee_id, balance, history = row
-    requested_days = len(leave_dates)
-    if balance < requested_days:
-        conn.close()
-        return f"Insufficient leave balance. You requested {requested_days} day(s) but have only {balance}."
-    new_balance = balance - requested_days
-    new_history = history.split(',') if history else []
-    new_history.extend(leave_dates)
-    updated_history = ','.join(new_history)
-    cursor.execute("""
-        UPDATE employees SET leave_balance = ?, leave_history = ? WHERE employee_id = ?
-    """, (new_balance, updated_history, employee_id))
-    conn.commit()
-    conn.close()
-    return f"Leave applied for {requested_days} day(s) for employee {employee_id}. Remaining balance: {new_balance}."
-
-@mcp.tool()
-def get_leave_history(identifier: str) -> str:
+    as_json = wants_json(output_format)
+    if not leave_dates:
+        return _error("No leave dates given. Pass one or more dates (YYYY-MM-DD).", as_json)
+    invalid = _invalid_dates(leave_dates)
+    if invalid:
+        return _error(f"Invalid leave date(s) {', '.join(map(repr, invalid))}: use YYYY-MM-DD.", as_json)
+    requested = list(dict.fromkeys(leave_dates))
+    request_id = uuid.uuid4().hex
+    with get_write_connection() as conn:
+        row = resolve_employee(conn, identifier)
+        if not row:
+            return _error("Employee not found. Please check the ID or name.", as_json)
+        employee_id = row[0]
+
+        def apply(conn):
+            taken = {d[0] for d in conn.execute(sql("leave.taken"), (employee_id, json.dumps(requested)))}
+            new_dates = [d for d in requested if d not in taken]
+            if new_dates:
+                # Check-and-deduct in one statement: no lost updates, no read-modify-write window
+                updated = conn.execute(sql("employee.deduct_leave"),
+                                       (len(new_dates), ','.join(new_dates), employee_id)).fetchone()
+                if updated:
+                    conn.executemany(sql("leave.insert"), [(employee_id, d) for d in new_dates])
+                    conn.execute(sql("events.append"), (employee_id, request_id, "apply", ','.join(new_dates),
+                                                        -len(new_dates), updated[0]))
+                    return new_dates, updated[0], True
+            balance = conn.execute(sql("employee.balance"), (employee_id,)).fetchone()[0]
+            return new_dates, balance, not new_dates
+
+        new_dates, balance, ok = writer.transaction(conn, apply)
+    if not ok:
+        return _error(f"Insufficient leave balance. You requested {len(new_dates)} day(s) but have only {balance}.", as_json)
+    if new_dates:
+        writer.after_commit(invalidate_employee, employee_id)
+    else:
+        request_id = None  # nothing changed, nothing logged
+    skipped = len(leave_dates) - len(new_dates)
+    if as_json:
+        return to_json(LeaveApplication(employee_id=employee_id, applied_dates=new_dates,
+                                        skipped_dates=skipped, remaining_balance=balance, request_id=request_id))
+    if not new_dates:
+        return f"No new leave applied for employee {employee_id}: all requested dates are already on leave. Remaining balance: {balance}."
+    note = f" Skipped {skipped} date(s) already on leave." if skipped else ""
+    return (f"Leave applied for {len(new_dates)} day(s) for employee {employee_id}. Remaining balance: {balance}.{note}"
+            f" Request ID: {request_id}.")
+
+@mcp.tool()
+@executor.read
+@metrics.timed
+def get_leave_history(identifier: str, output_format: OutputFormat = None) -> str:
     """Get leave history for the employee using employee ID or name"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT employee_id, leave_history FROM employees WHERE employee_id = ?", (identifier,))
-    row = cursor.fetchone()
-    if not row:
-        cursor.execute("SELECT employee_id, leave_history FROM employees WHERE LOWER(name) = LOWER(?)", (identifier,))
-        row = cursor.fetchone()
-    conn.close()
-    if not row:
-        return "Employee not found. Please check the ID or name."
-    employee_id, history = row
-    if not history:
+    as_json = wants_json(output_format)
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        row = resolve_employee(conn, identifier)
+        if not row:
+            return _error("Employee not found. Please check the ID or name.", as_json)
+        employee_id = row[0]
+        cursor.execute(sql("leave.history"), (employee_id,))
+        days = [d[0] for d in cursor.fetchall()]
+    if as_json:
+        return to_json(LeaveHistory(employee_id=employee_id, leave_dates=days))
+    if not days:
         return f"Leave history for {employee_id}: No leaves taken."
-    return f"Leave history for {employee_id}: {history}"
+    return f"Leave history for {employee_id}: {','.join(days)}"
 
 @mcp.tool()
-def get_employee_info(employee_id: Optional[str] = None, name: Optional[str] = None) -> str:
-    """Retrieve comprehensive information about an employee by ID or Name."""
+@executor.read
+@metrics.timed
+def get_employee_info(employee_id: Optional[str] = None, name: Optional[str] = None,
+                      fields: Optional[List[str]] = None, output_format: OutputFormat = None) -> str:
+    """
+    Retrieve comprehensive information about an employee by ID or Name.
+    Pass fields (e.g. ["name", "department"]) to fetch only those columns.
+    """
+    as_json = wants_json(output_format)
     if not employee_id and not name:
-        return "Please provide either employee_id or name to retrieve information."
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    if employee_id:
-        cursor.execute("SELECT * FROM employees WHERE employee_id = ?", (employee_id,))
-    elif name:
-        cursor.execute("SELECT * FROM employees WHERE name LIKE ?", (f"%{name}%",))
-    row = cursor.fetchone()
-    if not row:
-        conn.close()
-        return "Employee not found."
-    columns = [description[0] for description in cursor.description]
-    conn.close()
-    employee_data = dict(zip(columns, row))
-    info_lines = [f"{key.replace('_', ' ').title()}: {value}" for key, value in employee_data.items()]
-    return "\n".join(info_lines)
+        return _error("Please provide either employee_id or name to retrieve information.", as_json)
+    columns = employee_fields(fields)
+    with get_db_connection() as conn:
+        if not employee_id:
+            # Exact (case-insensitive) name first, then the best partial-name match
+            row = resolve_employee(conn, name)
+            if row:
+                employee_id = row[0]
+            else:
+                matches = search_employee_names(conn, name, limit=1)
+                employee_id = matches[0] if matches else None
+        key = ("employee", employee_id)
+        if not employee_id:
+            employee = None
+        elif fields:
+            # Projection: serve from a cached full record, else fetch just these columns
+            employee = cache.get(key) or _employee_record(conn, employee_id, columns)
+        else:
+            employee = cache.get_or_load(key, lambda: _employee_record(conn, employee_id))
+    if not employee:
+        return _error("Employee not found.", as_json)
+    if as_json:
+        return to_json({field: employee[field] for field in columns})
+    return "\n".join(f"{EMPLOYEE_LABELS[field]}: {employee[field]}" for field in columns)
 
 # ----------------- NEW TOOLS ------------------
 
 @mcp.tool()
-def get_employee_projects(identifier: str) -> str:
-    """List all projects assigned to an employee by employee_id or name."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT employee_id FROM employees WHERE employee_id = ? OR LOWER(name) = LOWER(?)", (identifier, identifier))
-    row = cursor.fetchone()
-    if not row:
-        conn.close()
-        return "Employee not found. Please check the ID or name."
-    employee_id = row[0]
-    cursor.execute("SELECT project_id, project_name, start_date, end_date, role, status FROM projects WHERE employee_id = ?", (employee_id,))
-    projects = cursor.fetchall()
-    conn.close()
+@executor.read
+@metrics.timed
+def get_employee_projects(identifier: str, limit: PageLimit = DEFAULT_LIMIT, cursor: PageCursor = None,
+                          output_format: OutputFormat = None) -> str:
+    """List all projects assigned to an employee by employee_id or name (paginated by project ID)."""
+    as_json = wants_json(output_format)
+    with get_db_connection() as conn:
+        row = resolve_employee(conn, identifier)
+        if not row:
+            return _error("Employee not found. Please check the ID or name.", as_json)
+        employee_id = row[0]
+        scope = f"employee_projects:{employee_id}"
+        projects, more = page_list(cache.get_or_load(("employee_projects", employee_id),
+                                                     lambda: _employee_project_rows(conn, employee_id)),
+                                   decode_cursor(scope, cursor), limit)
+    next_cursor = encode_cursor(scope, projects[-1][0]) if more else None
+    if as_json:
+        return to_json({"employee_id": employee_id, "projects": records_from_rows(ProjectAssignment, projects),
+                        "next_cursor": next_cursor})
     if not projects:
         return f"No projects found for employee {employee_id}."
     lines = [f"Project ID: {p[0]}, Name: {p[1]}, Role: {p[4]}, Status: {p[5]}, Start: {p[2]}, End: {p[3]}" for p in projects]
-    return "\n".join(lines)
+    return "\n".join(lines) + more_hint(next_cursor)
 
 @mcp.tool()
-def get_project_employees(project_identifier: str) -> str:
-    """List all employees assigned to a project by project_id or project_name."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT project_id FROM projects WHERE project_id = ? OR project_name = ?", (project_identifier, project_identifier))
-    row = cursor.fetchone()
-    if not row:
-        conn.close()
-        return "Project not found. Please check the ID or name."
-    project_id = row[0]
-    cursor.execute("""
-        SELECT e.employee_id, e.name, p.role
-        FROM employees e
-        JOIN projects p ON e.employee_id = p.employee_id
-        WHERE p.project_id = ?
-    """, (project_id,))
-    employees = cursor.fetchall()
-    conn.close()
+@executor.read
+@metrics.timed
+def get_project_employees(project_identifier: str, limit: PageLimit = DEFAULT_LIMIT, cursor: PageCursor = None,
+                          output_format: OutputFormat = None, ctx: Context = None) -> str:
+    """
+    List all employees assigned to a project, given its name or any of its project IDs
+    (paginated by employee ID).
+    """
+    as_json = wants_json(output_format)
+    with get_db_connection() as conn:
+        row = conn.execute(sql("project.resolve"), (project_identifier,)).fetchone()
+        if not row:
+            return _error("Project not found. Please check the ID or name.", as_json)
+        project_key, project_name = row
+        scope = f"project_employees:{project_key}"
+        after = tuple(decode_cursor(scope, cursor, first=("", "")))
+        employees, more = cache.get_or_load(("project_employees", project_key, after, limit), lambda: fetch_page(
+            conn.execute(sql("project.members"), (project_key, *after, limit + 1)), limit, _progress(ctx)))
+    next_cursor = encode_cursor(scope, [employees[-1][0], employees[-1][3]]) if more else None
+    if as_json:
+        return to_json({"project_name": project_name, "employees": records_from_rows(ProjectMember, employees),
+                        "next_cursor": next_cursor})
     if not employees:
-        return f"No employees found for project {project_id}."
-    lines = [f"Employee ID: {e[0]}, Name: {e[1]}, Role: {e[2]}" for e in employees]
-    return "\n".join(lines)
-
-@mcp.tool()
-def get_employees_on_leave(date: str) -> str:
-    """List all employees who are on leave on a given date (YYYY-MM-DD)."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT employee_id, name, leave_history FROM employees")
-    rows = cursor.fetchall()
-    conn.close()
-    on_leave = []
-    for emp_id, name, history in rows:
-        if history and date in history.split(','):
-            on_leave.append(f"{emp_id} ({name})")
-    if not on_leave:
+        return f"No employees found for project {project_name}."
+    lines = [f"Employee ID: {e[0]}, Name: {e[1]}, Role: {e[2]}, Project ID: {e[3]}" for e in employees]
+    return f"Employees on {project_name}:\n" + "\n".join(lines) + more_hint(next_cursor)
+
+@mcp.tool()
+@executor.read
+@metrics.timed
+def get_employees_on_leave(date: str, limit: PageLimit = DEFAULT_LIMIT, cursor: PageCursor = None,
+                           output_format: OutputFormat = None, ctx: Context = None) -> str:
+    """List all employees who are on leave on a given date (YYYY-MM-DD), paginated by employee ID."""
+    as_json = wants_json(output_format)
+    scope = f"on_leave:{date}"
+    after = decode_cursor(scope, cursor)
+    with get_db_connection() as conn:
+        rows, more = fetch_page(conn.execute(sql("leave.on_date"), (date, after, limit + 1)), limit, _progress(ctx))
+    next_cursor = encode_cursor(scope, rows[-1][0]) if more else None
+    if as_json:
+        return to_json({"date": date, "employees": records_from_rows(EmployeeRef, rows), "next_cursor": next_cursor})
+    if not rows:
         return f"No employees are on leave on {date}."
-    return f"Employees on leave on {date}: " + ", ".join(on_leave)
+    return (f"Employees on leave on {date}: " + ", ".join(f"{emp_id} ({name})" for emp_id, name in rows)
+            + more_hint(next_cursor))
+
+# Ranges with fewer leave rows than this are paged off the date index, wider ones off the primary key
+BETWEEN_INDEX_ROWS = 5000
 
 @mcp.tool()
-def get_project_history_for_employee(identifier: str) -> str:
-    """Show all projects (with dates and roles) an employee has been assigned to."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT employee_id FROM employees WHERE employee_id = ? OR LOWER(name) = LOWER(?)", (identifier, identifier))
-    row = cursor.fetchone()
-    if not row:
-        conn.close()
-        return "Employee not found. Please check the ID or name."
-    employee_id = row[0]
-    cursor.execute("SELECT project_name, start_date, end_date, role, status FROM projects WHERE employee_id = ?", (employee_id,))
-    projects = cursor.fetchall()
-    conn.close()
+@executor.read
+@metrics.timed
+def get_employees_on_leave_between(start_date: str, end_date: str, limit: PageLimit = DEFAULT_LIMIT,
+                                   cursor: PageCursor = None, output_format: OutputFormat = None,
+                                   ctx: Context = None) -> str:
+    """List employees with leave between two dates inclusive (YYYY-MM-DD), with their days off in the range."""
+    as_json = wants_json(output_format)
+    invalid = _invalid_dates([start_date, end_date])
+    if invalid:
+        return _error(f"Invalid date(s) {', '.join(map(repr, invalid))}: use YYYY-MM-DD.", as_json)
+    if start_date > end_date:
+        return _error("end_date must be on or after start_date.", as_json)
+    scope = f"on_leave_between:{start_date}:{end_date}"
+    after = decode_cursor(scope, cursor)
+    with get_db_connection() as conn:
+        range_rows = conn.execute(sql("leave.range_rows"), (start_date, end_date, BETWEEN_INDEX_ROWS)).fetchone()[0]
+        by = "employee" if range_rows >= BETWEEN_INDEX_ROWS else "date"
+        ids, more = fetch_page(conn.execute(sql(f"leave.between_ids_by_{by}"), (start_date, end_date, after, limit + 1)),
+                               limit, _progress(ctx))
+        rows = conn.execute(sql("leave.between_days"),
+                            (json.dumps([i for i, in ids]), start_date, end_date)).fetchall() if ids else []
+    next_cursor = encode_cursor(scope, ids[-1][0]) if more else None
+    if as_json:
+        return to_json({"start_date": start_date, "end_date": end_date,
+                        "employees": [EmployeeOnLeave(employee_id=emp_id, name=name, leave_dates=days.split(','))
+                                      for emp_id, name, days in rows],
+                        "next_cursor": next_cursor})
+    if not rows:
+        return f"No employees are on leave between {start_date} and {end_date}."
+    lines = [f"{emp_id} ({name}): {days}" for emp_id, name, days in rows]
+    return (f"Employees on leave between {start_date} and {end_date}:\n" + "\n".join(lines)
+            + more_hint(next_cursor))
+
+@mcp.tool()
+@executor.read
+@metrics.timed
+def get_project_history_for_employee(identifier: str, limit: PageLimit = DEFAULT_LIMIT, cursor: PageCursor = None,
+                                     output_format: OutputFormat = None) -> str:
+    """Show all projects (with dates and roles) an employee has been assigned to (paginated by project ID)."""
+    as_json = wants_json(output_format)
+    with get_db_connection() as conn:
+        row = resolve_employee(conn, identifier)
+        if not row:
+            return _error("Employee not found. Please check the ID or name.", as_json)
+        employee_id = row[0]
+        scope = f"project_history:{employee_id}"
+        projects, more = page_list(cache.get_or_load(("employee_projects", employee_id),
+                                                     lambda: _employee_project_rows(conn, employee_id)),
+                                   decode_cursor(scope, cursor), limit)
+    next_cursor = encode_cursor(scope, projects[-1][0]) if more else None
+    if as_json:
+        return to_json({"employee_id": employee_id, "projects": records_from_rows(ProjectAssignment, projects),
+                        "next_cursor": next_cursor})
     if not projects:
         return f"No project history found for employee {employee_id}."
-    lines = [f"{p[0]}: {p[3]} ({p[1]} to {p[2]}, Status: {p[4]})" for p in projects]
-    return "\n".join(lines)
+    lines = [f"{p[1]}: {p[4]} ({p[2]} to {p[3]}, Status: {p[5]})" for p in projects]
+    return "\n".join(lines) + more_hint(next_cursor)
+
+# ----------------- BATCH TOOLS ------------------
+
+class LeaveRequest(TypedDict):
+    identifier: str
+    dates: List[str]
+
+@mcp.tool()
+@executor.read
+@metrics.timed
+def get_leave_balances(identifiers: List[str]) -> str:
+    """Check remaining leave days for many employees (IDs or names) in one call."""
+    with get_db_connection() as conn:
+        rows = resolve_employees(conn, identifiers, ("employee_id", "leave_balance"))
+    results = []
+    for identifier, row in zip(identifiers, rows):
+        if row:
+            results.append({"identifier": identifier, "employee_id": row["employee_id"],
+                            "leave_balance": row["leave_balance"]})
+        else:
+            results.append({"identifier": identifier, "error": "Employee not found."})
+    return to_json({"results": results})
+
+@mcp.tool()
+@executor.read
+@metrics.timed
+def get_employees_info(ids: List[str], fields: Optional[List[str]] = None) -> str:
+    """Retrieve records for many employees (IDs or names) in one call; fields limits the columns returned."""
+    with get_db_connection() as conn:
+        rows = resolve_employees(conn, ids, employee_fields(fields))
+    return to_json({"results": [{"identifier": identifier, **row} if row else
+                                {"identifier": identifier, "error": "Employee not found."}
+                                for identifier, row in zip(ids, rows)]})
+
+@mcp.tool()
+@writer.write
+@metrics.timed
+def apply_leave_bulk(requests: List[LeaveRequest]) -> str:
+    """
+    Apply leave for many employees in one transaction,
+    e.g. [{"identifier": "E001", "dates": ["2025-04-17"]}, ...].
+    Each request succeeds or fails on its own; the result list follows the input order.
+    """
+    request_id = uuid.uuid4().hex
+    with get_write_connection() as conn:
+        rows = resolve_employees(conn, [r["identifier"] for r in requests])
+        employee_ids = sorted({row["employee_id"] for row in rows if row})
+
+        def apply(conn):
+            ids_json = json.dumps(employee_ids)
+            balances = dict(conn.execute(sql("employee.balances"), (ids_json,)).fetchall())
+            taken = set(conn.execute(sql("leave.taken_many"), (ids_json,)).fetchall())
+            added, results = {}, []
+            for request, row in zip(requests, rows):
+                if not row:
+                    results.append({"identifier": request["identifier"], "error": "Employee not found."})
+                    continue
+                employee_id = row["employee_id"]
+                if not request["dates"]:
+                    results.append({"identifier": request["identifier"], "employee_id": employee_id,
+                                    "error": "No leave dates given. Pass one or more dates (YYYY-MM-DD)."})
+                    continue
+                invalid = _invalid_dates(request["dates"])
+                if invalid:
+                    results.append({"identifier": request["identifier"], "employee_id": employee_id,
+                                    "error": f"Invalid leave date(s) {', '.join(map(repr, invalid))}: use YYYY-MM-DD."})
+                    continue
+                new_dates = [d for d in dict.fromkeys(request["dates"]) if (employee_id, d) not in taken]
+                if balances[employee_id] < len(new_dates):
+                    results.append({"identifier": request["identifier"], "employee_id": employee_id,
+                                    "error": f"Insufficient leave balance. Requested {len(new_dates)} day(s) but only {balances[employee_id]} left."})
+                    continue
+                taken.update((employee_id, d) for d in new_dates)
+                added.setdefault(employee_id, []).extend(new_dates)
+                balances[employee_id] -= len(new_dates)
+                results.append({"identifier": request["identifier"], "employee_id": employee_id,
+                                "applied_days": len(new_dates), "skipped_days": len(request["dates"]) - len(new_dates),
+                                "remaining_balance": balances[employee_id]})
+            conn.executemany(sql("employee.deduct_leave_unchecked"),
+                             [(len(days), ','.join(days), e) for e, days in added.items() if days])
+            conn.executemany(sql("leave.insert"), [(e, d) for e, days in added.items() for d in days])
+            conn.executemany(sql("events.append"), [(e, request_id, "apply", ','.join(days), -len(days), balances[e])
+                                                    for e, days in added.items() if days])
+            return added, results
+
+        added, results = writer.transaction(conn, apply)
+    writer.after_commit(invalidate_employee, *added)
+    return to_json({"request_id": request_id if any(added.values()) else None, "results": results})
+
+# ----------------- LEAVE LOG TOOLS ------------------
+
+@mcp.tool()
+@executor.read
+@metrics.timed
+def verify_leave_log(identifier: Optional[str] = None, limit: PageLimit = DEFAULT_LIMIT, cursor: PageCursor = None,
+                     output_format: OutputFormat = None) -> str:
+    """
+    Check leave balances against the append-only leave event log.
+    With an employee ID or name: that employee's events (paginated), the balance derived from them and any break in the log.
+    Without: every employee whose stored balance differs from the log, paginated by employee ID.
+    """
+    as_json = wants_json(output_format)
+    if not identifier:
+        after = decode_cursor("leave_log", cursor)
+        with get_db_connection() as conn:
+            rows, more = fetch_page(conn.execute(sql("events.mismatches"), (after, limit + 1)), limit)
+        next_cursor = encode_cursor("leave_log", rows[-1][0]) if more else None
+        if as_json:
+            return to_json({"mismatches": [{"employee_id": e, "leave_balance": b, "derived_balance": d}
+                                           for e, b, d in rows], "next_cursor": next_cursor})
+        if not rows:
+            return "All leave balances match the leave event log."
+        return ("Balances that differ from the leave event log:\n"
+                + "\n".join(f"{e}: balance {b}, log says {'no events' if d is None else d}" for e, b, d in rows)
+                + more_hint(next_cursor))
+
+    with get_db_connection() as conn:
+        row = resolve_employee(conn, identifier, ("employee_id", "leave_balance"))
+        if not row:
+            return _error("Employee not found. Please check the ID or name.", as_json)
+        employee_id, balance = row
+        scope = f"leave_log:{employee_id}"
+        after = decode_cursor(scope, cursor, first=0)
+        events, more = fetch_page(conn.execute(sql("events.for_employee"), (employee_id, after, limit + 1)), limit)
+        derived, total = conn.execute(sql("events.derived_balance"), (employee_id,)).fetchone()
+        broken = [r[0] for r in conn.execute(sql("events.broken_chain"), (employee_id,))]
+    next_cursor = encode_cursor(scope, events[-1][0]) if more else None
+    consistent = total > 0 and derived == balance and not broken
+    if as_json:
+        return to_json({"employee_id": employee_id, "leave_balance": balance, "derived_balance": derived,
+                        "events_total": total, "consistent": consistent, "broken_events": broken,
+                        "events": [LeaveEvent(event_id=ev[0], request_id=ev[1], kind=ev[2],
+                                              leave_dates=ev[3].split(',') if ev[3] else [], delta=ev[4],
+                                              balance_after=ev[5], created_at=ev[6]) for ev in events],
+                        "next_cursor": next_cursor})
+    status = ("consistent with the log" if consistent else
+              f"NOT consistent with the log (derived balance {derived}"
+              + (f", events out of sequence: {', '.join(map(str, broken))}" if broken else "") + ")")
+    lines = [f"{ev[6]} {ev[2]} {ev[4]:+d} -> {ev[5]}" + (f" [{ev[3]}]" if ev[3] else "") + f" (request {ev[1]})"
+             for ev in events]
+    return (f"Leave balance for {employee_id} is {balance}, {status}. {total} event(s):\n" + "\n".join(lines)
+            + more_hint(next_cursor))
+
+# ----------------- SEARCH TOOLS ------------------
+
+@mcp.tool()
+@executor.read
+@metrics.timed
+def search_directory(query: str, limit: PageLimit = DEFAULT_LIMIT, output_format: OutputFormat = None) -> str:
+    """
+    Free-text search over employees (name, position, department, certifications, location, shift and
+    their project names/roles) and projects, best matches first, e.g. "AWS night shift data engineers in Sales".
+    """
+    as_json = wants_json(output_format)
+    with get_db_connection() as conn:
+        if not directory_enabled(conn):
+            return _error("Directory search is unavailable: this SQLite build has no FTS5.", as_json)
+        rows, matched = find_matches(conn, query, limit)
+    if as_json:
+        return to_json({"matched": matched, "results": records_from_rows(DirectoryHit, rows)})
+    if not rows:
+        return f"No directory entries match {query!r}."
+    header = "" if matched == "all" else "No entry matches every word; closest matches:\n"
+    return header + "\n".join(f"{kind.title()} {ref}: {name}"
+                               + (f" ({position}, {department})" if kind == "employee" else "") + f" - {snippet}"
+                               for kind, ref, name, department, position, snippet, _ in rows)
+
+# ----------------- STAFFING TOOLS ------------------
+
+# In-memory bitmaps per department/shift/status/certification, rebuilt only when staffing_version moves
+staffing = SnapshotCache(min_refresh=0, loader=load_bitmap_index, version_sql=sql("staffing.version"))
+
+# Extra keys are let through validation so find_employees can reject them by name instead of dropping them
+@with_config(ConfigDict(extra="allow"))
+class EmployeeFilters(TypedDict, total=False):
+    department: List[str]
+    shift: List[str]
+    status: List[str]
+    certifications: List[str]
+
+@mcp.tool()
+@executor.read
+@metrics.timed
+def find_employees(filters: EmployeeFilters, limit: PageLimit = DEFAULT_LIMIT, cursor: PageCursor = None,
+                   output_format: OutputFormat = None) -> str:
+    """
+    Find employees by department, shift, status and certifications, paginated by employee ID.
+    Each filter takes a list: an employee matches any listed department/shift/status and must hold every
+    listed certification, e.g. {"department": ["Sales"], "shift": ["Night"], "certifications": ["AWS", "GCP"]}.
+    """
+    as_json = wants_json(output_format)
+    extra = [key for key in filters if key not in EmployeeFilters.__annotations__]
+    if extra:
+        return _error(f"Unknown filter(s) {', '.join(map(repr, extra))}; "
+                      f"filter on {', '.join(EmployeeFilters.__annotations__)}.", as_json)
+    pool.ensure_setup()  # the bitmap loader reads through its own connection; migrate through the pool first
+    index = staffing.get(pool.db_path)
+    selected, unknown = index.select(filters)
+    scope = "find_employees:" + json.dumps(filters, sort_keys=True)
+    positions, more = index.page(selected, decode_cursor(scope, cursor), limit)
+    employees = [EmployeeRef(employee_id=index.ids[p], name=index.names[p]) for p in positions]
+    next_cursor = encode_cursor(scope, employees[-1]["employee_id"]) if more else None
+    total = selected.bit_count()
+    if as_json:
+        return to_json({"total": total, "employees": employees, "unknown_values": unknown, "next_cursor": next_cursor})
+    notes = "".join(f"\nUnknown {attribute} {', '.join(map(repr, values))}; known: {', '.join(index.values(attribute))}"
+                    for attribute, values in unknown.items())
+    if not total:
+        return "No employees match these filters." + notes
+    return (f"{total} employee(s) match:\n" + "\n".join(f"{e['employee_id']}: {e['name']}" for e in employees)
+            + notes + more_hint(next_cursor))
+
+# ----------------- CAPACITY TOOLS ------------------
+
+CAPACITY_DIMENSIONS = ("department", "location", "shift")
+MAX_CAPACITY_DAYS = 366
+
+@mcp.tool()
+@executor.read
+@metrics.timed
+def get_team_capacity(start_date: str, end_date: str, department: Optional[str] = None,
+                      location: Optional[str] = None, shift: Optional[str] = None,
+                      group_by: Optional[List[Literal["department", "location", "shift"]]] = None,
+                      output_format: OutputFormat = None) -> str:
+    """
+    Day-by-day headcount of Active employees, those on leave and those available between two dates (YYYY-MM-DD),
+    e.g. how many AI/ML engineers are available next week. Optionally filter by department,
+    location or shift; group_by picks the breakdown (default ["department"], [] for one total).
+    """
+    as_json = wants_json(output_format)
+    invalid = _invalid_dates([start_date, end_date])
+    if invalid:
+        return _error(f"Invalid date(s) {', '.join(map(repr, invalid))}: use YYYY-MM-DD.", as_json)
+    days = (datetime.strptime(end_date, "%Y-%m-%d") - datetime.strptime(start_date, "%Y-%m-%d")).days + 1
+    if days < 1 or days > MAX_CAPACITY_DAYS:
+        return _error(f"end_date must be on or after start_date and at most {MAX_CAPACITY_DAYS} days later.", as_json)
+    dimensions = [d for d in CAPACITY_DIMENSIONS if d in (["department"] if group_by is None else group_by)]
+    with get_db_connection() as conn:
+        rows = conn.execute(sql("capacity.by_day"), (start_date, end_date, department, location, shift,
+                                                     *(d in dimensions for d in CAPACITY_DIMENSIONS))).fetchall()
+    # rows: (day, department, location, shift, headcount, on_leave); ungrouped columns are ''
+    positions = [CAPACITY_DIMENSIONS.index(d) + 1 for d in dimensions]
+    if as_json:
+        return to_json({"start_date": start_date, "end_date": end_date, "group_by": dimensions,
+                        "capacity": [{"date": r[0], **{d: r[p] for d, p in zip(dimensions, positions)},
+                                      "headcount": r[4], "on_leave": r[5], "available": r[4] - r[5]}
+                                     for r in rows]})
+    if not rows:
+        return "No employees match these filters."
+    lines, current = [], None
+    for r in rows:
+        if r[0] != current:
+            current = r[0]
+            lines.append(f"{current}:")
+        label = " / ".join(r[p] or "(none)" for p in positions) or "All"
+        lines.append(f"  {label}: {r[4] - r[5]} of {r[4]} available ({r[5]} on leave)")
+    return f"Team capacity from {start_date} to {end_date}:\n" + "\n".join(lines)
+
+# ----------------- ANALYTICS TOOLS ------------------
+
+# Columnar employee snapshots (NumPy), reloaded only after the database changes
+snapshots = SnapshotCache(min_refresh=float(os.environ.get("LEAVE_ANALYTICS_MIN_REFRESH", "1.0")))
+
+AnalyticsDimension = Literal["department", "status", "location", "shift"]
+
+def _snapshot():
+    if load_numpy() is None:
+        return None
+    pool.ensure_setup()  # the snapshot reader has its own connection; migrate through the pool first
+    return snapshots.get(pool.db_path)
+
+NUMPY_MISSING = "Analytics tools need NumPy: install the project with the 'analytics' extra (pip install numpy)."
+
+def _stats_line(label: str, stats: dict) -> str:
+    return (f"{label}: n={stats['count']}, mean={stats['mean']}, min={stats['min']}, "
+            + ", ".join(f"{k}={v}" for k, v in stats.items() if k.startswith("p")) + f", max={stats['max']}")
+
+@mcp.tool()
+@executor.read
+@metrics.timed
+def get_compensation_stats(group_by: Optional[List[AnalyticsDimension]] = None,
+                           output_format: OutputFormat = None) -> str:
+    """Salary and performance rating distributions (mean, min, quartiles, max) by department or other groups."""
+    as_json = wants_json(output_format)
+    dims = ["department"] if group_by is None else list(dict.fromkeys(group_by))
+    snapshot = _snapshot()
+    if snapshot is None:
+        return _error(NUMPY_MISSING, as_json)
+    salary = grouped_stats(snapshot, "salary", dims)
+    rating = grouped_stats(snapshot, "performance_rating", dims)
+    if as_json:
+        return to_json({"group_by": dims, "salary": salary, "performance_rating": rating})
+    label = lambda row: " / ".join(row[d] or "(none)" for d in dims) or "All employees"
+    return ("Salary:\n" + "\n".join(_stats_line(label(r), r) for r in salary)
+            + "\nPerformance rating:\n" + "\n".join(_stats_line(label(r), r) for r in rating))
+
+@mcp.tool()
+@executor.read
+@metrics.timed
+def get_leave_usage(percentiles: Optional[List[float]] = None, group_by: Optional[List[AnalyticsDimension]] = None,
+                    output_format: OutputFormat = None) -> str:
+    """Percentiles of leave days taken and leave balance left, org-wide or by group (default p50/p75/p90/p95/p99)."""
+    as_json = wants_json(output_format)
+    pcts = percentiles or [50, 75, 90, 95, 99]
+    if any(not 0 <= p <= 100 for p in pcts):
+        return _error("Percentiles must be between 0 and 100.", as_json)
+    dims = list(dict.fromkeys(group_by or []))
+    snapshot = _snapshot()
+    if snapshot is None:
+        return _error(NUMPY_MISSING, as_json)
+    used = grouped_stats(snapshot, "leave_used", dims, pcts)
+    balance = grouped_stats(snapshot, "leave_balance", dims, pcts)
+    if as_json:
+        return to_json({"group_by": dims, "leave_used": used, "leave_balance": balance})
+    label = lambda row: " / ".join(row[d] or "(none)" for d in dims) or "All employees"
+    return ("Leave days taken:\n" + "\n".join(_stats_line(label(r), r) for r in used)
+            + "\nLeave balance left:\n" + "\n".join(_stats_line(label(r), r) for r in balance))
+
+@mcp.tool()
+@executor.read
+@metrics.timed
+def get_headcount(group_by: Optional[List[AnalyticsDimension]] = None, limit: PageLimit = DEFAULT_LIMIT,
+                  output_format: OutputFormat = None) -> str:
+    """Employee counts by status and location (or other groups), largest groups first, up to limit groups."""
+    as_json = wants_json(output_format)
+    dims = ["status", "location"] if group_by is None else list(dict.fromkeys(group_by))
+    snapshot = _snapshot()
+    if snapshot is None:
+        return _error(NUMPY_MISSING, as_json)
+    groups = group_counts(snapshot, dims)
+    if as_json:
+        return to_json({"group_by": dims, "total": snapshot.rows, "groups": groups[:limit],
+                        "truncated": len(groups) > limit})
+    lines = [f"{' / '.join(g[d] or '(none)' for d in dims) or 'All employees'}: {g['count']}" for g in groups[:limit]]
+    more = f"\n... {len(groups) - limit} more group(s); raise limit to see them." if len(groups) > limit else ""
+    return f"Headcount ({snapshot.rows} employees):\n" + "\n".join(lines) + more
+
+# ----------------- ADMIN TOOLS ------------------
+
+def _snapshot_path(name: str) -> str:
+    """``name`` resolved inside SNAPSHOT_DIR; anything pointing outside it is rejected."""
+    root = os.path.abspath(SNAPSHOT_DIR)
+    path = os.path.abspath(os.path.join(root, name))
+    if not name or os.path.commonpath([root, path]) != root or path == root:
+        raise ValueError(f"Snapshot names are paths inside {root}.")
+    return path
+
+@mcp.tool()
+@executor.read
+@metrics.timed
+def snapshot_database(action: Literal["backup", "export", "import"], name: str, tables: Optional[List[str]] = None,
+                      target: Optional[str] = None, replace: bool = False, output_format: OutputFormat = None,
+                      ctx: Context = None) -> str:
+    """
+    Admin: snapshot the live database without stopping the server. Names are paths inside LEAVE_SNAPSHOT_DIR.
+    backup: online copy to the SQLite file <name>, taken with the backup API in page batches.
+    export: tables (default: all) to gzip-compressed columnar chunks in directory <name>.
+    import: load export <name> (optionally only tables) into the database file <target>, built with the full schema if
+    missing, in one transaction; replace clears those tables first (refused for the append-only leave_events).
+    Reports rows/bytes throughput and, for backups, how long each step held the database.
+    """
+    as_json = wants_json(output_format)
+    try:
+        path = _snapshot_path(name)
+        if action == "import":
+            if not target:
+                return _error("Import needs a target database name.", as_json)
+            target_path = _snapshot_path(target)
+            if os.path.abspath(target_path) == os.path.abspath(pool.db_path):
+                return _error("Import into the live database is not supported; import into a copy.", as_json)
+            stats = import_database(path, target_path, tables, replace, _progress(ctx))
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Reads the primary through its own read-only connection, never a pooled one
+            conn = sqlite3.connect(readonly_uri(pool.db_path), uri=True, check_same_thread=False)
+            try:
+                if action == "backup":
+                    stats = backup_database(conn, path, progress=_progress(ctx))
+                else:
+                    stats = export_tables(conn, path, tables, progress=_progress(ctx))
+            finally:
+                conn.close()
+    except (OSError, ValueError, sqlite3.Error) as exc:
+        return _error(f"Snapshot {action} failed: {exc}", as_json)
+    if as_json:
+        return to_json({"action": action, **stats})
+    if action == "backup":
+        return (f"Backed up {stats['bytes'] / 1e6:.1f} MB to {stats['path']} in {stats['seconds']}s "
+                f"({stats['mb_per_second']} MB/s): {stats['steps']} step(s) of {stats['pages_per_step']} pages, "
+                f"longest step {stats['max_step_ms']} ms, average {stats['avg_step_ms']} ms, "
+                f"{stats['restarts']} restart(s) after concurrent writes"
+                + (", finished in a single step" if stats["single_step_fallback"] else "") + ".")
+    verb = "Exported" if action == "export" else "Imported"
+    lines = [f"{table}: {t['rows']} rows in {t['chunks']} chunk(s), {t['bytes'] / 1e6:.2f} MB, "
+             f"{t['rows_per_second']} rows/s" for table, t in stats["tables"].items()]
+    rebuilt = (f"\nRebuilt {', '.join(stats['rebuilt'])} from the imported rows in {stats['rebuild_seconds']}s."
+               if action == "import" else "")
+    return (f"{verb} {stats['rows']} rows ({stats['bytes'] / 1e6:.1f} MB compressed) in {stats['seconds']}s, "
+            f"{stats['rows_per_second']} rows/s:\n" + "\n".join(lines) + rebuilt)
 
 # ----------------- RESOURCES ------------------
 
@@ -190,8 +862,74 @@ def get_greeting(name: str) -> str:
     """Get a personalized greeting"""
     return f"Hello, {name}! How can I assist you with leave management today?"
 
+@mcp.resource("pool://stats")
+def get_pool_stats() -> dict:
+    """Primary connection pool counters: checkouts, waits, timeouts and peak connections in use"""
+    return pool.stats()
+
+@mcp.resource("replicas://stats")
+def get_replica_stats() -> dict:
+    """Read replica routing: per-replica pool counters and copy sync times (empty without replicas)"""
+    return readers.stats() if isinstance(readers, ReplicaSet) else {}
+
+@mcp.resource("cache://stats")
+def get_cache_stats() -> dict:
+    """Lookup cache counters: hits, misses, evictions, expirations and invalidations"""
+    return cache.stats()
+
+@mcp.resource("executor://stats")
+def get_executor_stats() -> dict:
+    """Async execution counters: reads served and active, plus group-committed writes, batches and queued writes"""
+    writes = writer.stats()
+    return {**executor.stats(), "writes": writes["writes"], "write_batches": writes["batches"],
+            "avg_write_batch": writes["avg_batch"], "writes_queued": writes["queued"],
+            "peak_writes_queued": writes["peak_queued"]}
+
+@mcp.resource("writes://stats")
+def get_write_stats() -> dict:
+    """Group commit counters: batches, writes per batch, failed writes and time spent committing"""
+    return writer.stats()
+
+@mcp.resource("analytics://stats")
+def get_analytics_stats() -> dict:
+    """Columnar snapshot counters: loads, reuse hits, load time and the loaded data_version"""
+    return snapshots.stats()
+
+@mcp.resource("staffing://stats")
+def get_staffing_stats() -> dict:
+    """Staffing bitmap index counters: builds, reuse hits, build time and the loaded staffing_version"""
+    return staffing.stats()
+
+@mcp.resource("metrics://tools")
+@executor.read
+def get_tool_metrics() -> dict:
+    """Per-tool calls, DB vs formatting time, rows and the slowest statements with their query plans"""
+    with get_db_connection() as conn:
+        return metrics.snapshot(conn)
+
+@mcp.resource("metrics://prometheus", mime_type="text/plain")
+def get_prometheus_metrics() -> str:
+    """Per-tool counters and latency histograms in Prometheus text format"""
+    return metrics.prometheus()
+
+@mcp.resource("startup://stats")
+def get_startup_stats() -> dict:
+    """Startup milestones (ms since the server began loading) and schema check / migration / plan check durations"""
+    return startup_timer.stats()
+
+@mcp.resource("queries://plans")
+@executor.read
+def get_query_plans() -> dict:
+    """EXPLAIN QUERY PLAN for every registered statement, with any full scans of large tables"""
+    with get_db_connection() as conn:
+        return plan_report(conn)
+
 # ----------------- RUN SERVER ------------------
 
+startup_timer.mark("tools_registered")
+
 if __name__ == "__main__":
-    print("Current working directory:", os.getcwd())
+    apply_cli()
+    log.info("Serving %s (working directory %s)", pool.db_path, os.getcwd())
+    start_warm_up()
     mcp.run()
@@ -0,0 +1,281 @@
+import bisect
+import functools
+import heapq
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# Per-tool latency and SQL instrumentation.
+# Pooled connections are opened with TracedConnection, whose cursors time every
+# execute/fetch and count rows while a tool call is active on the thread. The
+# sqlite3 trace callback counts statements actually run (including implicit
+# BEGIN/COMMIT and trigger bodies) and the progress handler counts VM steps, a
+# cheap proxy for rows scanned. Outside a tool call the hooks are pass-through.
+
+# Progress handler granularity: one Python callback per this many VM instructions
+PROGRESS_STEPS = 10000
+
+# Upper bounds (seconds) of the latency histogram exported to Prometheus
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_local = threading.local()
+
+
+class _Call:
+    """Counters for the tool call running on the current thread."""
+    __slots__ = ("db", "rows", "statements", "vm_steps", "executed")
+
+    def __init__(self):
+        self.db = 0.0
+        self.rows = 0
+        self.statements = 0
+        self.vm_steps = 0
+        self.executed = []  # [seconds, sql, params] per execute, fetch time included
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that charges execute/fetch time and returned rows to the active tool call."""
+
+    def _charge(self, call, start, rows=0):
+        elapsed = time.perf_counter() - start
+        call.db += elapsed
+        call.rows += rows
+        entry = getattr(self, "_entry", None)
+        if entry is not None:
+            entry[0] += elapsed
+
+    def execute(self, sql, parameters=()):
+        call = getattr(_local, "call", None)
+        if call is None:
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._entry = [0.0, sql, parameters]
+            call.executed.append(self._entry)
+            self._charge(call, start)
+
+    def executemany(self, sql, seq_of_parameters):
+        call = getattr(_local, "call", None)
+        if call is None:
+            return super().executemany(sql, seq_of_parameters)
+        # Keep one parameter set so the plan can be explained later
+        sample = seq_of_parameters[0] if isinstance(seq_of_parameters, (list, tuple)) and seq_of_parameters else None
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._entry = [0.0, sql, sample]
+            call.executed.append(self._entry)
+            self._charge(call, start)
+
+    def fetchone(self):
+        call = getattr(_local, "call", None)
+        if call is None:
+            return super().fetchone()
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._charge(call, start, row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        call = getattr(_local, "call", None)
+        if call is None:
+            return super().fetchmany(self.arraysize if size is None else size)
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._charge(call, start, len(rows))
+        return rows
+
+    def fetchall(self):
+        call = getattr(_local, "call", None)
+        if call is None:
+            return super().fetchall()
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._charge(call, start, len(rows))
+        return rows
+
+    def __next__(self):
+        call = getattr(_local, "call", None)
+        if call is None:
+            return super().__next__()
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._charge(call, start)
+            raise
+        self._charge(call, start, 1)
+        return row
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors (including those behind execute shortcuts) are TracedCursors."""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def _on_statement(_sql):
+    call = getattr(_local, "call", None)
+    if call is not None:
+        call.statements += 1
+
+
+def _on_progress():
+    call = getattr(_local, "call", None)
+    if call is not None:
+        call.vm_steps += PROGRESS_STEPS
+    return 0
+
+
+class ToolMetrics:
+    """Aggregates per-tool call counts, DB vs formatting time, rows and the slowest statements.
+
+    Decorate the synchronous tool body with ``timed`` (inside the executor decorator,
+    so timing runs on the worker thread that executes the SQL) and open connections
+    with ``factory``/``install``. With ``enabled=False`` both are no-ops.
+    """
+
+    def __init__(self, enabled: bool = True, slow_statements: int = 20):
+        self.enabled = enabled
+        self.slow_statements = slow_statements
+        self.factory = TracedConnection if enabled else sqlite3.Connection
+        self._lock = threading.Lock()
+        self._tools: Dict[str, Dict[str, float]] = {}
+        self._slowest: List[tuple] = []  # min-heap of (seconds, seq, tool, sql, params)
+        self._seq = 0
+        self._plans: Dict[str, List[str]] = {}
+
+    def install(self, conn: sqlite3.Connection) -> None:
+        """Attach the trace and progress callbacks to a freshly opened connection."""
+        if self.enabled:
+            conn.set_trace_callback(_on_statement)
+            conn.set_progress_handler(_on_progress, PROGRESS_STEPS)
+
+    def timed(self, fn: Callable) -> Callable:
+        """Decorator recording every call of ``fn`` under its function name."""
+        if not self.enabled:
+            return fn
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "call", None) is not None:
+                return fn(*args, **kwargs)
+            call = _local.call = _Call()
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                _local.call = None
+                self._record(name, call, time.perf_counter() - start, failed)
+        return wrapper
+
+    def _record(self, name: str, call: _Call, wall: float, failed: bool) -> None:
+        with self._lock:
+            tool = self._tools.get(name)
+            if tool is None:
+                tool = self._tools[name] = {"calls": 0, "errors": 0, "wall": 0.0, "max": 0.0, "db": 0.0,
+                                            "rows": 0, "statements": 0, "vm_steps": 0,
+                                            "buckets": [0] * (len(LATENCY_BUCKETS) + 1)}
+            tool["calls"] += 1
+            tool["errors"] += failed
+            tool["wall"] += wall
+            tool["max"] = max(tool["max"], wall)
+            tool["db"] += call.db
+            tool["rows"] += call.rows
+            tool["statements"] += call.statements
+            tool["vm_steps"] += call.vm_steps
+            tool["buckets"][bisect.bisect_left(LATENCY_BUCKETS, wall)] += 1
+            for seconds, sql, params in call.executed:
+                if len(self._slowest) < self.slow_statements or seconds > self._slowest[0][0]:
+                    self._seq += 1
+                    item = (seconds, self._seq, name, sql, params)
+                    if len(self._slowest) < self.slow_statements:
+                        heapq.heappush(self._slowest, item)
+                    else:
+                        heapq.heapreplace(self._slowest, item)
+
+    # ----------------- REPORTS ------------------
+
+    def explain(self, conn: sqlite3.Connection, sql: str, params) -> List[str]:
+        """EXPLAIN QUERY PLAN detail lines for ``sql``, cached per statement text."""
+        plan = self._plans.get(sql)
+        if plan is None:
+            try:
+                plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()]
+            except (sqlite3.Error, ValueError) as exc:
+                plan = [f"unavailable: {exc}"]
+            self._plans[sql] = plan
+        return plan
+
+    def snapshot(self, conn: Optional[sqlite3.Connection] = None) -> Dict[str, object]:
+        """Per-tool totals plus the slowest statements (with plans when ``conn`` is given)."""
+        with self._lock:
+            tools = {name: dict(t) for name, t in self._tools.items()}
+            slowest = sorted(self._slowest, reverse=True)
+        report = {}
+        for name, t in sorted(tools.items()):
+            report[name] = {
+                "calls": t["calls"], "errors": t["errors"],
+                "total_ms": round(t["wall"] * 1000, 3),
+                "avg_ms": round(t["wall"] * 1000 / t["calls"], 3),
+                "max_ms": round(t["max"] * 1000, 3),
+                "db_ms": round(t["db"] * 1000, 3),
+                "format_ms": round((t["wall"] - t["db"]) * 1000, 3),
+                "rows": t["rows"], "statements": t["statements"], "vm_steps": t["vm_steps"],
+            }
+        statements = []
+        for seconds, _, name, sql, params in slowest:
+            entry = {"tool": name, "ms": round(seconds * 1000, 3), "sql": " ".join(sql.split())}
+            if conn is not None and sql.lstrip()[:6].upper() in ("SELECT", "WITH", "UPDATE", "INSERT", "DELETE"):
+                entry["plan"] = self.explain(conn, sql, params)
+            statements.append(entry)
+        return {"enabled": self.enabled, "tools": report, "slowest_statements": statements}
+
+    def prometheus(self) -> str:
+        """Totals and latency histograms in the Prometheus text exposition format."""
+        with self._lock:
+            tools = {name: dict(t, buckets=list(t["buckets"])) for name, t in sorted(self._tools.items())}
+        counters = (
+            ("leave_tool_calls_total", "Tool calls", lambda t: t["calls"]),
+            ("leave_tool_errors_total", "Tool calls that raised", lambda t: t["errors"]),
+            ("leave_tool_db_seconds_total", "Time spent executing SQL and fetching rows", lambda t: t["db"]),
+            ("leave_tool_format_seconds_total", "Time spent outside SQL", lambda t: t["wall"] - t["db"]),
+            ("leave_tool_rows_total", "Rows returned by SQL", lambda t: t["rows"]),
+            ("leave_tool_statements_total", "SQL statements run", lambda t: t["statements"]),
+            ("leave_tool_vm_steps_total", "SQLite VM instructions executed", lambda t: t["vm_steps"]),
+        )
+        lines = []
+        for metric, help_text, value in counters:
+            lines += [f"# HELP {metric} {help_text}.", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{tool="{name}"}} {value(t)}' for name, t in tools.items()]
+        metric = "leave_tool_duration_seconds"
+        lines += [f"# HELP {metric} Tool call latency.", f"# TYPE {metric} histogram"]
+        for name, t in tools.items():
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), t["buckets"]):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{tool="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{tool="{name}"}} {t["wall"]}')
+            lines.append(f'{metric}_count{{tool="{name}"}} {t["calls"]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tools.clear()
+            self._slowest.clear()
+            self._plans.clear()
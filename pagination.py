@@ -0,0 +1,61 @@
+import base64
+import json
+import sqlite3
+from typing import Annotated, Callable, List, Optional, Tuple
+
+from pydantic import Field
+
+# Keyset pagination for list-returning tools.
+# A cursor is an opaque token holding the last sort key of the previous page plus
+# a scope string (tool name + query arguments), so a token from one query cannot
+# be replayed against another. Pages are read with fetchmany(), never fetchall().
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+FETCH_CHUNK = 256
+
+PageLimit = Annotated[int, Field(ge=1, le=MAX_LIMIT, description="Maximum number of items in this page.")]
+PageCursor = Annotated[Optional[str], Field(description="next_cursor from the previous page; omit for the first page.")]
+
+
+def encode_cursor(scope: str, key) -> str:
+    raw = json.dumps({"s": scope, "k": key}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(scope: str, token: Optional[str], first=""):
+    """Return the last key encoded in ``token``, or ``first`` when starting from the beginning."""
+    if not token:
+        return first
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        if payload["s"] == scope:
+            return payload["k"]
+    except (ValueError, KeyError, TypeError):
+        pass
+    raise ValueError("Invalid cursor for this query. Start again without a cursor.")
+
+
+def fetch_page(cursor: sqlite3.Cursor, limit: int,
+               on_progress: Optional[Callable[[int, int], None]] = None) -> Tuple[List[tuple], bool]:
+    """Read at most ``limit`` rows (the query should LIMIT to limit + 1) and whether more exist."""
+    rows = []
+    while len(rows) <= limit:
+        chunk = cursor.fetchmany(min(FETCH_CHUNK, limit + 1 - len(rows)))
+        if not chunk:
+            break
+        rows.extend(chunk)
+        if on_progress is not None:
+            on_progress(min(len(rows), limit), limit)
+    return rows[:limit], len(rows) > limit
+
+
+def page_list(items: list, after, limit: int, key=lambda item: item[0]) -> Tuple[list, bool]:
+    """Keyset-paginate an already materialized list sorted by ``key``."""
+    page = [item for item in items if key(item) > after][:limit + 1]
+    return page[:limit], len(page) > limit
+
+
+def more_hint(next_cursor: Optional[str]) -> str:
+    """Trailing text-mode line telling the caller how to fetch the next page."""
+    return f'\nMore results available: pass cursor="{next_cursor}" to continue.' if next_cursor else ""
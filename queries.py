@@ -0,0 +1,338 @@
+import logging
+import re
+import sqlite3
+from typing import Dict, List, NamedTuple
+
+# Central registry of every SQL statement the tools run.
+# Statements are referenced by name, so each one has a single spelling and stays a
+# single entry in the per-connection statement cache. Templates with {columns}/{cols}
+# are column projections filled in by the caller. At startup check_plans() runs
+# EXPLAIN QUERY PLAN on each statement and reports hot-path queries that would
+# scan employees or project assignments end to end, and keyset pages that would
+# buffer their whole result before the first row.
+
+log = logging.getLogger(__name__)
+
+
+class Query(NamedTuple):
+    sql: str
+    hot: bool = True  # on a per-call path: a full scan of a large table is a plan regression
+    stream: bool = False  # a keyset page: a MATERIALIZE or TEMP B-TREE step is a plan regression
+
+
+QUERIES: Dict[str, Query] = {
+    # ----------------- EMPLOYEES ------------------
+    "employee.resolve": Query("""
+        SELECT {cols} FROM employees WHERE employee_id = ?1
+        UNION ALL
+        SELECT * FROM (SELECT {cols} FROM employees WHERE name = ?1 COLLATE NOCASE LIMIT 1)
+        LIMIT 1
+    """),
+    "employee.resolve_many": Query("""
+        SELECT i.key AS _pos, 0 AS _rank, {cols}
+        FROM json_each(?1) i JOIN employees e ON e.employee_id = i.value
+        UNION ALL
+        SELECT i.key AS _pos, 1 AS _rank, {cols}
+        FROM json_each(?1) i JOIN employees e ON e.name = i.value COLLATE NOCASE
+        ORDER BY _pos, _rank
+    """),
+    "employee.record": Query("SELECT {columns} FROM employees WHERE employee_id = ?"),
+    "employee.balance": Query("SELECT leave_balance FROM employees WHERE employee_id = ?"),
+    "employee.balances": Query(
+        "SELECT employee_id, leave_balance FROM employees WHERE employee_id IN (SELECT value FROM json_each(?))"),
+    "employee.deduct_leave": Query("""
+        UPDATE employees
+        SET leave_balance = leave_balance - ?1,
+            leave_history = CASE WHEN leave_history IS NULL OR leave_history = ''
+                                 THEN ?2 ELSE leave_history || ',' || ?2 END
+        WHERE employee_id = ?3 AND leave_balance >= ?1
+        RETURNING leave_balance
+    """),
+    "employee.deduct_leave_unchecked": Query("""
+        UPDATE employees
+        SET leave_balance = leave_balance - ?1,
+            leave_history = CASE WHEN leave_history IS NULL OR leave_history = ''
+                                 THEN ?2 ELSE leave_history || ',' || ?2 END
+        WHERE employee_id = ?3
+    """),
+    "employee.search_fts": Query("""
+        SELECT e.employee_id
+        FROM employee_names_fts f
+        JOIN employees e ON e.rowid = f.rowid
+        WHERE employee_names_fts MATCH ?
+        ORDER BY f.rank
+        LIMIT ?
+    """),
+    # Fragments under 3 characters cannot use the trigram index; a scan is expected
+    "employee.search_like": Query("SELECT employee_id FROM employees WHERE name LIKE ? LIMIT ?", hot=False),
+    "schema.fts_enabled": Query("SELECT 1 FROM sqlite_master WHERE name = 'employee_names_fts'", hot=False),
+
+    # ----------------- LEAVE ------------------
+    "leave.taken": Query("""
+        SELECT leave_date FROM leave_days
+        WHERE employee_id = ? AND leave_date IN (SELECT value FROM json_each(?))
+    """),
+    "leave.taken_many": Query(
+        "SELECT employee_id, leave_date FROM leave_days WHERE employee_id IN (SELECT value FROM json_each(?))"),
+    "leave.insert": Query("INSERT INTO leave_days (employee_id, leave_date) VALUES (?, ?)"),
+    "leave.history": Query("SELECT leave_date FROM leave_days WHERE employee_id = ? ORDER BY leave_date"),
+    "leave.on_date": Query("""
+        SELECT e.employee_id, e.name
+        FROM leave_days l
+        JOIN employees e ON e.employee_id = l.employee_id
+        WHERE l.leave_date = ? AND l.employee_id > ?
+        ORDER BY l.employee_id
+        LIMIT ?
+    """, stream=True),
+    # Employees with leave in a date range, one keyset page of IDs at a time, from either end:
+    # the date index reads just the range (then sorts its IDs), so it suits ranges with few rows;
+    # the primary key walk stops after LIMIT employees, so it suits ranges most employees have leave in.
+    # leave.range_rows counts the range (up to a cap) to choose between them.
+    "leave.range_rows": Query("SELECT count(*) FROM (SELECT 1 FROM leave_days WHERE leave_date BETWEEN ? AND ? LIMIT ?)"),
+    "leave.between_ids_by_date": Query("""
+        SELECT DISTINCT employee_id FROM leave_days
+        WHERE leave_date BETWEEN ? AND ? AND +employee_id > ?
+        ORDER BY employee_id
+        LIMIT ?
+    """),
+    "leave.between_ids_by_employee": Query("""
+        SELECT DISTINCT employee_id FROM leave_days
+        WHERE +leave_date BETWEEN ? AND ? AND employee_id > ?
+        ORDER BY employee_id
+        LIMIT ?
+    """, stream=True),
+    # The page's days off in the range: one primary key range per listed employee
+    "leave.between_days": Query("""
+        SELECT l.employee_id, e.name, group_concat(l.leave_date, ',')
+        FROM leave_days l
+        JOIN employees e ON e.employee_id = l.employee_id
+        WHERE l.employee_id IN (SELECT value FROM json_each(?)) AND l.leave_date BETWEEN ? AND ?
+        GROUP BY l.employee_id
+        ORDER BY l.employee_id
+    """, stream=True),
+
+    # ----------------- LEAVE EVENTS ------------------
+    "events.append": Query("""
+        INSERT INTO leave_events (employee_id, request_id, kind, leave_dates, delta, balance_after)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """),
+    "events.for_employee": Query("""
+        SELECT event_id, request_id, kind, leave_dates, delta, balance_after, created_at
+        FROM leave_events
+        WHERE employee_id = ? AND event_id > ?
+        ORDER BY event_id
+        LIMIT ?
+    """, stream=True),
+    # Events whose balance_after does not follow from the running sum of deltas
+    "events.broken_chain": Query("""
+        SELECT event_id FROM (
+            SELECT event_id, balance_after,
+                   sum(delta) OVER (ORDER BY event_id) AS running
+            FROM leave_events WHERE employee_id = ?
+        ) WHERE running <> balance_after
+    """),
+    "events.derived_balance": Query(
+        "SELECT coalesce(sum(delta), 0), count(*) FROM leave_events WHERE employee_id = ?"),
+    # Walks every employee after the cursor; the per-employee sum is a covering index range
+    "events.mismatches": Query("""
+        SELECT employee_id, leave_balance, derived FROM (
+            SELECT e.employee_id, e.leave_balance,
+                   (SELECT sum(v.delta) FROM leave_events v WHERE v.employee_id = e.employee_id) AS derived
+            FROM employees e
+            WHERE e.employee_id > ?
+            ORDER BY e.employee_id
+        )
+        WHERE derived IS NOT leave_balance
+        LIMIT ?
+    """, hot=False, stream=True),
+
+    # ----------------- PROJECTS ------------------
+    "project.for_employee": Query("""
+        SELECT a.project_id, c.project_name, a.start_date, a.end_date, a.role, a.status
+        FROM project_assignments a
+        JOIN project_catalog c ON c.project_key = a.project_key
+        WHERE a.employee_id = ?
+        ORDER BY a.project_id
+    """),
+    # A project is named directly or through any of its assignments' project_id
+    "project.resolve": Query("""
+        SELECT c.project_key, c.project_name
+        FROM project_assignments a JOIN project_catalog c ON c.project_key = a.project_key
+        WHERE a.project_id = ?1
+        UNION ALL
+        SELECT project_key, project_name FROM project_catalog WHERE project_name = ?1
+        LIMIT 1
+    """),
+    "project.members": Query("""
+        SELECT a.employee_id, e.name, a.role, a.project_id
+        FROM project_assignments a
+        JOIN employees e ON e.employee_id = a.employee_id
+        WHERE a.project_key = ? AND (a.employee_id, a.project_id) > (?, ?)
+        ORDER BY a.employee_id, a.project_id
+        LIMIT ?
+    """, stream=True),
+
+    # ----------------- CAPACITY ------------------
+    # Flags ?6-?8 choose the grouping columns; ungrouped columns collapse to ''
+    "capacity.by_day": Query("""
+        WITH RECURSIVE days(day) AS (
+            SELECT date(?1) WHERE date(?1) <= date(?2)
+            UNION ALL
+            SELECT date(day, '+1 day') FROM days WHERE day < date(?2)
+        ),
+        groups AS (
+            SELECT iif(?6, department, '') AS department, iif(?7, location, '') AS location,
+                   iif(?8, shift, '') AS shift, sum(headcount) AS headcount
+            FROM headcount
+            WHERE (?3 IS NULL OR department = ?3) AND (?4 IS NULL OR location = ?4) AND (?5 IS NULL OR shift = ?5)
+            GROUP BY 1, 2, 3
+        ),
+        absent AS (
+            SELECT leave_date, iif(?6, department, '') AS department, iif(?7, location, '') AS location,
+                   iif(?8, shift, '') AS shift, sum(on_leave) AS on_leave
+            FROM leave_calendar
+            WHERE leave_date BETWEEN date(?1) AND date(?2)
+              AND (?3 IS NULL OR department = ?3) AND (?4 IS NULL OR location = ?4) AND (?5 IS NULL OR shift = ?5)
+            GROUP BY 1, 2, 3, 4
+        )
+        SELECT d.day, g.department, g.location, g.shift, g.headcount, coalesce(a.on_leave, 0)
+        FROM days d CROSS JOIN groups g
+        LEFT JOIN absent a ON a.leave_date = d.day AND a.department = g.department
+                          AND a.location = g.location AND a.shift = g.shift
+        ORDER BY d.day, g.department, g.location, g.shift
+    """),
+
+    # ----------------- DIRECTORY SEARCH ------------------
+    # Column weights for rank are configured on the index itself (see schema._directory_search)
+    "search.match": Query("""
+        SELECT kind, ref, name, department, position,
+               snippet(directory_fts, -1, '[', ']', '...', 10), round(rank, 3)
+        FROM directory_fts
+        WHERE directory_fts MATCH ?
+        ORDER BY rank
+        LIMIT ?
+    """),
+    "search.probe": Query("SELECT 1 FROM directory_fts WHERE directory_fts MATCH ? LIMIT 1"),
+    "schema.directory_enabled": Query("SELECT 1 FROM sqlite_master WHERE name = 'directory_fts'", hot=False),
+
+    # ----------------- STAFFING BITMAPS ------------------
+    "staffing.version": Query("SELECT version FROM staffing_version"),
+    # Bitmap index builds read every employee on purpose; they only run after staffing changes
+    "staffing.employees": Query(
+        "SELECT employee_id, name, department, shift, status FROM employees ORDER BY employee_id", hot=False),
+    "staffing.certifications": Query("SELECT employee_id, cert_key FROM employee_certifications", hot=False),
+    "staffing.certification_names": Query("SELECT cert_key, name FROM certifications", hot=False),
+
+    # ----------------- SNAPSHOTS ------------------
+    "snapshot.tables": Query("""
+        SELECT t.name FROM sqlite_master t
+        WHERE t.type = 'table' AND t.name NOT LIKE 'sqlite\\_%' ESCAPE '\\'
+          AND t.sql NOT LIKE 'CREATE VIRTUAL TABLE%'
+          AND NOT EXISTS (SELECT 1 FROM sqlite_master v
+                          WHERE v.type = 'table' AND v.sql LIKE 'CREATE VIRTUAL TABLE%'
+                            AND t.name LIKE replace(v.name, '_', '\\_') || '\\_%' ESCAPE '\\')
+        ORDER BY t.name
+    """, hot=False),
+    "snapshot.table_sql": Query("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", hot=False),
+    "snapshot.triggers": Query("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name", hot=False),
+    "snapshot.indexes": Query(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL ORDER BY name",
+        hot=False),
+
+    # ----------------- ANALYTICS ------------------
+    # Loads the columnar snapshot; reading every employee is the point, and it only runs after writes
+    "analytics.snapshot": Query("""
+        SELECT e.department, e.status, e.location, e.shift,
+               e.salary, e.performance_rating, e.leave_balance,
+               (SELECT count(*) FROM leave_days l WHERE l.employee_id = e.employee_id)
+        FROM employees e
+    """, hot=False),
+}
+
+# Per-connection statement cache size: every registered statement plus headroom for
+# the column projections built from the {columns}/{cols} templates
+CACHED_STATEMENTS = max(128, 4 * len(QUERIES))
+
+# Tables whose full scan on a hot path counts as a plan regression
+LARGE_TABLES = ("employees", "projects", "project_assignments", "leave_events", "employee_certifications")
+
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_PARAM = re.compile(r"\?(\d*)")
+_KEYWORDS = {"where", "join", "on", "order", "group", "limit", "union", "left", "inner", "cross", "using"}
+
+
+def sql(name: str, **parts: str) -> str:
+    """The registered statement ``name``, with any template parts filled in."""
+    text = QUERIES[name].sql
+    return text.format(**parts) if parts else text
+
+
+def _param_count(text: str) -> int:
+    numbered = [int(n) for n in _PARAM.findall(text) if n]
+    return max(numbered) if numbered else len(_PARAM.findall(text))
+
+
+def _full_scans(text: str, plan: List[str]) -> List[str]:
+    """Plan lines that scan one of LARGE_TABLES (by name or alias) from start to end."""
+    names = {}
+    for table, alias in _TABLE_REF.findall(text):
+        if table.lower() in LARGE_TABLES:
+            names[table.lower()] = table.lower()
+            if alias and alias.lower() not in _KEYWORDS:
+                names[alias.lower()] = table.lower()
+    scans = []
+    for line in plan:
+        words = line.split()
+        if len(words) >= 2 and words[0] == "SCAN" and words[1].lower() in names:
+            scans.append(line)
+    return scans
+
+
+def _buffered_steps(plan: List[str]) -> List[str]:
+    """Plan lines that collect rows before returning any: subquery materialization or a temp sort."""
+    return [line for line in plan if line.startswith("MATERIALIZE") or "TEMP B-TREE" in line]
+
+
+def explain(conn: sqlite3.Connection, name: str) -> List[str]:
+    """EXPLAIN QUERY PLAN detail lines for a registered statement (NULL parameters)."""
+    text = sql(name, columns="employee_id", cols="employee_id")
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {text}", (None,) * _param_count(text)).fetchall()]
+
+
+def plan_report(conn: sqlite3.Connection) -> Dict[str, dict]:
+    """Plan and full-scan findings for every registered statement."""
+    report = {}
+    for name, query in QUERIES.items():
+        try:
+            plan = explain(conn, name)
+        except sqlite3.Error as exc:
+            report[name] = {"hot": query.hot, "stream": query.stream, "plan": [], "full_scans": [],
+                            "buffered_steps": [], "error": str(exc)}
+            continue
+        report[name] = {"hot": query.hot, "stream": query.stream, "plan": plan,
+                        "full_scans": _full_scans(query.sql, plan), "buffered_steps": _buffered_steps(plan)}
+    return report
+
+
+def check_plans(conn: sqlite3.Connection, mode: str = "warn") -> List[str]:
+    """Verify every statement compiles, no hot-path statement fully scans a large table and
+    no keyset page buffers its rows (MATERIALIZE or TEMP B-TREE) before returning them.
+
+    ``mode`` is "warn" (log and continue), "strict" (raise RuntimeError) or "off".
+    Returns the problems found.
+    """
+    if mode == "off":
+        return []
+    problems = []
+    for name, entry in plan_report(conn).items():
+        if "error" in entry:
+            problems.append(f"{name}: does not compile: {entry['error']}")
+        elif entry["hot"] and entry["full_scans"]:
+            problems.append(f"{name}: full scan on a hot path: {'; '.join(entry['full_scans'])}")
+        elif entry["stream"] and entry["buffered_steps"]:
+            problems.append(f"{name}: keyset page buffers its rows: {'; '.join(entry['buffered_steps'])}")
+    if problems and mode == "strict":
+        raise RuntimeError("Query plan check failed:\n" + "\n".join(problems))
+    for problem in problems:
+        log.warning("Query plan check: %s", problem)
+    return problems
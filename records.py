@@ -0,0 +1,119 @@
+import json
+import os
+from typing import Annotated, Iterable, List, Literal, Optional, Sequence, TypedDict
+
+from pydantic import Field
+
+# Typed records returned by the tools in structured (JSON) output mode.
+# Field order is fixed by the class definitions and payloads are serialized once,
+# compactly, so clients get a stable schema instead of prose to re-parse.
+
+EMPLOYEE_FIELDS = (
+    "employee_id", "name", "age", "gender", "experience", "department", "position",
+    "email", "phone", "address", "certifications", "joining_date", "salary", "manager",
+    "leave_balance", "leave_history", "performance_rating", "status", "location", "shift",
+)
+
+# Text-mode labels, computed once instead of title-casing column names per call
+EMPLOYEE_LABELS = {field: field.replace('_', ' ').title() for field in EMPLOYEE_FIELDS}
+
+# Server-wide default; each tool also takes an output_format argument
+OUTPUT_FORMAT = os.environ.get("LEAVE_OUTPUT_FORMAT", "text")
+OUTPUT_FORMATS = ("text", "json")
+
+# Tool parameter type for the per-call override
+OutputFormat = Annotated[Optional[Literal["text", "json"]], Field(
+    description='"json" returns a compact structured record instead of prose; defaults to the server setting.')]
+
+
+class LeaveBalance(TypedDict):
+    employee_id: str
+    leave_balance: int
+
+
+class LeaveApplication(TypedDict):
+    employee_id: str
+    applied_dates: List[str]
+    skipped_dates: int
+    remaining_balance: int
+    request_id: Optional[str]
+
+
+class LeaveEvent(TypedDict):
+    event_id: int
+    request_id: str
+    kind: str
+    leave_dates: List[str]
+    delta: int
+    balance_after: int
+    created_at: str
+
+
+class LeaveHistory(TypedDict):
+    employee_id: str
+    leave_dates: List[str]
+
+
+class ProjectAssignment(TypedDict):
+    project_id: str
+    project_name: str
+    start_date: str
+    end_date: str
+    role: str
+    status: str
+
+
+class ProjectMember(TypedDict):
+    employee_id: str
+    name: str
+    role: str
+    project_id: str
+
+
+class EmployeeRef(TypedDict):
+    employee_id: str
+    name: str
+
+
+class EmployeeOnLeave(TypedDict):
+    employee_id: str
+    name: str
+    leave_dates: List[str]
+
+
+class DirectoryHit(TypedDict):
+    kind: str  # "employee" or "project"
+    id: str  # employee_id, or the project name
+    name: str
+    department: Optional[str]
+    position: Optional[str]
+    snippet: str
+    score: float  # BM25 rank: lower is a better match
+
+
+def wants_json(output_format: Optional[str]) -> bool:
+    """Resolve a per-call output_format against the server default."""
+    fmt = (output_format or OUTPUT_FORMAT).lower()
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output_format '{fmt}'. Use one of: {', '.join(OUTPUT_FORMATS)}.")
+    return fmt == "json"
+
+
+def to_json(payload) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+def records_from_rows(record_type, rows: Iterable[Sequence]) -> list:
+    """Build records from rows whose columns follow the record's field order."""
+    fields = tuple(record_type.__annotations__)
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def employee_fields(fields: Optional[Sequence[str]]) -> tuple:
+    """Validate a column projection; None means every column."""
+    if not fields:
+        return EMPLOYEE_FIELDS
+    unknown = [f for f in fields if f not in EMPLOYEE_LABELS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Valid fields: {', '.join(EMPLOYEE_FIELDS)}.")
+    return tuple(dict.fromkeys(fields))
@@ -0,0 +1,140 @@
+import itertools
+import logging
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence
+
+from db_pool import DEFAULT_PRAGMAS, ConnectionPool
+
+# Read replicas: connection sets that serve the read-only tools so reads never
+# queue behind the writer. A replica is either
+#   "ro"    - the primary file itself, opened through a mode=ro URI (always current), or
+#   a path  - a copy of the primary made with the SQLite backup API and re-synced
+#             in the background whenever the primary changes (eventually consistent,
+#             at most ``refresh`` seconds behind).
+
+log = logging.getLogger(__name__)
+
+# Pragmas for read-only connections: journal mode and sync level belong to the writer
+READONLY_PRAGMAS = {**{k: v for k, v in DEFAULT_PRAGMAS.items() if k not in ("journal_mode", "synchronous")},
+                    "query_only": 1}
+
+
+def parse_replicas(value: str) -> List[str]:
+    """Replica specs from a comma-separated LEAVE_DB_REPLICAS value."""
+    return [spec.strip() for spec in value.split(",") if spec.strip()]
+
+
+def readonly_uri(path: str) -> str:
+    """SQLite URI opening ``path`` read-only."""
+    return pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+
+
+def copy_database(source: sqlite3.Connection, dest: sqlite3.Connection) -> None:
+    """Overwrite ``dest`` with the contents of ``source`` using the online backup API.
+
+    The copy is taken in a single step: in WAL mode that only holds a read snapshot of
+    the source, and readers of ``dest`` keep seeing the previous copy until it commits.
+    """
+    source.backup(dest)
+    dest.execute("PRAGMA journal_mode = WAL")
+
+
+class ReplicaSet:
+    """Round-robin router over one read-only ConnectionPool per replica.
+
+    ``open_pool(uri)`` builds the pool for a replica URI. Copies are created (or
+    overwritten) from ``primary_path`` on construction; while any exist, a daemon
+    thread polls the primary's PRAGMA data_version every ``refresh`` seconds and
+    re-syncs them after a change, then calls ``on_sync`` (e.g. to drop caches that
+    may have been filled from the stale copy). Exposes the same connection()/stats()/close()
+    interface as ConnectionPool.
+    """
+
+    def __init__(self, primary_path: str, specs: Sequence[str], open_pool: Callable[[str], ConnectionPool],
+                 refresh: float = 5.0, on_sync: Optional[Callable[[], object]] = None):
+        if not specs:
+            raise ValueError("A replica set needs at least one replica.")
+        self.primary_path = primary_path
+        self.refresh = refresh
+        self._on_sync = on_sync
+        self.specs = list(specs)
+        self._copies: Dict[str, sqlite3.Connection] = {}
+        self._source = None
+        if any(spec != "ro" for spec in self.specs):
+            self._source = sqlite3.connect(readonly_uri(primary_path), uri=True, check_same_thread=False)
+        for spec in self.specs:
+            if spec != "ro" and spec not in self._copies:
+                if os.path.abspath(spec) == os.path.abspath(primary_path):
+                    raise ValueError(f"Replica {spec!r} is the primary database; use 'ro' to read it directly.")
+                self._copies[spec] = sqlite3.connect(spec, check_same_thread=False)
+                copy_database(self._source, self._copies[spec])
+        self.pools = [open_pool(readonly_uri(primary_path if spec == "ro" else spec)) for spec in self.specs]
+        self._next = itertools.count()
+        self._stop = threading.Event()
+        self._stats = {"syncs": 0, "sync_seconds": 0.0, "sync_errors": 0, "last_sync": time.time() if self._copies else None}
+        self._version = self._data_version() if self._copies else None
+        self._thread = None
+        if self._copies:
+            self._thread = threading.Thread(target=self._sync_loop, name="replica-sync", daemon=True)
+            self._thread.start()
+
+    # ----------------- ROUTING ------------------
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection from the next replica in turn."""
+        with self.pools[next(self._next) % len(self.pools)].connection() as conn:
+            yield conn
+
+    # ----------------- COPY SYNC ------------------
+
+    def _data_version(self) -> int:
+        return self._source.execute("PRAGMA data_version").fetchone()[0]
+
+    def sync(self) -> None:
+        """Re-copy the primary into every copy replica now."""
+        started = time.perf_counter()
+        for conn in self._copies.values():
+            copy_database(self._source, conn)
+        self._stats["syncs"] += 1
+        self._stats["sync_seconds"] += time.perf_counter() - started
+        self._stats["last_sync"] = time.time()
+        if self._on_sync is not None:
+            self._on_sync()
+
+    def _sync_loop(self) -> None:
+        while not self._stop.wait(self.refresh):
+            try:
+                version = self._data_version()
+                if version != self._version:
+                    self.sync()
+                    self._version = version
+            except sqlite3.Error:
+                self._stats["sync_errors"] += 1
+                log.exception("Replica sync from %s failed", self.primary_path)
+
+    # ----------------- LIFECYCLE ------------------
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        for pool in self.pools:
+            pool.close()
+        for conn in self._copies.values():
+            conn.close()
+        if self._source is not None:
+            self._source.close()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "primary": self.primary_path,
+            "refresh": self.refresh,
+            **self._stats,
+            "replicas": [{"spec": spec, **pool.stats()} for spec, pool in zip(self.specs, self.pools)],
+        }
@@ -0,0 +1,66 @@
+import json
+import sqlite3
+from typing import List, Optional, Sequence
+
+from queries import sql
+
+# Shared employee identifier resolution.
+# An identifier is either an employee_id or a full name (case-insensitive); both
+# branches are served by an index (primary key / idx_employees_name_nocase) in one query.
+
+# Whether the served database has the FTS index; checked once per database (see forget_fts_enabled)
+_fts_enabled = None
+
+
+def resolve_employee(conn: sqlite3.Connection, identifier: str,
+                     columns: Sequence[str] = ("employee_id",)) -> Optional[sqlite3.Row]:
+    """Return the requested columns (as a Row) for the employee matching an ID or exact name, or None.
+
+    An ID match wins over a name match, mirroring the old two-query lookup.
+    """
+    cols = ", ".join(columns)
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    return cursor.execute(sql("employee.resolve", cols=cols), (identifier,)).fetchone()
+
+
+def resolve_employees(conn: sqlite3.Connection, identifiers: Sequence[str],
+                      columns: Sequence[str] = ("employee_id",)) -> List[Optional[dict]]:
+    """Set-based resolve_employee(): one query for the whole batch.
+
+    Returns one dict of the requested columns (or None) per identifier, in input order.
+    """
+    cols = ", ".join(f"e.{c}" for c in columns)
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    rows = cursor.execute(sql("employee.resolve_many", cols=cols), (json.dumps(list(identifiers)),)).fetchall()
+    resolved = [None] * len(identifiers)
+    for row in rows:
+        if resolved[row["_pos"]] is None:
+            resolved[row["_pos"]] = {k: row[k] for k in row.keys()[2:]}
+    return resolved
+
+
+def fts_enabled(conn: sqlite3.Connection) -> bool:
+    """Whether the optional employee_names_fts trigram index exists."""
+    global _fts_enabled
+    if _fts_enabled is None:
+        _fts_enabled = conn.execute(sql("schema.fts_enabled")).fetchone() is not None
+    return _fts_enabled
+
+
+def forget_fts_enabled() -> None:
+    """Re-check fts_enabled() on next use, e.g. after switching to another database."""
+    global _fts_enabled
+    _fts_enabled = None
+
+
+def search_employee_names(conn: sqlite3.Connection, fragment: str, limit: int = 10) -> list:
+    """Employee IDs whose name contains ``fragment`` (case-insensitive), best matches first."""
+    if len(fragment) >= 3 and fts_enabled(conn):
+        phrase = '"' + fragment.replace('"', '""') + '"'
+        rows = conn.execute(sql("employee.search_fts"), (phrase, limit))
+    else:
+        # Trigram search needs at least 3 characters; short fragments fall back to LIKE.
+        rows = conn.execute(sql("employee.search_like"), (f"%{fragment}%", limit))
+    return [r[0] for r in rows.fetchall()]
@@ -0,0 +1,482 @@
+import sqlite3
+
+# Schema migrations applied on top of the base tables created by init_db.py.
+# Each migration runs once, in order, tracked through PRAGMA user_version.
+
+
+def _csv_items(owner: str, column: str, source: str = "") -> str:
+    """Subquery of (owner, value) rows, one per trimmed, non-empty item of the comma-separated ``column``.
+
+    Split with instr/substr so items holding quotes or backslashes come through unchanged;
+    ``source`` is the FROM clause (empty inside a trigger, where new.* is in scope).
+    """
+    return f"""(WITH RECURSIVE split(owner, value, rest) AS (
+                    SELECT {owner}, NULL, {column} || ',' {source}
+                    UNION ALL
+                    SELECT owner, trim(substr(rest, 1, instr(rest, ',') - 1)), substr(rest, instr(rest, ',') + 1)
+                    FROM split WHERE rest <> ''
+                )
+                SELECT owner, value FROM split WHERE value <> '')"""
+
+
+def _leave_days(conn: sqlite3.Connection):
+    """Normalize the comma-separated leave_history column into indexed leave_days rows."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS leave_days (
+            employee_id TEXT NOT NULL,
+            leave_date TEXT NOT NULL,
+            PRIMARY KEY (employee_id, leave_date),
+            FOREIGN KEY(employee_id) REFERENCES employees(employee_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_leave_days_date ON leave_days(leave_date, employee_id)")
+    # Split the comma-separated history in SQL so large tables never round-trip through Python
+    conn.execute("INSERT OR IGNORE INTO leave_days (employee_id, leave_date) SELECT owner, value FROM "
+                 + _csv_items("employee_id", "leave_history", "FROM employees WHERE leave_history <> ''"))
+
+
+def _name_lookup(conn: sqlite3.Connection):
+    """Case-insensitive name index plus an optional FTS5 trigram index for partial names."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_employees_name_nocase ON employees(name COLLATE NOCASE)")
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS employee_names_fts
+            USING fts5(name, content='employees', content_rowid='rowid', tokenize='trigram')
+        """)
+    except sqlite3.OperationalError:
+        return  # SQLite built without FTS5 / trigram tokenizer: LIKE fallback is used instead
+    # Keep the external-content index in sync (executescript() would commit mid-migration)
+    for trigger in (
+        """CREATE TRIGGER IF NOT EXISTS employee_names_fts_ai AFTER INSERT ON employees BEGIN
+               INSERT INTO employee_names_fts(rowid, name) VALUES (new.rowid, new.name);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS employee_names_fts_ad AFTER DELETE ON employees BEGIN
+               INSERT INTO employee_names_fts(employee_names_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS employee_names_fts_au AFTER UPDATE OF name ON employees BEGIN
+               INSERT INTO employee_names_fts(employee_names_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+               INSERT INTO employee_names_fts(rowid, name) VALUES (new.rowid, new.name);
+           END""",
+    ):
+        conn.execute(trigger)
+    conn.execute("INSERT INTO employee_names_fts(employee_names_fts) VALUES ('rebuild')")
+
+
+def _project_indexes(conn: sqlite3.Connection):
+    """Index project lookups by employee (covering the project_id sort) and by project name."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_projects_employee ON projects(employee_id, project_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_projects_name ON projects(project_name)")
+
+
+def _project_split(conn: sqlite3.Connection):
+    """Split projects into a catalog keyed by project and an assignments table.
+
+    Each old projects row becomes one assignment (keeping its project_id); rows sharing a
+    project_name share one catalog entry. A projects view keeps the old shape for readers.
+    """
+    conn.execute("""
+        CREATE TABLE project_catalog (
+            project_key INTEGER PRIMARY KEY,
+            project_name TEXT NOT NULL UNIQUE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE project_assignments (
+            project_id TEXT PRIMARY KEY,
+            project_key INTEGER NOT NULL,
+            employee_id TEXT NOT NULL,
+            start_date TEXT,
+            end_date TEXT,
+            role TEXT,
+            status TEXT,
+            FOREIGN KEY(project_key) REFERENCES project_catalog(project_key),
+            FOREIGN KEY(employee_id) REFERENCES employees(employee_id)
+        )
+    """)
+    conn.execute("""
+        INSERT INTO project_catalog (project_name)
+        SELECT DISTINCT coalesce(project_name, project_id) FROM projects ORDER BY 1
+    """)
+    conn.execute("""
+        INSERT INTO project_assignments (project_id, project_key, employee_id, start_date, end_date, role, status)
+        SELECT p.project_id, c.project_key, p.employee_id, p.start_date, p.end_date, p.role, p.status
+        FROM projects p JOIN project_catalog c ON c.project_name = coalesce(p.project_name, p.project_id)
+        ORDER BY p.project_id
+    """)
+    # Covering indexes: an employee's project list and a project's member list are read from the index alone
+    conn.execute("""
+        CREATE INDEX idx_project_assignments_employee
+        ON project_assignments(employee_id, project_id, project_key, start_date, end_date, role, status)
+    """)
+    conn.execute("""
+        CREATE INDEX idx_project_assignments_project
+        ON project_assignments(project_key, employee_id, project_id, role)
+    """)
+    conn.execute("DROP TABLE projects")
+    conn.execute("""
+        CREATE VIEW projects AS
+        SELECT a.project_id, c.project_name, a.employee_id, a.start_date, a.end_date, a.role, a.status
+        FROM project_assignments a JOIN project_catalog c ON c.project_key = a.project_key
+    """)
+
+
+# Full fills of the availability tables; only Active employees count towards capacity
+_LEAVE_CALENDAR_FILL = """
+    INSERT INTO leave_calendar (leave_date, department, location, shift, on_leave)
+    SELECT l.leave_date, coalesce(e.department, ''), coalesce(e.location, ''), coalesce(e.shift, ''), count(*)
+    FROM leave_days l JOIN employees e ON e.employee_id = l.employee_id
+    WHERE e.status = 'Active'
+    GROUP BY 1, 2, 3, 4
+"""
+_HEADCOUNT_FILL = """
+    INSERT INTO headcount (department, location, shift, headcount)
+    SELECT coalesce(department, ''), coalesce(location, ''), coalesce(shift, ''), count(*)
+    FROM employees WHERE status = 'Active' GROUP BY 1, 2, 3
+"""
+
+
+def _availability_calendar(conn: sqlite3.Connection):
+    """Per-day leave counts and headcount by (department, location, shift), kept current by triggers.
+
+    Only Active employees are counted: a status change moves the employee's headcount and
+    leave days in or out like a change of group. The triggers run inside whatever
+    transaction writes leave_days or employees, so apply_leave and every other writer keep
+    the aggregates consistent without extra code. Missing department/location/shift values
+    are stored as '', and groups whose count drops to zero are removed.
+    """
+    conn.execute("""
+        CREATE TABLE leave_calendar (
+            leave_date TEXT NOT NULL,
+            department TEXT NOT NULL,
+            location TEXT NOT NULL,
+            shift TEXT NOT NULL,
+            on_leave INTEGER NOT NULL,
+            PRIMARY KEY (leave_date, department, location, shift)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE headcount (
+            department TEXT NOT NULL,
+            location TEXT NOT NULL,
+            shift TEXT NOT NULL,
+            headcount INTEGER NOT NULL,
+            PRIMARY KEY (department, location, shift)
+        ) WITHOUT ROWID
+    """)
+    conn.execute(_LEAVE_CALENDAR_FILL)
+    conn.execute(_HEADCOUNT_FILL)
+    old_group = "coalesce(old.department, ''), coalesce(old.location, ''), coalesce(old.shift, '')"
+    new_group = "coalesce(new.department, ''), coalesce(new.location, ''), coalesce(new.shift, '')"
+    for trigger in (
+        """CREATE TRIGGER leave_calendar_ai AFTER INSERT ON leave_days BEGIN
+               INSERT INTO leave_calendar (leave_date, department, location, shift, on_leave)
+               SELECT new.leave_date, coalesce(department, ''), coalesce(location, ''), coalesce(shift, ''), 1
+               FROM employees WHERE employee_id = new.employee_id AND status = 'Active'
+               ON CONFLICT (leave_date, department, location, shift) DO UPDATE SET on_leave = on_leave + 1;
+           END""",
+        """CREATE TRIGGER leave_calendar_ad AFTER DELETE ON leave_days BEGIN
+               UPDATE leave_calendar SET on_leave = on_leave - 1
+               WHERE (leave_date, department, location, shift) =
+                     (SELECT old.leave_date, coalesce(department, ''), coalesce(location, ''), coalesce(shift, '')
+                      FROM employees WHERE employee_id = old.employee_id AND status = 'Active');
+               DELETE FROM leave_calendar WHERE leave_date = old.leave_date AND on_leave <= 0;
+           END""",
+        f"""CREATE TRIGGER headcount_ai AFTER INSERT ON employees WHEN new.status = 'Active' BEGIN
+                INSERT INTO headcount (department, location, shift, headcount)
+                VALUES ({new_group}, 1)
+                ON CONFLICT (department, location, shift) DO UPDATE SET headcount = headcount + 1;
+            END""",
+        f"""CREATE TRIGGER headcount_ad AFTER DELETE ON employees WHEN old.status = 'Active' BEGIN
+                UPDATE headcount SET headcount = headcount - 1 WHERE (department, location, shift) = ({old_group});
+                DELETE FROM headcount WHERE (department, location, shift) = ({old_group}) AND headcount <= 0;
+            END""",
+        # Moving an employee between groups, or in or out of Active, moves their headcount and every leave day they hold
+        f"""CREATE TRIGGER availability_group_au AFTER UPDATE OF department, location, shift, status ON employees
+            WHEN ({old_group}, old.status IS 'Active') IS NOT ({new_group}, new.status IS 'Active')
+            BEGIN
+                UPDATE headcount SET headcount = headcount - 1
+                WHERE old.status IS 'Active' AND (department, location, shift) = ({old_group});
+                DELETE FROM headcount WHERE (department, location, shift) = ({old_group}) AND headcount <= 0;
+                INSERT INTO headcount (department, location, shift, headcount)
+                SELECT {new_group}, 1 WHERE new.status IS 'Active'
+                ON CONFLICT (department, location, shift) DO UPDATE SET headcount = headcount + 1;
+                UPDATE leave_calendar SET on_leave = on_leave - 1
+                WHERE old.status IS 'Active' AND (department, location, shift) = ({old_group})
+                  AND leave_date IN (SELECT leave_date FROM leave_days WHERE employee_id = new.employee_id);
+                DELETE FROM leave_calendar
+                WHERE (department, location, shift) = ({old_group}) AND on_leave <= 0
+                  AND leave_date IN (SELECT leave_date FROM leave_days WHERE employee_id = new.employee_id);
+                INSERT INTO leave_calendar (leave_date, department, location, shift, on_leave)
+                SELECT leave_date, {new_group}, 1
+                FROM leave_days WHERE employee_id = new.employee_id AND new.status IS 'Active'
+                ON CONFLICT (leave_date, department, location, shift) DO UPDATE SET on_leave = on_leave + 1;
+            END""",
+    ):
+        conn.execute(trigger)
+
+
+def _leave_events(conn: sqlite3.Connection):
+    """Append-only log of every leave balance change, opened with each employee's current balance.
+
+    Per employee, sum(delta) over the log equals employees.leave_balance; verify_leave_log
+    checks it. Rows are never updated or deleted (enforced by triggers). New employees
+    get their opening event from a trigger; leave writers append their own events.
+    """
+    conn.execute("""
+        CREATE TABLE leave_events (
+            event_id INTEGER PRIMARY KEY,
+            employee_id TEXT NOT NULL,
+            request_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            leave_dates TEXT NOT NULL DEFAULT '',
+            delta INTEGER NOT NULL,
+            balance_after INTEGER NOT NULL,
+            created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+        )
+    """)
+    # Covering for both the per-employee history and the balance re-derivation
+    conn.execute("CREATE INDEX idx_leave_events_employee ON leave_events(employee_id, event_id, delta)")
+    conn.execute("CREATE INDEX idx_leave_events_request ON leave_events(request_id)")
+    conn.execute("""
+        INSERT INTO leave_events (employee_id, request_id, kind, delta, balance_after)
+        SELECT employee_id, 'migration', 'opening', coalesce(leave_balance, 0), coalesce(leave_balance, 0)
+        FROM employees
+    """)
+    for trigger in (
+        """CREATE TRIGGER leave_events_no_update BEFORE UPDATE ON leave_events BEGIN
+               SELECT RAISE(ABORT, 'leave_events is append-only');
+           END""",
+        """CREATE TRIGGER leave_events_no_delete BEFORE DELETE ON leave_events BEGIN
+               SELECT RAISE(ABORT, 'leave_events is append-only');
+           END""",
+        """CREATE TRIGGER leave_events_opening AFTER INSERT ON employees BEGIN
+               INSERT INTO leave_events (employee_id, request_id, kind, delta, balance_after)
+               VALUES (new.employee_id, 'hire', 'opening', coalesce(new.leave_balance, 0), coalesce(new.leave_balance, 0));
+           END""",
+    ):
+        conn.execute(trigger)
+
+
+# Directory search documents. Employees keep their employees rowid; projects use the negated
+# project_key, so both kinds share one rowid space and triggers can replace a document by rowid.
+_EMPLOYEE_DOCUMENT = """
+    INSERT INTO directory_fts (rowid, kind, ref, name, position, department, certifications, location, shift, projects)
+    SELECT e.rowid, 'employee', e.employee_id, e.name, e.position, e.department, nullif(e.certifications, 'None'),
+           e.location, e.shift,
+           (SELECT group_concat(c.project_name || ' ' || coalesce(a.role, ''), ', ')
+            FROM project_assignments a JOIN project_catalog c ON c.project_key = a.project_key
+            WHERE a.employee_id = e.employee_id)
+    FROM employees e WHERE {where};
+"""
+_PROJECT_DOCUMENT = """
+    INSERT INTO directory_fts (rowid, kind, ref, name, projects)
+    SELECT -c.project_key, 'project', c.project_name, c.project_name,
+           (SELECT group_concat(DISTINCT a.role) FROM project_assignments a WHERE a.project_key = c.project_key)
+    FROM project_catalog c WHERE {where};
+"""
+
+
+def _directory_search(conn: sqlite3.Connection):
+    """FTS5 index over employees (profile fields plus their project names and roles) and projects.
+
+    The index stores its own copy of each document, rebuilt by triggers whenever an
+    indexed employee column, an assignment or a project name changes; leave writes do
+    not touch it. Skipped when SQLite is built without FTS5 (search_directory reports it).
+    """
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE directory_fts USING fts5(
+                kind UNINDEXED, ref UNINDEXED, name, position, department, certifications, location, shift, projects,
+                tokenize = 'porter unicode61 remove_diacritics 2'
+            )
+        """)
+    except sqlite3.OperationalError:
+        return
+    # BM25 column weights (kind and ref are unindexed): names count most, project text least
+    conn.execute("INSERT INTO directory_fts (directory_fts, rank) VALUES ('rank', 'bm25(0, 0, 10, 4, 3, 3, 2, 2, 1)')")
+    conn.execute(_EMPLOYEE_DOCUMENT.format(where="1"))
+    conn.execute(_PROJECT_DOCUMENT.format(where="1"))
+
+    def refresh_employee(key):
+        return f"DELETE FROM directory_fts WHERE rowid = (SELECT rowid FROM employees WHERE employee_id = {key});" \
+               + _EMPLOYEE_DOCUMENT.format(where=f"e.employee_id = {key}")
+
+    def refresh_project(key):
+        return f"DELETE FROM directory_fts WHERE rowid = -({key});" \
+               + _PROJECT_DOCUMENT.format(where=f"c.project_key = {key}")
+
+    for trigger in (
+        f"""CREATE TRIGGER directory_employee_ai AFTER INSERT ON employees BEGIN
+                {_EMPLOYEE_DOCUMENT.format(where="e.rowid = new.rowid")}
+            END""",
+        f"""CREATE TRIGGER directory_employee_au
+            AFTER UPDATE OF employee_id, name, position, department, certifications, location, shift ON employees BEGIN
+                DELETE FROM directory_fts WHERE rowid = old.rowid;
+                {_EMPLOYEE_DOCUMENT.format(where="e.rowid = new.rowid")}
+            END""",
+        """CREATE TRIGGER directory_employee_ad AFTER DELETE ON employees BEGIN
+               DELETE FROM directory_fts WHERE rowid = old.rowid;
+           END""",
+        f"""CREATE TRIGGER directory_assignment_ai AFTER INSERT ON project_assignments BEGIN
+                {refresh_employee("new.employee_id")}
+                {refresh_project("new.project_key")}
+            END""",
+        f"""CREATE TRIGGER directory_assignment_au
+            AFTER UPDATE OF employee_id, project_key, role ON project_assignments BEGIN
+                {refresh_employee("old.employee_id")}
+                {refresh_project("old.project_key")}
+                {refresh_employee("new.employee_id")}
+                {refresh_project("new.project_key")}
+            END""",
+        f"""CREATE TRIGGER directory_assignment_ad AFTER DELETE ON project_assignments BEGIN
+                {refresh_employee("old.employee_id")}
+                {refresh_project("old.project_key")}
+            END""",
+        f"""CREATE TRIGGER directory_project_ai AFTER INSERT ON project_catalog BEGIN
+                {_PROJECT_DOCUMENT.format(where="c.project_key = new.project_key")}
+            END""",
+        # A renamed project changes the documents of everyone assigned to it
+        f"""CREATE TRIGGER directory_project_au AFTER UPDATE OF project_name ON project_catalog BEGIN
+                {refresh_project("new.project_key")}
+                DELETE FROM directory_fts WHERE rowid IN
+                    (SELECT e.rowid FROM project_assignments a JOIN employees e ON e.employee_id = a.employee_id
+                     WHERE a.project_key = new.project_key);
+                {_EMPLOYEE_DOCUMENT.format(where="e.employee_id IN (SELECT employee_id FROM project_assignments "
+                                                 "WHERE project_key = new.project_key)")}
+            END""",
+        """CREATE TRIGGER directory_project_ad AFTER DELETE ON project_catalog BEGIN
+               DELETE FROM directory_fts WHERE rowid = -old.project_key;
+           END""",
+    ):
+        conn.execute(trigger)
+
+
+# Certification names in employees.certifications values ("AWS,GCP"; "None" means none)
+def _certification_names(owner: str, column: str, source: str = "") -> str:
+    return f"SELECT DISTINCT value FROM {_csv_items(owner, column, source)} WHERE value <> 'None'"
+
+
+_CERTIFICATIONS_FILL = ("INSERT OR IGNORE INTO certifications (name) "
+                        + _certification_names("NULL", "certifications", "FROM employees") + " ORDER BY 1")
+_EMPLOYEE_CERTIFICATIONS_FILL = f"""
+    INSERT OR IGNORE INTO employee_certifications (employee_id, cert_key)
+    SELECT s.owner, c.cert_key
+    FROM {_csv_items("employee_id", "certifications", "FROM employees")} s
+    JOIN certifications c ON c.name = s.value
+"""
+
+
+def _certifications(conn: sqlite3.Connection):
+    """Normalize the comma-separated certifications column into a lookup table and an indexed join.
+
+    employees.certifications stays the value tools return; triggers keep the join current.
+    staffing_version counts changes to the columns find_employees filters on (leave
+    writes leave it alone), so its in-memory bitmaps are rebuilt only when they change.
+    """
+    conn.execute("""
+        CREATE TABLE certifications (
+            cert_key INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE employee_certifications (
+            employee_id TEXT NOT NULL,
+            cert_key INTEGER NOT NULL,
+            PRIMARY KEY (employee_id, cert_key),
+            FOREIGN KEY(employee_id) REFERENCES employees(employee_id),
+            FOREIGN KEY(cert_key) REFERENCES certifications(cert_key)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX idx_employee_certifications_cert ON employee_certifications(cert_key, employee_id)")
+    conn.execute(_CERTIFICATIONS_FILL)
+    conn.execute(_EMPLOYEE_CERTIFICATIONS_FILL)
+    conn.execute("CREATE TABLE staffing_version (version INTEGER NOT NULL)")
+    conn.execute("INSERT INTO staffing_version (version) VALUES (0)")
+    bump = "UPDATE staffing_version SET version = version + 1;"
+    link = """
+        INSERT OR IGNORE INTO certifications (name) {names};
+        INSERT OR IGNORE INTO employee_certifications (employee_id, cert_key)
+        SELECT new.employee_id, cert_key FROM certifications WHERE name IN ({names});
+    """.format(names=_certification_names("new.employee_id", "new.certifications"))
+    for trigger in (
+        f"""CREATE TRIGGER employee_certifications_ai AFTER INSERT ON employees BEGIN
+                {link}
+                {bump}
+            END""",
+        f"""CREATE TRIGGER employee_certifications_au AFTER UPDATE OF employee_id, certifications ON employees BEGIN
+                DELETE FROM employee_certifications WHERE employee_id = old.employee_id;
+                {link}
+            END""",
+        f"""CREATE TRIGGER employee_certifications_ad AFTER DELETE ON employees BEGIN
+                DELETE FROM employee_certifications WHERE employee_id = old.employee_id;
+                {bump}
+            END""",
+        f"""CREATE TRIGGER staffing_version_au
+            AFTER UPDATE OF employee_id, name, department, shift, status, certifications ON employees BEGIN
+                {bump}
+            END""",
+    ):
+        conn.execute(trigger)
+
+
+MIGRATIONS = [
+    (1, _leave_days),
+    (2, _name_lookup),
+    (3, _project_indexes),
+    (4, _project_split),
+    (5, _availability_calendar),
+    (6, _leave_events),
+    (7, _directory_search),
+    (8, _certifications),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Tables the triggers above derive from employees, leave_days and the project tables.
+# A bulk load with the triggers dropped (snapshot.import_tables) refills them with rebuild_derived.
+DERIVED_TABLES = ("leave_calendar", "headcount", "certifications", "employee_certifications", "staffing_version",
+                  "employee_names_fts", "directory_fts")
+
+# Tables whose rows may only be appended (their triggers reject UPDATE and DELETE)
+APPEND_ONLY_TABLES = ("leave_events",)
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations, each in its own transaction. Returns the schema version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target, migration in MIGRATIONS:
+        if target <= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version = target
+    return version
+
+
+def rebuild_derived(conn: sqlite3.Connection) -> None:
+    """Refill every table in DERIVED_TABLES from its source tables, inside the caller's transaction."""
+    for statement in (
+        "DELETE FROM leave_calendar", _LEAVE_CALENDAR_FILL,
+        "DELETE FROM headcount", _HEADCOUNT_FILL,
+        "DELETE FROM employee_certifications", "DELETE FROM certifications",
+        _CERTIFICATIONS_FILL, _EMPLOYEE_CERTIFICATIONS_FILL,
+        # Anything cached against the old version (find_employees bitmaps) is reloaded
+        "UPDATE staffing_version SET version = version + 1",
+    ):
+        conn.execute(statement)
+    # The FTS indexes are optional (SQLite may be built without FTS5)
+    present = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE name IN ('employee_names_fts', 'directory_fts')")}
+    if "employee_names_fts" in present:
+        conn.execute("INSERT INTO employee_names_fts(employee_names_fts) VALUES ('rebuild')")
+    if "directory_fts" in present:
+        conn.execute("DELETE FROM directory_fts")
+        conn.execute(_EMPLOYEE_DOCUMENT.format(where="1"))
+        conn.execute(_PROJECT_DOCUMENT.format(where="1"))
@@ -0,0 +1,66 @@
+import re
+import sqlite3
+from typing import List, Tuple
+
+from queries import sql
+
+# Free-text directory search over the directory_fts index (schema migration 7).
+# A question such as "AWS certified night-shift data engineers in Sales" is reduced to
+# its words, minus filler that describes the question rather than the people in it.
+# Words that occur nowhere in the index are dropped too (one indexed probe each), so
+# the remaining words can all be required: an AND query touches only the documents
+# matching every word, which is what keeps large directories fast. If no document has
+# all of them, the words are OR-ed instead and BM25 puts the closest matches first.
+
+# Filler words in directory questions; everything else is treated as a search term
+STOPWORDS = frozenset("""
+    a an and any are at by for from in is of on or the to who with
+    all show find list me people person employee employees staff team member members
+    certified certification certifications works working
+""".split())
+
+_WORD = re.compile(r"\w+")
+
+# Whether the served database has directory_fts; checked once per database (see forget_directory_enabled)
+_directory_enabled = None
+
+
+def directory_enabled(conn: sqlite3.Connection) -> bool:
+    """Whether the directory_fts index exists (SQLite may be built without FTS5)."""
+    global _directory_enabled
+    if _directory_enabled is None:
+        _directory_enabled = conn.execute(sql("schema.directory_enabled")).fetchone() is not None
+    return _directory_enabled
+
+
+def forget_directory_enabled() -> None:
+    """Re-check directory_enabled() on next use, e.g. after switching to another database."""
+    global _directory_enabled
+    _directory_enabled = None
+
+
+def search_terms(text: str) -> List[str]:
+    """Distinct search words of ``text``, lowercased, in order, without filler words."""
+    terms = []
+    for word in _WORD.findall(text.lower()):
+        if word not in STOPWORDS and word not in terms:
+            terms.append(word)
+    return terms
+
+
+def _phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def find_matches(conn: sqlite3.Connection, text: str, limit: int = 10) -> Tuple[List[tuple], str]:
+    """Best matches for ``text`` as (kind, ref, name, department, position, snippet, score) rows.
+
+    Also returns how the words were combined: "all", "any" or "none" (nothing to search for).
+    """
+    terms = [t for t in search_terms(text) if conn.execute(sql("search.probe"), (_phrase(t),)).fetchone()]
+    if not terms:
+        return [], "none"
+    rows = conn.execute(sql("search.match"), (" AND ".join(map(_phrase, terms)), limit)).fetchall()
+    if rows or len(terms) == 1:
+        return rows, "all"
+    return conn.execute(sql("search.match"), (" OR ".join(map(_phrase, terms)), limit)).fetchall(), "any"
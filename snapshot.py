@@ -0,0 +1,353 @@
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from init_db import BULK_PRAGMAS, create_tables
+from queries import sql
+from replicas import readonly_uri
+from schema import APPEND_ONLY_TABLES, DERIVED_TABLES, migrate, rebuild_derived
+
+# Snapshots of a live database: python snapshot.py {backup,export,import} ...
+# backup copies the whole file with the SQLite online backup API, a batch of pages
+# per step with a short sleep in between, so the source is only read-locked for one
+# step at a time and tool calls keep running. A write by another connection makes
+# SQLite restart the copy; after MAX_RESTARTS the rest is copied in one step (a
+# single read snapshot, which in WAL mode still does not block writers).
+# export writes tables as gzip-compressed JSON chunks holding one array per column,
+# read in one transaction so all tables come from the same snapshot; import loads
+# them back with executemany, in one transaction with the triggers off, then rebuilds
+# the tables those triggers maintain. Each operation returns throughput and pause statistics.
+
+DEFAULT_PAGES = 1024     # pages per backup step (4 MiB at the default page size)
+DEFAULT_SLEEP = 0.005    # seconds between backup steps
+MAX_RESTARTS = 3
+CHUNK_ROWS = 50_000      # rows per export chunk file
+COMPRESS_LEVEL = 3       # gzip level: about 2.5x faster than level 6 for files ~15% larger
+FORMAT = "leave-columnar/1"
+MANIFEST = "manifest.json"
+
+Progress = Optional[Callable[[int, int], None]]
+
+
+class _Restarted(Exception):
+    pass
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _rate(amount: float, seconds: float) -> float:
+    return round(amount / seconds, 1) if seconds > 0 else 0.0
+
+
+# ----------------- BACKUP ------------------
+
+def backup_database(source: sqlite3.Connection, dest_path: str, pages: int = DEFAULT_PAGES,
+                    sleep: float = DEFAULT_SLEEP, progress: Progress = None) -> Dict[str, object]:
+    """Copy the database behind ``source`` to ``dest_path`` (replaced atomically) in steps of ``pages`` pages.
+
+    ``progress(done, total)`` is called with page counts after every step.
+    """
+    tmp = f"{dest_path}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    dest = sqlite3.connect(tmp)
+    steps: List[float] = []
+    state = {"step_started": 0.0, "remaining": None, "restarts": 0}
+
+    def on_step(status, remaining, total):
+        steps.append(time.perf_counter() - state["step_started"])
+        # A step always copies pages, so no progress means SQLite started over after a write
+        if state["remaining"] is not None and remaining >= state["remaining"]:
+            state["restarts"] += 1
+            if state["restarts"] > MAX_RESTARTS:
+                raise _Restarted()
+        state["remaining"] = remaining
+        if progress is not None:
+            progress(total - remaining, total)
+        if remaining and sleep > 0:
+            time.sleep(sleep)  # let tool calls at the database between steps
+        state["step_started"] = time.perf_counter()
+
+    started = time.perf_counter()
+    fallback = False
+    try:
+        try:
+            state["step_started"] = time.perf_counter()
+            source.backup(dest, pages=pages, progress=on_step)
+        except _Restarted:
+            fallback = True
+            state["step_started"] = time.perf_counter()
+            source.backup(dest)
+            steps.append(time.perf_counter() - state["step_started"])
+        # A self-contained file: no -wal/-shm next to the snapshot
+        dest.execute("PRAGMA journal_mode = DELETE")
+        page_count = dest.execute("PRAGMA page_count").fetchone()[0]
+        page_size = dest.execute("PRAGMA page_size").fetchone()[0]
+    finally:
+        dest.close()
+    os.replace(tmp, dest_path)
+    seconds = time.perf_counter() - started
+    size = page_count * page_size
+    return {
+        "path": dest_path,
+        "pages": page_count,
+        "bytes": size,
+        "seconds": round(seconds, 3),
+        "mb_per_second": _rate(size / 1e6, seconds),
+        "steps": len(steps),
+        "pages_per_step": pages,
+        "max_step_ms": round(max(steps, default=0.0) * 1000, 2),
+        "avg_step_ms": round(sum(steps) / len(steps) * 1000, 2) if steps else 0.0,
+        "restarts": state["restarts"],
+        "single_step_fallback": fallback,
+    }
+
+
+# ----------------- COLUMNAR EXPORT / IMPORT ------------------
+
+def exportable_tables(conn: sqlite3.Connection) -> List[str]:
+    """Ordinary tables: no sqlite_ internals, virtual tables or their shadow tables, and no
+    trigger-maintained tables, which an import rebuilds rather than loads."""
+    return [row[0] for row in conn.execute(sql("snapshot.tables")) if row[0] not in DERIVED_TABLES]
+
+
+def _no_blobs(value):
+    raise TypeError(f"Cannot export {type(value).__name__} values; only TEXT, INTEGER, REAL and NULL columns")
+
+
+def export_tables(conn: sqlite3.Connection, directory: str, tables: Optional[Sequence[str]] = None,
+                  chunk_rows: int = CHUNK_ROWS, progress: Progress = None) -> Dict[str, object]:
+    """Write ``tables`` (default: every exportable table) into ``directory`` as columnar chunks plus a manifest."""
+    os.makedirs(directory, exist_ok=True)
+    started = time.perf_counter()
+    manifest = {"format": FORMAT, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "tables": {}}
+    stats = {"directory": directory, "tables": {}}
+    conn.execute("BEGIN")  # one read snapshot for every table
+    try:
+        names = list(tables or exportable_tables(conn))
+        manifest["user_version"] = conn.execute("PRAGMA user_version").fetchone()[0]
+        done, total = 0, sum(conn.execute(f"SELECT count(*) FROM {_quote(n)}").fetchone()[0] for n in names)
+        for table in names:
+            table_started = time.perf_counter()
+            row = conn.execute(sql("snapshot.table_sql"), (table,)).fetchone()
+            if row is None:
+                raise ValueError(f"No table named {table!r}.")
+            cursor = conn.execute(f"SELECT * FROM {_quote(table)}")
+            columns = [d[0] for d in cursor.description]
+            chunks, size = [], 0
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                name = f"{table}.{len(chunks):05d}.json.gz"
+                path = os.path.join(directory, name)
+                # Serialized and compressed in one call each: far faster than streaming json through gzip
+                payload = json.dumps({"rows": len(rows), "columns": dict(zip(columns, map(list, zip(*rows))))},
+                                     separators=(",", ":"), default=_no_blobs)
+                compressed = gzip.compress(payload.encode(), compresslevel=COMPRESS_LEVEL)
+                with open(path, "wb") as f:
+                    f.write(compressed)
+                size += len(compressed)
+                chunks.append({"file": name, "rows": len(rows)})
+                done += len(rows)
+                if progress is not None:
+                    progress(done, total)
+            rows_total = sum(c["rows"] for c in chunks)
+            manifest["tables"][table] = {
+                "sql": row[0],
+                "indexes": [r[0] for r in conn.execute(sql("snapshot.indexes"), (table,))],
+                "columns": columns,
+                "rows": rows_total,
+                "chunks": chunks,
+            }
+            seconds = time.perf_counter() - table_started
+            stats["tables"][table] = {"rows": rows_total, "chunks": len(chunks), "bytes": size,
+                                      "seconds": round(seconds, 3), "rows_per_second": _rate(rows_total, seconds)}
+    finally:
+        conn.rollback()
+    with open(os.path.join(directory, MANIFEST + ".tmp"), "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(os.path.join(directory, MANIFEST + ".tmp"), os.path.join(directory, MANIFEST))
+    return _totals(stats, time.perf_counter() - started)
+
+
+def _totals(stats: Dict[str, object], seconds: float) -> Dict[str, object]:
+    rows = sum(t["rows"] for t in stats["tables"].values())
+    size = sum(t["bytes"] for t in stats["tables"].values())
+    stats.update(rows=rows, bytes=size, seconds=round(seconds, 3), rows_per_second=_rate(rows, seconds),
+                 mb_per_second=_rate(size / 1e6, seconds))
+    return stats
+
+
+def read_manifest(directory: str) -> dict:
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT:
+        raise ValueError(f"{directory} is not a {FORMAT} export.")
+    return manifest
+
+
+def import_tables(conn: sqlite3.Connection, directory: str, tables: Optional[Sequence[str]] = None,
+                  replace: bool = False, progress: Progress = None) -> Dict[str, object]:
+    """Load an export into ``conn``, a database at the current schema version, in one transaction.
+
+    Triggers are dropped for the load and recreated afterwards, so loaded rows do not
+    fire them (no duplicate opening events in leave_events); the tables they maintain
+    (schema.DERIVED_TABLES) are not loaded but rebuilt from the loaded data instead.
+    Tables the schema does not know are created from the exported definition, with
+    their indexes added after the load. Rows are appended to existing tables, or
+    replace their contents with ``replace``, which append-only tables refuse.
+    """
+    manifest = read_manifest(directory)
+    names = list(tables or manifest["tables"])
+    unknown = [t for t in names if t not in manifest["tables"]]
+    if unknown:
+        raise ValueError(f"Not in this export: {', '.join(unknown)}.")
+    if replace and set(names) & set(APPEND_ONLY_TABLES):
+        raise ValueError(f"{', '.join(t for t in names if t in APPEND_ONLY_TABLES)} is append-only and cannot be "
+                         "replaced; import into a new database file instead.")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if manifest.get("user_version") != version:
+        raise ValueError(f"The export is at schema version {manifest.get('user_version')} but the target is at "
+                         f"{version}; import into a new database file instead.")
+    names = [t for t in names if t not in DERIVED_TABLES]
+    started = time.perf_counter()
+    stats = {"directory": directory, "tables": {}, "rebuilt": list(DERIVED_TABLES)}
+    done, total = 0, sum(manifest["tables"][t]["rows"] for t in names)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        triggers = conn.execute(sql("snapshot.triggers")).fetchall()
+        for name, _ in triggers:
+            conn.execute(f"DROP TRIGGER {_quote(name)}")
+        for table in names:
+            entry = manifest["tables"][table]
+            table_started = time.perf_counter()
+            columns = entry["columns"]
+            insert = (f"INSERT INTO {_quote(table)} ({', '.join(map(_quote, columns))}) "
+                      f"VALUES ({', '.join('?' * len(columns))})")
+            size = 0
+            created = conn.execute(sql("snapshot.table_sql"), (table,)).fetchone() is None
+            if created:
+                conn.execute(entry["sql"])
+            elif replace:
+                conn.execute(f"DELETE FROM {_quote(table)}")
+            for chunk in entry["chunks"]:
+                path = os.path.join(directory, chunk["file"])
+                size += os.path.getsize(path)
+                with open(path, "rb") as f:
+                    data = json.loads(gzip.decompress(f.read()))["columns"]
+                conn.executemany(insert, zip(*(data[c] for c in columns)))
+                done += chunk["rows"]
+                if progress is not None:
+                    progress(done, total)
+            if created:
+                for index in entry["indexes"]:
+                    conn.execute(index)
+            seconds = time.perf_counter() - table_started
+            stats["tables"][table] = {"rows": entry["rows"], "chunks": len(entry["chunks"]), "bytes": size,
+                                      "created": created, "seconds": round(seconds, 3),
+                                      "rows_per_second": _rate(entry["rows"], seconds)}
+        for _, trigger_sql in triggers:
+            conn.execute(trigger_sql)
+        rebuild_started = time.perf_counter()
+        rebuild_derived(conn)
+        stats["rebuild_seconds"] = round(time.perf_counter() - rebuild_started, 3)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return _totals(stats, time.perf_counter() - started)
+
+
+def import_database(directory: str, dest_path: str, tables: Optional[Sequence[str]] = None,
+                    replace: bool = False, progress: Progress = None) -> Dict[str, object]:
+    """Import an export into the database file ``dest_path`` (see import_tables).
+
+    A missing file is built from scratch, with init_db's base tables and every schema
+    migration, so views, FTS indexes, triggers and user_version are all in place. It is
+    written under a temporary name with bulk-load pragmas and renamed once complete.
+    An existing file is migrated to the current schema first.
+    """
+    if os.path.exists(dest_path):
+        conn = sqlite3.connect(dest_path)
+        try:
+            migrate(conn)
+            stats = import_tables(conn, directory, tables, replace, progress)
+        finally:
+            conn.close()
+        return {**stats, "path": dest_path, "new_file": False}
+    tmp = f"{dest_path}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        for name, value in BULK_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        create_tables(conn)
+        migrate(conn)
+        stats = import_tables(conn, directory, tables, replace, progress)
+        conn.execute("PRAGMA analysis_limit = 1000")
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA locking_mode = NORMAL")
+        conn.execute("PRAGMA journal_mode = WAL")
+    except BaseException:
+        conn.close()
+        os.remove(tmp)
+        raise
+    conn.close()
+    os.replace(tmp, dest_path)
+    return {**stats, "path": dest_path, "new_file": True}
+
+
+# ----------------- CLI ------------------
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Back up, export or import the leave database while it is in use.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    backup = commands.add_parser("backup", help="online copy with the SQLite backup API")
+    backup.add_argument("source", help="live database")
+    backup.add_argument("dest", help="snapshot file to (re)create")
+    backup.add_argument("--pages", type=int, default=DEFAULT_PAGES, help=f"pages per step (default {DEFAULT_PAGES})")
+    backup.add_argument("--sleep", type=float, default=DEFAULT_SLEEP,
+                        help=f"seconds between steps (default {DEFAULT_SLEEP})")
+    export = commands.add_parser("export", help="tables to gzip columnar chunks")
+    export.add_argument("source", help="live database")
+    export.add_argument("directory", help="export directory")
+    export.add_argument("--table", action="append", dest="tables", help="table to export; repeatable (default: all)")
+    export.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help=f"rows per chunk (default {CHUNK_ROWS})")
+    load = commands.add_parser("import", help="load an export with executemany")
+    load.add_argument("directory", help="export directory")
+    load.add_argument("dest", help="database to load into (built with the full schema if missing)")
+    load.add_argument("--table", action="append", dest="tables", help="table to import; repeatable (default: all)")
+    load.add_argument("--replace", action="store_true",
+                      help="delete existing rows of each imported table first (not for append-only tables)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.command == "import":
+        stats = import_database(args.directory, args.dest, args.tables, args.replace)
+    else:
+        conn = sqlite3.connect(readonly_uri(args.source), uri=True)
+        try:
+            if args.command == "backup":
+                stats = backup_database(conn, args.dest, args.pages, args.sleep)
+            else:
+                stats = export_tables(conn, args.directory, args.tables, args.chunk_rows)
+        finally:
+            conn.close()
+    json.dump(stats, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
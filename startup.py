@@ -0,0 +1,110 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+# Startup bookkeeping shared by launcher.py and main.py.
+# ``timer`` collects milestones (ms since this module was first imported, i.e. since
+# the server started loading) and phase durations; they are logged once the schema
+# is ready and served at startup://stats. ensure_schema() is the readiness check run
+# on the first pooled connection: it fails fast on a database without base tables,
+# applies pending migrations and verifies query plans, skipping the plan check when
+# the schema fingerprint matches the one recorded after the last successful check.
+
+log = logging.getLogger(__name__)
+
+# Base tables created by init_db.py; migrations build everything else on top of them
+BASE_TABLES = ("employees", "projects")
+
+
+class StartupTimer:
+    """Milestones since process start plus named phase durations, in milliseconds."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.milestones: Dict[str, float] = {}
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, name: str) -> None:
+        self.milestones.setdefault(name, round((time.perf_counter() - self.started) * 1000, 2))
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(self.phases.get(name, 0.0) + (time.perf_counter() - start) * 1000, 2)
+
+    def stats(self) -> Dict[str, object]:
+        return {"milestones_ms": dict(self.milestones), "phases_ms": dict(self.phases)}
+
+    def summary(self) -> str:
+        parts = [f"{name} at {ms}ms" for name, ms in self.milestones.items()]
+        parts += [f"{name} {ms}ms" for name, ms in self.phases.items()]
+        return "Startup: " + ", ".join(parts)
+
+
+timer = StartupTimer()
+
+
+# ----------------- SCHEMA READINESS ------------------
+
+def schema_fingerprint(conn: sqlite3.Connection, plan_check: str) -> str:
+    """Hash of everything the plan check depends on: schema objects, statements and SQLite version."""
+    from queries import QUERIES
+
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    objects = conn.execute("SELECT type, name, sql FROM sqlite_master ORDER BY type, name").fetchall()
+    statements = sorted((name, q.sql, q.hot) for name, q in QUERIES.items())
+    key = repr((version, objects, statements, sqlite3.sqlite_version, plan_check))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def _fingerprint_file(conn: sqlite3.Connection):
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    return f"{path}-fingerprint" if path else None  # in-memory databases are not cached
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def ensure_schema(conn: sqlite3.Connection, plan_check: str = "warn") -> bool:
+    """Make the database behind ``conn`` ready for the tools; returns True if the cached fingerprint matched.
+
+    Raises RuntimeError when the base tables are missing (see init_db.py).
+    """
+    # Imported here so launcher.py can import this module for the timer alone
+    from queries import check_plans
+    from schema import SCHEMA_VERSION, migrate
+
+    with timer.phase("schema_check"):
+        present = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+        missing = [t for t in BASE_TABLES if t not in present]
+        if missing:
+            raise RuntimeError(f"Database has no {', '.join(missing)} table(s); create it with init_db.py.")
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            with timer.phase("migrations"):
+                migrate(conn)
+        fingerprint = schema_fingerprint(conn, plan_check)
+        path = _fingerprint_file(conn)
+        if path is not None and _read(path) == fingerprint:
+            return True
+        with timer.phase("plan_check"):
+            problems = check_plans(conn, plan_check)
+        if path is not None and not problems:
+            try:
+                with open(f"{path}.tmp", "w") as f:
+                    f.write(fingerprint + "\n")
+                os.replace(f"{path}.tmp", path)
+            except OSError as exc:
+                log.debug("Could not cache the schema fingerprint at %s: %s", path, exc)
+        return False
@@ -0,0 +1,39 @@
+import shutil
+
+import pytest
+
+import init_db
+import main
+
+
+@pytest.fixture(scope="session")
+def generated_db(tmp_path_factory):
+    """A small generated database (300 employees, 600 projects, 5 leave days each), built once."""
+    path = tmp_path_factory.mktemp("data") / "generated.db"
+    init_db.create_db(str(path), 300, 600, 5, seed=7, use_pools=True)
+    return path
+
+
+@pytest.fixture
+def db_path(generated_db, tmp_path):
+    """A private copy of ``generated_db`` for tests that write to it."""
+    path = tmp_path / "employees.db"
+    shutil.copy(generated_db, path)
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def server(generated_db):
+    """main's tools pointed at the generated database, called through their synchronous bodies."""
+    main.configure(str(generated_db))
+    yield main
+    main.configure(main.DB_PATH)
+
+
+@pytest.fixture
+def writable_server(db_path):
+    """main's tools pointed at a private copy of the generated database, for tools that write."""
+    previous = main.pool.db_path
+    main.configure(db_path)
+    yield main
+    main.configure(previous)
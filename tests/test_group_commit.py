@@ -0,0 +1,62 @@
+import sqlite3
+
+import pytest
+
+from db_pool import ConnectionPool
+from group_commit import GroupCommit
+
+
+@pytest.fixture
+def writer(tmp_path):
+    path = str(tmp_path / "writes.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE items (name TEXT PRIMARY KEY)")
+    pool = ConnectionPool(path, size=2)
+    # A wide window so every call submitted below lands in the same batch
+    yield GroupCommit(pool=pool, window=0.5)
+    pool.close()
+
+
+def _names(writer):
+    with writer.pool.connection() as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM items")}
+
+
+def test_failing_call_rolls_back_only_its_savepoint(writer):
+    done = []
+
+    def insert(*names, fail=False):
+        with writer.connection() as conn:
+            for name in names:
+                conn.execute("INSERT INTO items (name) VALUES (?)", (name,))
+            writer.after_commit(done.append, names[0])
+            if fail:
+                raise ValueError("rejected")
+        return len(names)
+
+    futures = [writer.submit(insert, "a"),
+               writer.submit(insert, "b", "c", fail=True),
+               writer.submit(insert, "d", "a"),  # duplicate key: fails inside its own savepoint
+               writer.submit(insert, "e", "f")]
+
+    assert futures[0].result(timeout=5) == 1
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=5)
+    with pytest.raises(sqlite3.IntegrityError):
+        futures[2].result(timeout=5)
+    assert futures[3].result(timeout=5) == 2
+
+    assert _names(writer) == {"a", "e", "f"}
+    assert done == ["a", "e"]  # after_commit callbacks of failed calls are dropped
+    stats = writer.stats()
+    assert (stats["batches"], stats["writes"], stats["failed_writes"], stats["failed_batches"]) == (1, 4, 2, 0)
+
+
+def test_transaction_outside_a_batch_commits_on_its_own(writer):
+    with writer.connection() as conn:
+        writer.transaction(conn, lambda c: c.execute("INSERT INTO items (name) VALUES ('solo')"))
+        with pytest.raises(sqlite3.IntegrityError):
+            writer.transaction(conn, lambda c: c.execute("INSERT INTO items (name) VALUES ('solo')"))
+
+    assert _names(writer) == {"solo"}
+    assert writer.stats()["batches"] == 0
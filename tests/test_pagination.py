@@ -0,0 +1,97 @@
+import json
+import sqlite3
+
+import pytest
+
+PAGE = 4
+
+
+@pytest.fixture(scope="module")
+def db(generated_db):
+    conn = sqlite3.connect(generated_db)
+    yield conn
+    conn.close()
+
+
+def _walk(tool, key, **kwargs):
+    """Follow next_cursor from the first page to the last; returns every page's items."""
+    pages, cursor = [], None
+    while True:
+        page = json.loads(tool.__wrapped__(**kwargs, limit=PAGE, cursor=cursor, output_format="json"))
+        assert len(page[key]) <= PAGE
+        pages.append(page[key])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def _assert_pages(pages, keys, expected):
+    assert len(pages) > 2
+    assert all(len(page) == PAGE for page in pages[:-1])  # only the last page may be short
+    seen = [keys(item) for page in pages for item in page]
+    assert len(seen) == len(set(seen)), "pages overlap"
+    assert seen == expected, "pages skip or reorder rows"
+
+
+def test_on_leave_pages(server, db):
+    date = db.execute("SELECT leave_date FROM leave_days GROUP BY 1 ORDER BY count(*) DESC LIMIT 1").fetchone()[0]
+    expected = [r[0] for r in db.execute("SELECT employee_id FROM leave_days WHERE leave_date = ? ORDER BY 1", (date,))]
+    pages = _walk(server.get_employees_on_leave, "employees", date=date)
+    _assert_pages(pages, lambda e: e["employee_id"], expected)
+
+
+@pytest.mark.parametrize("index_rows", [1, 10 ** 6], ids=["by_employee", "by_date"])
+def test_on_leave_between_pages(server, db, monkeypatch, index_rows):
+    monkeypatch.setattr(server, "BETWEEN_INDEX_ROWS", index_rows)
+    start, end = db.execute("SELECT min(leave_date), date(min(leave_date), '+60 days') FROM leave_days").fetchone()
+    expected = {}
+    for employee_id, leave_date in db.execute(
+            "SELECT employee_id, leave_date FROM leave_days WHERE leave_date BETWEEN ? AND ? ORDER BY 1, 2",
+            (start, end)):
+        expected.setdefault(employee_id, []).append(leave_date)
+    pages = _walk(server.get_employees_on_leave_between, "employees", start_date=start, end_date=end)
+    _assert_pages(pages, lambda e: e["employee_id"], list(expected))
+    assert {e["employee_id"]: sorted(e["leave_dates"]) for page in pages for e in page} == expected
+
+
+def test_project_member_pages_with_repeated_employees(server, db):
+    # An employee holding several assignments on the project spans the compound (employee_id, project_id) key
+    project_key, name = db.execute("""
+        SELECT c.project_key, c.project_name FROM project_assignments a JOIN project_catalog c USING (project_key)
+        GROUP BY 1 HAVING count(*) > count(DISTINCT a.employee_id) ORDER BY count(*) DESC LIMIT 1
+    """).fetchone()
+    expected = [tuple(r) for r in db.execute(
+        "SELECT employee_id, project_id FROM project_assignments WHERE project_key = ? ORDER BY 1, 2", (project_key,))]
+    pages = _walk(server.get_project_employees, "employees", project_identifier=name)
+    _assert_pages(pages, lambda e: (e["employee_id"], e["project_id"]), expected)
+
+
+def test_employee_project_pages(server, db):
+    employee_id = db.execute("SELECT employee_id FROM project_assignments GROUP BY 1 ORDER BY count(*) DESC LIMIT 1"
+                             ).fetchone()[0]
+    expected = [r[0] for r in db.execute(
+        "SELECT project_id FROM project_assignments WHERE employee_id = ? ORDER BY 1", (employee_id,))]
+    pages = _walk(server.get_employee_projects, "projects", identifier=employee_id)
+    assert [p["project_id"] for page in pages for p in page] == expected
+
+
+def test_find_employees_pages(server, db):
+    expected = [r[0] for r in db.execute(
+        "SELECT employee_id FROM employees WHERE status = 'Active' ORDER BY 1")]
+    pages = _walk(server.find_employees, "employees", filters={"status": ["Active"]})
+    _assert_pages(pages, lambda e: e["employee_id"], expected)
+
+
+def test_cursor_is_bound_to_its_query(server, db):
+    first, second = [r[0] for r in db.execute(
+        "SELECT leave_date FROM leave_days GROUP BY 1 ORDER BY count(*) DESC, 1 LIMIT 2")]
+    page = json.loads(server.get_employees_on_leave.__wrapped__(date=first, limit=1, output_format="json"))
+    with pytest.raises(ValueError):
+        server.get_employees_on_leave.__wrapped__(date=second, limit=1, cursor=page["next_cursor"])
+
+
+@pytest.mark.parametrize("start, end", [("2025-1-1", "2025-01-31"), ("2025-02-30", "2025-03-01"),
+                                        ("2025-03-01", "2025-02-01")])
+def test_on_leave_between_rejects_bad_ranges(server, start, end):
+    reply = json.loads(server.get_employees_on_leave_between.__wrapped__(start, end, output_format="json"))
+    assert "error" in reply
@@ -0,0 +1,63 @@
+import shutil
+import sqlite3
+from pathlib import Path
+
+import init_db
+import schema
+
+BASELINE_DB = Path(__file__).resolve().parent.parent / "employees.db"
+
+
+def _baseline(tmp_path) -> sqlite3.Connection:
+    path = tmp_path / "baseline.db"
+    shutil.copy(BASELINE_DB, path)
+    return sqlite3.connect(path)
+
+
+def _objects(conn: sqlite3.Connection) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+
+
+def test_baseline_upgrades_to_current_version(tmp_path):
+    conn = _baseline(tmp_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+
+    assert schema.migrate(conn) == schema.SCHEMA_VERSION == 8
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 8
+    assert {"leave_days", "project_catalog", "project_assignments", "leave_calendar", "headcount",
+            "leave_events", "staffing_version", "certifications", "employee_certifications"} <= _objects(conn)
+    assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+
+    # Every history item became a leave_days row and every certification ('None' aside) a join row
+    def items(column):
+        return {(employee_id, item.strip())
+                for employee_id, value in conn.execute(f"SELECT employee_id, {column} FROM employees")
+                for item in value.split(",") if item.strip() not in ("", "None")}
+
+    assert set(conn.execute("SELECT employee_id, leave_date FROM leave_days")) == items("leave_history")
+    assert set(conn.execute("SELECT ec.employee_id, c.name FROM employee_certifications ec "
+                            "JOIN certifications c USING (cert_key)")) == items("certifications")
+
+
+def test_migrate_is_idempotent(tmp_path):
+    conn = _baseline(tmp_path)
+    schema.migrate(conn)
+    before = _objects(conn), conn.execute("SELECT COUNT(*) FROM leave_days").fetchone()[0]
+
+    assert schema.migrate(conn) == schema.SCHEMA_VERSION
+    assert (_objects(conn), conn.execute("SELECT COUNT(*) FROM leave_days").fetchone()[0]) == before
+
+
+def test_migration_splits_items_with_quotes(tmp_path):
+    conn = sqlite3.connect(tmp_path / "quotes.db")
+    init_db.create_tables(conn)
+    conn.execute("INSERT INTO employees (employee_id, name, leave_history, certifications) "
+                 "VALUES ('E001', 'Ann', ' 2025-01-02 ,2025-01-03,,', 'AWS \"Pro\",O''Reilly\\SQL')")
+    conn.commit()
+
+    schema.migrate(conn)
+
+    assert conn.execute("SELECT leave_date FROM leave_days ORDER BY 1").fetchall() == [("2025-01-02",), ("2025-01-03",)]
+    names = {row[0] for row in conn.execute("SELECT name FROM certifications")}
+    assert names == {'AWS "Pro"', "O'Reilly\\SQL"}
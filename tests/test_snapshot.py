@@ -0,0 +1,89 @@
+import sqlite3
+
+import pytest
+
+import schema
+import snapshot
+
+
+def _contents(conn: sqlite3.Connection) -> dict:
+    """Every loaded and derived table's rows, plus the schema objects, in comparable form."""
+    state = {table: sorted(conn.execute(f"SELECT * FROM {table}"), key=repr)
+             for table in snapshot.exportable_tables(conn)}
+    state["leave_calendar"] = sorted(conn.execute("SELECT * FROM leave_calendar"))
+    state["headcount"] = sorted(conn.execute("SELECT * FROM headcount"))
+    state["employee_certifications"] = sorted(conn.execute(
+        "SELECT ec.employee_id, c.name FROM employee_certifications ec JOIN certifications c USING (cert_key)"))
+    state["directory_fts"] = sorted(conn.execute("SELECT rowid, * FROM directory_fts"), key=repr)
+    state["objects"] = sorted(conn.execute("SELECT type, name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"))
+    state["user_version"] = conn.execute("PRAGMA user_version").fetchone()[0]
+    return state
+
+
+@pytest.fixture
+def exported(db_path, tmp_path):
+    """A source database with an extra table, and its export directory."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE notes (note_id INTEGER PRIMARY KEY, employee_id TEXT, body TEXT)")
+    conn.execute("CREATE INDEX idx_notes_employee ON notes(employee_id)")
+    conn.executemany("INSERT INTO notes (employee_id, body) VALUES (?, ?)",
+                     [(f"E{n:03d}", f"note {n}, with \"quotes\" and 'apostrophes'") for n in range(1, 50)])
+    conn.commit()
+    directory = str(tmp_path / "export")
+    snapshot.export_tables(conn, directory, chunk_rows=64)
+    yield conn, directory
+    conn.close()
+
+
+def test_round_trip_into_new_file(exported, tmp_path):
+    source, directory = exported
+    stats = snapshot.import_database(directory, str(tmp_path / "restored.db"))
+
+    assert stats["new_file"] and stats["tables"]["notes"]["created"]
+    restored = sqlite3.connect(stats["path"])
+    assert _contents(restored) == _contents(source)
+    assert restored.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    assert restored.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    # Loaded employees fire no triggers: each still has exactly its one opening event
+    assert restored.execute("SELECT count(*) FROM leave_events").fetchone()[0] \
+        == restored.execute("SELECT count(*) FROM employees").fetchone()[0]
+    restored.close()
+
+
+def test_replace_keeps_append_only_log(exported, tmp_path):
+    source, directory = exported
+    target = str(tmp_path / "target.db")
+    snapshot.import_database(directory, target)
+    conn = sqlite3.connect(target)
+    conn.execute("UPDATE employees SET department = 'Changed', status = 'Active'")
+    conn.commit()
+    events = conn.execute("SELECT count(*) FROM leave_events").fetchone()[0]
+
+    stats = snapshot.import_tables(conn, directory, ["employees"], replace=True)
+
+    assert stats["tables"]["employees"]["created"] is False
+    assert _contents(conn) == _contents(source)
+    assert conn.execute("SELECT count(*) FROM leave_events").fetchone()[0] == events
+    with pytest.raises(ValueError, match="append-only"):
+        snapshot.import_tables(conn, directory, ["employees", "leave_events"], replace=True)
+    conn.close()
+
+
+def test_failed_import_rolls_back(exported):
+    source, directory = exported
+    before = _contents(source)
+
+    # Appending the same employees again violates their primary key part-way through the load
+    with pytest.raises(sqlite3.IntegrityError):
+        snapshot.import_tables(source, directory, ["notes", "employees"])
+
+    assert _contents(source) == before  # rows, and the triggers dropped for the load
+
+
+def test_import_refuses_other_schema_version(exported, tmp_path):
+    _, directory = exported
+    conn = sqlite3.connect(tmp_path / "old.db")
+    conn.execute(f"PRAGMA user_version = {schema.SCHEMA_VERSION - 1}")
+    with pytest.raises(ValueError, match="schema version"):
+        snapshot.import_tables(conn, directory)
+    conn.close()
@@ -0,0 +1,65 @@
+import json
+import sqlite3
+
+import pytest
+
+
+def _reply(tool, *args, **kwargs):
+    return json.loads(tool.__wrapped__(*args, **kwargs, output_format="json"))
+
+
+@pytest.mark.parametrize("start, end", [("2030-1-1", "2030-01-02"), ("2030-01-01", "2030-02-30"),
+                                        ("2030-01-02", "2030-01-01")])
+def test_team_capacity_rejects_bad_ranges(server, start, end):
+    assert "error" in _reply(server.get_team_capacity, start, end)
+
+
+def test_team_capacity_counts_active_employees(server, generated_db):
+    with sqlite3.connect(generated_db) as conn:
+        active = conn.execute("SELECT count(*) FROM employees WHERE status = 'Active'").fetchone()[0]
+    (row,) = _reply(server.get_team_capacity, "2030-01-01", "2030-01-01", group_by=[])["capacity"]
+    assert (row["headcount"], row["on_leave"]) == (active, 0)
+
+
+def test_find_employees_rejects_unknown_filters(server):
+    reply = _reply(server.find_employees, {"location": ["Nowhere"], "status": ["Active"]})
+    assert "'location'" in reply["error"] and "certifications" in reply["error"]
+
+
+def test_find_employees_keeps_unknown_filters_through_mcp_validation(server):
+    arguments = server.mcp._tool_manager.get_tool("find_employees").fn_metadata.arg_model.model_validate(
+        {"filters": {"location": ["Nowhere"]}})
+    assert arguments.filters == {"location": ["Nowhere"]}
+
+
+def test_employees_info_rows_carry_their_identifier(server, generated_db):
+    with sqlite3.connect(generated_db) as conn:
+        employee_id, name = conn.execute("SELECT employee_id, name FROM employees ORDER BY 1 LIMIT 1").fetchone()
+    results = json.loads(server.get_employees_info.__wrapped__([name, employee_id, "E999999"],
+                                                               fields=["employee_id"]))["results"]
+    assert results == [{"identifier": name, "employee_id": employee_id},
+                       {"identifier": employee_id, "employee_id": employee_id},
+                       {"identifier": "E999999", "error": "Employee not found."}]
+
+
+def test_apply_leave_bulk_rejects_empty_date_lists(writable_server, db_path):
+    with sqlite3.connect(db_path) as conn:
+        first, second = [r[0] for r in conn.execute("SELECT employee_id FROM employees ORDER BY 1 LIMIT 2")]
+    results = json.loads(writable_server.apply_leave_bulk.__wrapped__(
+        [{"identifier": first, "dates": []}, {"identifier": second, "dates": ["2031-01-02"]}]))["results"]
+
+    assert "error" in results[0] and results[1]["applied_days"] == 1
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT count(*) FROM leave_events WHERE kind = 'apply'").fetchone()[0] == 1
+
+
+def test_configure_closes_the_previous_database_state(writable_server):
+    main = writable_server
+    main.find_employees.__wrapped__({"status": ["Active"]})
+    reader = main.staffing._readers[main.pool.db_path]
+
+    main.configure(main.pool.db_path)
+
+    assert main.staffing.stats()["snapshots"] == {} and main.cache.stats()["size"] == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        reader.execute("SELECT 1")
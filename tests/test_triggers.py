@@ -0,0 +1,105 @@
+import random
+import sqlite3
+
+import pytest
+
+import schema
+
+DEPARTMENTS = ["Sales", "HR", "Finance", None]
+LOCATIONS = ["Millerport", "Jasonfort", None]
+SHIFTS = ["Day", "Rotational", None]
+STATUSES = ["Active", "On Leave", "Resigned"]
+CERTIFICATIONS = ["AWS", "GCP,AWS", "Azure, Kubernetes", "None", ""]
+
+
+def _ids(conn, sql):
+    return [row[0] for row in conn.execute(sql)]
+
+
+def _mutate(conn: sqlite3.Connection, rng: random.Random) -> None:
+    """A mix of the writes the triggers must follow, in one transaction."""
+    employees = _ids(conn, "SELECT employee_id FROM employees")
+    days = [f"2025-03-{day:02d}" for day in range(1, 29)]
+    for n in range(20):
+        employee_id = f"T{n:03d}"
+        conn.execute("INSERT INTO employees (employee_id, name, department, location, shift, status, certifications, "
+                     "leave_balance) VALUES (?, ?, ?, ?, ?, ?, ?, 10)",
+                     (employee_id, f"Test Person {n}", rng.choice(DEPARTMENTS), rng.choice(LOCATIONS),
+                      rng.choice(SHIFTS), rng.choice(STATUSES), rng.choice(CERTIFICATIONS)))
+        employees.append(employee_id)
+    for employee_id in rng.sample(employees, 80):
+        conn.execute("INSERT OR IGNORE INTO leave_days (employee_id, leave_date) VALUES (?, ?)",
+                     (employee_id, rng.choice(days)))
+    for employee_id, leave_date in rng.sample(conn.execute("SELECT employee_id, leave_date FROM leave_days").fetchall(), 40):
+        conn.execute("DELETE FROM leave_days WHERE employee_id = ? AND leave_date = ?", (employee_id, leave_date))
+    for employee_id in rng.sample(employees, 40):
+        conn.execute("UPDATE employees SET status = ? WHERE employee_id = ?", (rng.choice(STATUSES), employee_id))
+    for employee_id in rng.sample(employees, 40):
+        conn.execute("UPDATE employees SET department = ?, location = ?, shift = ? WHERE employee_id = ?",
+                     (rng.choice(DEPARTMENTS), rng.choice(LOCATIONS), rng.choice(SHIFTS), employee_id))
+    for employee_id in rng.sample(employees, 20):
+        conn.execute("UPDATE employees SET certifications = ?, name = name || ' Jr' WHERE employee_id = ?",
+                     (rng.choice(CERTIFICATIONS), employee_id))
+    projects = _ids(conn, "SELECT project_key FROM project_catalog")
+    for project_key in rng.sample(projects, 5):
+        conn.execute("UPDATE project_catalog SET project_name = project_name || ' II' WHERE project_key = ?",
+                     (project_key,))
+    for n in range(10):
+        conn.execute("INSERT INTO project_assignments (project_id, project_key, employee_id, role) VALUES (?, ?, ?, ?)",
+                     (f"TP{n:03d}", rng.choice(projects), rng.choice(employees), "Tester"))
+    assignments = _ids(conn, "SELECT project_id FROM project_assignments")
+    for project_id in rng.sample(assignments, 10):
+        conn.execute("UPDATE project_assignments SET role = 'Lead', employee_id = ? WHERE project_id = ?",
+                     (rng.choice(employees), project_id))
+    for project_id in rng.sample(assignments, 10):
+        conn.execute("DELETE FROM project_assignments WHERE project_id = ?", (project_id,))
+    for employee_id in rng.sample(employees, 10):
+        conn.execute("DELETE FROM leave_days WHERE employee_id = ?", (employee_id,))
+        conn.execute("DELETE FROM project_assignments WHERE employee_id = ?", (employee_id,))
+        conn.execute("DELETE FROM employees WHERE employee_id = ?", (employee_id,))
+
+
+def _derived(conn: sqlite3.Connection) -> dict:
+    """The trigger-maintained contents, keyed so a rebuild's new surrogate keys compare equal."""
+    state = {
+        "leave_calendar": set(conn.execute("SELECT * FROM leave_calendar")),
+        "headcount": set(conn.execute("SELECT * FROM headcount")),
+        # Names no employee holds any more are left in certifications; only the links must match
+        "employee_certifications": set(conn.execute(
+            "SELECT ec.employee_id, c.name FROM employee_certifications ec JOIN certifications c USING (cert_key)")),
+    }
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'directory_fts'").fetchone():
+        state["directory_fts"] = set(conn.execute("SELECT rowid, * FROM directory_fts"))
+    return state
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_triggers_match_full_rebuild(db_path, seed):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("BEGIN")
+    _mutate(conn, random.Random(seed))
+    conn.execute("COMMIT")
+    maintained = _derived(conn)
+
+    conn.execute("BEGIN")
+    schema.rebuild_derived(conn)
+    rebuilt = _derived(conn)
+    conn.execute("ROLLBACK")
+
+    assert maintained == rebuilt
+    assert all(count > 0 for (*_, count) in maintained["headcount"] | maintained["leave_calendar"])
+
+
+def test_name_index_follows_employee_writes(db_path):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'employee_names_fts'").fetchone():
+        pytest.skip("SQLite built without FTS5")
+    conn.execute("BEGIN")
+    _mutate(conn, random.Random(4))
+    conn.execute("COMMIT")
+
+    # Raises SQLITE_CORRUPT_VTAB if the external-content index disagrees with employees
+    conn.execute("INSERT INTO employee_names_fts(employee_names_fts, rank) VALUES ('integrity-check', 1)")
+    assert conn.execute("SELECT count(*) FROM employee_names_fts WHERE employee_names_fts MATCH 'Test Person'"
+                        ).fetchone()[0] == conn.execute("SELECT count(*) FROM employees WHERE name LIKE 'Test Person%'"
+                                                        ).fetchone()[0]